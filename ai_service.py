@@ -5,10 +5,18 @@ Uses Ollama (Llama 3.1) locally
 import streamlit as st
 import ollama
 import logging
+import json
+import os
 import re
+import socket
 from dotenv import load_dotenv
-from config import AI_PROVIDERS, DEFAULT_AI_PROVIDER
-import re
+from config import (
+    AI_PROVIDERS, DEFAULT_AI_PROVIDER, ANSWER_SCREENING_CONFIG, OLLAMA_CONFIG, LLM_BACKEND_CONFIG,
+    RESULT_STORE_CONFIG, UI_CONFIG
+)
+from answer_screening import screen_answers, is_non_answer
+from llm_backend import get_backend
+from result_store import ResultStore, make_result_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +25,60 @@ logger = logging.getLogger("ai_service")
 # Load environment variables
 load_dotenv()
 
+QUESTION_OPTIONS = OLLAMA_CONFIG["question_options"]
+RATING_OPTIONS = OLLAMA_CONFIG["rating_options"]
+
+def get_ollama_profile_path(host=None):
+    """Path of the tuned option profile for a host (OLLAMA_PROFILE_PATH overrides)"""
+    if os.getenv("OLLAMA_PROFILE_PATH"):
+        return os.getenv("OLLAMA_PROFILE_PATH")
+    return os.path.join(OLLAMA_CONFIG["profile_dir"], f"{host or socket.gethostname()}.json")
+
+def load_ollama_profile():
+    """Load this host's tuned Ollama runtime options, if the tuner has written any"""
+    profile_path = get_ollama_profile_path()
+    try:
+        if not os.path.exists(profile_path):
+            return {}
+        with open(profile_path, 'r') as f:
+            profile = json.load(f)
+        if profile.get("model") != OLLAMA_CONFIG["model"]:
+            logger.warning(f"Ollama profile {profile_path} was tuned for {profile.get('model')}, not {OLLAMA_CONFIG['model']}")
+        logger.info(f"Loaded Ollama profile {profile_path}: {profile.get('options', {})}, keep_alive={profile.get('keep_alive')}")
+        return profile
+    except Exception as e:
+        logger.error(f"Could not load Ollama profile {profile_path}: {e}")
+        return {}
+
+# Host-specific runtime options (num_thread, num_ctx, num_batch, keep_alive), loaded once at startup
+OLLAMA_PROFILE = load_ollama_profile()
+
+# Process-wide store of model results shared by all sessions
+result_store = ResultStore(
+    max_entries=RESULT_STORE_CONFIG.get("max_entries", 1000),
+    max_bytes=RESULT_STORE_CONFIG.get("max_bytes", 16 * 1024 * 1024)
+)
+
+def chat_completion(messages, options):
+    """Send a chat request to the configured backend with the host's tuned runtime options applied"""
+    backend = get_backend(OLLAMA_CONFIG["model"], OLLAMA_PROFILE.get("options", {}))
+    call_options = {**OLLAMA_PROFILE.get("options", {}), **options}
+    
+    # Identical requests are answered from the result store without touching the backend
+    use_store = RESULT_STORE_CONFIG.get("enabled", True)
+    if use_store:
+        model_id = f"{backend.name}:{getattr(backend, 'model', None) or getattr(backend, 'model_path', '')}"
+        result_key = make_result_key(model_id, call_options, messages)
+        stored = result_store.get(result_key)
+        if stored is not None:
+            logger.info(f"Result store hit {result_key[:12]} - skipping {backend.name} call")
+            return stored
+    
+    content = backend.chat(messages, call_options, keep_alive=OLLAMA_PROFILE.get("keep_alive"))
+    if use_store and content:
+        result_store.put(result_key, content)
+    return content
+
 def get_current_ai_provider():
     """Get the currently selected AI provider"""
     return st.session_state.get("ai_provider", DEFAULT_AI_PROVIDER)
@@ -40,14 +102,15 @@ def check_ollama_connection():
         available_models = [model.model for model in models['models']]
         
         # Check for the exact model name
-        if 'llama3.2:1B' in available_models:
-            return True, "Llama 3.2 1B model available"
+        model_name = OLLAMA_CONFIG["model"]
+        if model_name in available_models:
+            return True, f"{model_name} model available"
 
-        return False, f"Model llama3.2:1B not found. Available: {available_models}"
+        return False, f"Model {model_name} not found. Available: {available_models}"
     except Exception as e:
         return False, f"Connection error: {str(e)}"
-def generate_next_question_ollama(tech_stack, experience_level, interested_role, previous_question=None, previous_answer=None, tech_focus=None): 
-    """Generate a single follow-up technical interview question using Llama 3.2, based on previous responses."""
+def build_question_prompt(tech_stack, experience_level, interested_role, previous_question=None, previous_answer=None, tech_focus=None):
+    """Build the question generation prompt (first question or follow-up)"""
 
     # Enhanced experience to difficulty mapping with specific expectations
     experience_num = int(experience_level.split('-')[0] if '-' in experience_level else experience_level.replace('+', ''))
@@ -139,23 +202,23 @@ REQUIREMENTS:
 
 Return ONLY the interview question - no explanations or introductions."""
 
+    return prompt
+
+def generate_next_question_ollama(tech_stack, experience_level, interested_role, previous_question=None, previous_answer=None, tech_focus=None): 
+    """Generate a single follow-up technical interview question using Llama 3.2, based on previous responses."""
+    prompt = build_question_prompt(tech_stack, experience_level, interested_role, previous_question, previous_answer, tech_focus)
+
     try:
-        response = ollama.chat(
-            model='llama3.2:1B',
-            messages=[
+        content = chat_completion(
+            [
                 {
                     'role': 'user',
                     'content': prompt
                 }
             ],
-            options={
-                'temperature': 0.6,
-                'top_p': 0.85,
-                'num_predict': 200
-            }
+            QUESTION_OPTIONS
         )
-        logger.info(f"Response from Ollama: {response['message']['content'][:100]}...")
-        content = response['message']['content'].strip()
+        logger.info(f"Response from Ollama: {content[:100]}...")
         
         # Clean and validate the question
         question = clean_and_validate_question(content, tech_focus, interested_role, experience_level)
@@ -169,8 +232,10 @@ Return ONLY the interview question - no explanations or introductions."""
 
 def generate_next_question(tech_stack, tech_focus=None, previous_question=None, previous_answer=None):
     """Generate the next technical question based on tech stack and previous Q&A"""
-    experience_level = st.session_state["candidate_data"].get("experience", "3-5")
-    role = st.session_state["candidate_data"].get("position", ["Software Engineer"])[0]
+    from session_manager import get_candidate_role, get_interview_state
+
+    experience_level = get_interview_state().candidate_data.get("experience", "3-5")
+    role = get_candidate_role()
     
     logger.info(f"Generating next question for tech_focus: '{tech_focus}' with previous Q&A")
     
@@ -191,33 +256,83 @@ def parse_questions(raw_questions):
     # questions = [line.strip() for line in lines if line.strip()]
     return raw_questions  # Ensure only 4 questions are returned
 
+def split_tech_focus(question):
+    """Split a stored '[Tech] question' into its technology focus and the question text"""
+    if question.startswith('[') and ']' in question:
+        return question.split(']')[0].strip('['), question.split(']', 1)[1].strip()
+    return "General", question
+
+def prescreen_qa_pairs(qa_pairs):
+    """Split Q&A pairs into those worth rating with the model and deterministic ratings for the rest"""
+    split_questions = [split_tech_focus(pair['question']) for pair in qa_pairs]
+    screening = screen_answers(
+        [pair['answer'] for pair in qa_pairs],
+        [question for _, question in split_questions],
+        [tech for tech, _ in split_questions]
+    )
+    
+    rated_pairs = []
+    answered_techs, non_answer_techs = set(), set()
+    for pair, (tech, _), result in zip(qa_pairs, split_questions, screening):
+        if is_non_answer(result):
+            non_answer_techs.add(tech)
+        else:
+            rated_pairs.append(pair)
+            answered_techs.add(tech)
+    
+    # Technologies with nothing but non-answers get a fixed score without asking the model
+    score = ANSWER_SCREENING_CONFIG.get("non_answer_score", 1)
+    prescreened_ratings = {tech: score for tech in non_answer_techs - answered_techs}
+    if prescreened_ratings:
+        logger.info(f"Pre-screened {len(qa_pairs) - len(rated_pairs)} non-answer(s); fixed ratings for {sorted(prescreened_ratings)}")
+    return rated_pairs, prescreened_ratings
+
 def rate_candidate_responses(tech_stack, qa_pairs, interested_role, experience_level):
     """
     Rate a candidate's responses to interview questions using enhanced evaluation criteria.
     """
     try:
-        tech_list = [tech.strip() for tech in tech_stack.split(',') if tech.strip()]
-        role = interested_role or "Not specified"
-        experience = experience_level or "Not specified"
-        
-        # Get role context for evaluation
-        role_context = get_role_specific_context(role)
-        
-        # Map experience to expected competencies
-        experience_num = int(experience.split('-')[0] if '-' in experience else experience.replace('+', ''))
-        if experience_num < 1:
-            expected_level = "basic understanding and eagerness to learn"
-        elif experience_num < 3:
-            expected_level = "practical application and debugging skills"
-        elif experience_num < 5:
-            expected_level = "design decisions and best practices knowledge"
-        elif experience_num < 8:
-            expected_level = "architectural thinking and leadership capabilities"
-        else:
-            expected_level = "expert-level insights and innovation"
+        # Non-answers are scored locally and never sent to the model
+        qa_pairs, prescreened_ratings = prescreen_qa_pairs(qa_pairs)
+        if not qa_pairs:
+            logger.info("All answers were pre-screened as non-answers - skipping model rating")
+            return {"ratings": prescreened_ratings, "overall": "Bad Hire"}
         
-        # Compose enhanced evaluation prompt
-        prompt = f"""
+        content = chat_completion(
+            build_rating_messages(tech_stack, qa_pairs, interested_role, experience_level),
+            RATING_OPTIONS
+        )
+        rating_result = parse_rating_response(content)
+        rating_result["ratings"].update(prescreened_ratings)
+        return rating_result
+
+    except Exception as e:
+        logger.error(f"Error in rating process: {str(e)}")
+        return {"ratings": {}, "overall": "Error in rating process"}
+
+def build_rating_messages(tech_stack, qa_pairs, interested_role, experience_level):
+    """Build the chat messages for rating a candidate's answers"""
+    role = interested_role or "Not specified"
+    experience = experience_level or "Not specified"
+    
+    # Get role context for evaluation
+    role_context = get_role_specific_context(role)
+    
+    # Map experience to expected competencies
+    experience_num = int(experience.split('-')[0] if '-' in experience else experience.replace('+', ''))
+    if experience_num < 1:
+        expected_level = "basic understanding and eagerness to learn"
+    elif experience_num < 3:
+        expected_level = "practical application and debugging skills"
+    elif experience_num < 5:
+        expected_level = "design decisions and best practices knowledge"
+    elif experience_num < 8:
+        expected_level = "architectural thinking and leadership capabilities"
+    else:
+        expected_level = "expert-level insights and innovation"
+    
+    # Compose enhanced evaluation prompt
+    prompt = f"""
 You are a Principal Engineer and hiring manager at a top tech company, evaluating a {experience} years experienced candidate for **{role}**.
 
 ROLE CONTEXT:
@@ -233,19 +348,14 @@ CANDIDATE PROFILE:
 
 INTERVIEW RESPONSES:
 """
-        for i, pair in enumerate(qa_pairs):
-            question = pair['question']
-            tech_focus = "General"
-            
-            # Extract technology focus from question if available
-            if question.startswith('[') and ']' in question:
-                tech_focus = question.split(']')[0].strip('[')
-                question = question.split(']', 1)[1].strip()
-            
-            prompt += f"\nQ{i+1} ({tech_focus}): {question}\n"
-            prompt += f"Answer: {pair['answer']}\n"
+    for i, pair in enumerate(qa_pairs):
+        # Extract technology focus from question if available
+        tech_focus, question = split_tech_focus(pair['question'])
+        
+        prompt += f"\nQ{i+1} ({tech_focus}): {question}\n"
+        prompt += f"Answer: {pair['answer']}\n"
 
-        prompt += f"""
+    prompt += f"""
 
 EVALUATION TASK:
 
@@ -284,32 +394,16 @@ OVERALL: [One of the 5 hiring decisions above]
 
 Evaluate based on answers quality, not just keywords. Consider their {experience} years experience level."""
 
-        # Call Llama 3.1 once — fast, focused
-        response = ollama.chat(
-            model='llama3.2:1B',
-            messages=[
-                {
-                    'role': 'system',
-                    'content': 'You are an experienced technical hiring manager. Score answers based purely on technical merit and problem-solving skill.'
-                },
-                {
-                    'role': 'user',
-                    'content': prompt
-                }
-            ],
-            options={
-                'temperature': 0.3,
-                'top_p': 0.9,
-                'num_predict': 1000
-            }
-        )
-
-        content = response['message']['content'].strip()
-        return parse_rating_response(content)
-
-    except Exception as e:
-        logger.error(f"Error in rating process: {str(e)}")
-        return {"ratings": {}, "overall": "Error in rating process"}
+    return [
+        {
+            'role': 'system',
+            'content': 'You are an experienced technical hiring manager. Score answers based purely on technical merit and problem-solving skill.'
+        },
+        {
+            'role': 'user',
+            'content': prompt
+        }
+    ]
     
 def parse_rating_response(response_text):
     """Parse the model's response into a dictionary with tech ratings and overall recommendation."""
@@ -341,7 +435,8 @@ def parse_rating_response(response_text):
             score_digits = re.findall(r'\d+', score.strip())
             if score_digits:
                 try:
-                    ratings[tech.strip()] = int(score_digits[0])
+                    # Scores are 1-5; the model sometimes answers 0 or on a 10-point scale
+                    ratings[tech.strip()] = min(max(int(score_digits[0]), 1), 5)
                 except ValueError:
                     continue
 
@@ -351,10 +446,20 @@ def parse_rating_response(response_text):
         "overall": overall
     }
 
+@st.cache_data(ttl=UI_CONFIG.get("ai_status_ttl_seconds", 30), show_spinner=False)
 def get_ai_status():
-    """Get status of Ollama"""
+    """Get status of the configured inference backend (cached briefly, it is shown on every rerun)"""
     status = {}
     
+    if LLM_BACKEND_CONFIG.get("backend") == "llama_cpp":
+        backend = get_backend(OLLAMA_CONFIG["model"], OLLAMA_PROFILE.get("options", {}))
+        available, info = backend.check_status()
+        status["llama_cpp"] = {
+            "available": available,
+            "message": info
+        }
+        return status
+    
     # Check Ollama only
     ollama_available, ollama_info = check_ollama_connection()
     status["ollama"] = {
@@ -0,0 +1,105 @@
+"""
+Local pre-screening of interview answers before spending a model call
+"""
+import re
+import logging
+from typing import Dict, List, Optional
+from config import ANSWER_SCREENING_CONFIG
+
+logger = logging.getLogger("answer_screening")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# Words that say nothing about the topic of a question or technology
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "what", "when", "where", "which", "would", "could",
+    "should", "your", "you", "how", "why", "are", "was", "were", "have", "has", "from", "into", "about",
+    "their", "them", "they", "does", "did", "can", "will", "been", "being", "its", "our", "any", "all",
+    "specific", "features", "fundamentals", "practical", "application", "best", "practices", "general"
+}
+
+# Technology keyword sets only depend on the technology name, so compute them once per process
+_tech_keyword_cache: Dict[str, frozenset] = {}
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens (keeps tech spellings like c++ and c#)"""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+def keywords(text: Optional[str]) -> frozenset:
+    """Distinct meaningful tokens of a text"""
+    return frozenset(token for token in tokenize(text) if len(token) > 2 and token not in STOPWORDS)
+
+def get_tech_keywords(technology: Optional[str]) -> frozenset:
+    """Keywords for a technology, drawn from its question types and core concepts"""
+    cache_key = (technology or "").lower()
+    if cache_key not in _tech_keyword_cache:
+        from ai_service import get_tech_specific_context
+
+        tech_context = get_tech_specific_context(technology)
+        text = " ".join([technology or ""] + tech_context["question_types"] + tech_context["concepts"])
+        _tech_keyword_cache[cache_key] = keywords(text)
+    return _tech_keyword_cache[cache_key]
+
+def _normalize_phrase(text: str) -> str:
+    """Collapse an answer to the form used for non-answer phrase matching"""
+    return " ".join(re.sub(r"[^\w\s'/?]", " ", text.lower()).split())
+
+def screen_answers(answers: List[str],
+                   questions: List[Optional[str]],
+                   technologies: List[Optional[str]]) -> List[Dict[str, object]]:
+    """
+    Screen a batch of answers locally.
+
+    Each result has a 'verdict' ('empty', 'non_answer' or 'answer'), a 'signal' between 0 and 1
+    estimating how much the answer reveals, and the component scores it was built from.
+    Answers with an 'empty' or 'non_answer' verdict should never be sent to the model. Only
+    empty answers, known non-answer phrases and single words get that verdict: keyword overlap
+    is too weak to judge correctness, so it only feeds the signal.
+    """
+    config = ANSWER_SCREENING_CONFIG
+    non_answer_phrases = {_normalize_phrase(phrase) for phrase in config.get("non_answer_phrases", [])}
+    min_words = config.get("min_answer_words", 2)
+    saturation_words = config.get("saturation_answer_words", 80)
+
+    # Column-wise passes over the batch: tokens, lengths, then overlaps
+    answer_tokens = [tokenize(answer) for answer in answers]
+    word_counts = [len(tokens) for tokens in answer_tokens]
+    answer_sets = [frozenset(tokens) for tokens in answer_tokens]
+    question_sets = [keywords(question) for question in questions]
+    tech_sets = [get_tech_keywords(technology) for technology in technologies]
+
+    length_scores = [min(count / saturation_words, 1.0) for count in word_counts]
+    question_overlaps = [len(q & a) / len(q) if q else 0.5 for q, a in zip(question_sets, answer_sets)]
+    tech_overlaps = [len(t & a) / len(t) if t else 0.0 for t, a in zip(tech_sets, answer_sets)]
+
+    results = []
+    for i, answer in enumerate(answers):
+        relevance = min(max(question_overlaps[i] * 2, tech_overlaps[i] * 3), 1.0)
+
+        if not (answer or "").strip() or word_counts[i] == 0:
+            verdict, reason = "empty", "empty answer"
+        elif _normalize_phrase(answer) in non_answer_phrases:
+            verdict, reason = "non_answer", "non-answer phrase"
+        elif word_counts[i] < min_words:
+            verdict, reason = "non_answer", f"fewer than {min_words} words"
+        else:
+            verdict, reason = "answer", ""
+
+        signal = 0.0 if verdict != "answer" else round(0.5 * length_scores[i] + 0.5 * relevance, 3)
+        results.append({
+            "verdict": verdict,
+            "reason": reason,
+            "signal": signal,
+            "word_count": word_counts[i],
+            "relevance": round(relevance, 3)
+        })
+
+    return results
+
+def screen_answer(answer: str, question: Optional[str] = None, technology: Optional[str] = None) -> Dict[str, object]:
+    """Screen a single answer (see screen_answers)"""
+    return screen_answers([answer], [question], [technology])[0]
+
+def is_non_answer(result: Dict[str, object]) -> bool:
+    """Check if a screening result means the model should not be called for the answer"""
+    return ANSWER_SCREENING_CONFIG.get("enabled", True) and result.get("verdict") != "answer"
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark compress-then-encrypt for stored answers
+
+Encrypts answers of several lengths with and without zlib compression and reports
+the stored size, bytes saved and CPU time per answer, to pick compression_min_bytes
+in DATABASE_CONFIG.
+
+Usage:
+    python compression_benchmark.py
+    python compression_benchmark.py --lengths 100 300 1000 3000 --repeats 2000
+"""
+import argparse
+import random
+import time
+
+from config import DATABASE_CONFIG
+from security.encryption import get_data_encryption
+
+# Vocabulary typical of technical answers, so compression ratios resemble real data
+WORDS = (
+    "the a to of and in is we would use it for this that with cache database query index "
+    "request service latency memory thread process python react async await function class "
+    "object state component api endpoint test deploy container docker kubernetes scale load "
+    "performance profile measure bottleneck first then because so when if each data table"
+).split()
+
+def sample_answer(length: int, rng: random.Random) -> str:
+    """Pseudo-random answer text of roughly the given length in characters"""
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+def time_per_call(fn, values, repeats: int) -> float:
+    """Average microseconds per call over the values"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for value in values:
+            fn(value)
+    return (time.perf_counter() - start) / (repeats * len(values)) * 1e6
+
+def benchmark(lengths, repeats: int, samples: int = 20):
+    encryption = get_data_encryption()
+    rng = random.Random(42)
+    print(f"{'length':>7} {'plain':>8} {'stored':>8} {'saved':>7} {'enc us':>8} {'enc+z us':>9} {'dec us':>8} {'dec+z us':>9}")
+    for length in lengths:
+        answers = [sample_answer(length, rng) for _ in range(samples)]
+        plain = [encryption.encrypt_data(answer) for answer in answers]
+        compressed = [encryption.encrypt_data(answer, compress_min_bytes=0) for answer in answers]
+        assert all(encryption.decrypt_data(token) == answer for token, answer in zip(compressed, answers))
+
+        plain_size = sum(map(len, plain)) / samples
+        compressed_size = sum(map(len, compressed)) / samples
+        print(
+            f"{length:>7} {plain_size:>8.0f} {compressed_size:>8.0f} "
+            f"{(1 - compressed_size / plain_size) * 100:>6.1f}% "
+            f"{time_per_call(encryption.encrypt_data, answers, repeats):>8.1f} "
+            f"{time_per_call(lambda a: encryption.encrypt_data(a, compress_min_bytes=0), answers, repeats):>9.1f} "
+            f"{time_per_call(encryption.decrypt_data, plain, repeats):>8.1f} "
+            f"{time_per_call(encryption.decrypt_data, compressed, repeats):>9.1f}"
+        )
+    print(f"\nCurrent compression_min_bytes: {DATABASE_CONFIG.get('compression_min_bytes')}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark compress-then-encrypt for stored answers")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 150, 300, 600, 1500, 4000], help="Answer lengths in characters")
+    parser.add_argument("--repeats", type=int, default=200, help="Timing repeats per sample")
+    args = parser.parse_args(argv)
+    benchmark(args.lengths, args.repeats)
+
+if __name__ == "__main__":
+    main()
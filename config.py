@@ -1,11 +1,16 @@
 """
 Configuration for conversation steps and keywords
 """
+import os
+from dotenv import load_dotenv
 from validators import (
     validate_name, validate_email, validate_phone, validate_experience,
     validate_position, validate_location, validate_tech_stack
 )
 
+# Load environment variables so backend selection can come from .env
+load_dotenv()
+
 # AI Provider Configuration
 AI_PROVIDERS = {
     "ollama": {
@@ -18,6 +23,41 @@ AI_PROVIDERS = {
 # Default AI provider
 DEFAULT_AI_PROVIDER = "ollama"
 
+# Inference backend: "ollama" talks to the Ollama daemon over HTTP, "llama_cpp" runs a local
+# GGUF model in-process (requires llama-cpp-python) and shares it across all sessions
+LLM_BACKEND_CONFIG = {
+    "backend": os.getenv("LLM_BACKEND", "ollama"),
+    "llama_cpp_model_path": os.getenv("LLAMA_CPP_MODEL_PATH", ""),
+    "llama_cpp_n_ctx": 4096,
+    "llama_cpp_n_threads": None,       # None lets llama.cpp pick; a tuned profile's num_thread wins
+    "llama_cpp_n_batch": 512,
+    "request_timeout_seconds": 300     # Max wait for a queued request on the shared model
+}
+
+# Store of model results keyed by (model, options, normalized prompt): repeated rating or
+# question requests (reruns, retries, double submits) are answered without calling the backend
+RESULT_STORE_CONFIG = {
+    "enabled": True,
+    "max_entries": 1000,
+    "max_bytes": 16 * 1024 * 1024
+}
+
+# Ollama runtime configuration
+OLLAMA_CONFIG = {
+    "model": "llama3.2:1B",
+    "profile_dir": "ollama_profiles",  # Per-host option profiles written by ollama_tuner.py
+    "question_options": {
+        "temperature": 0.6,
+        "top_p": 0.85,
+        "num_predict": 200
+    },
+    "rating_options": {
+        "temperature": 0.3,
+        "top_p": 0.9,
+        "num_predict": 1000
+    }
+}
+
 # Question steps configuration
 STEPS = [
     {
@@ -82,7 +122,67 @@ Commands you can use:
 Let's get started! What's your full name?"""
 
 # Interview Configuration
-QUESTIONS_PER_TECHNOLOGY = 1  # Number of questions to ask per technology in the tech stack
+QUESTIONS_PER_TECHNOLOGY = 1  # Questions per technology in the tech stack (the most adaptive mode asks)
+
+# Adaptive follow-ups (opt-in): after each answer, decide whether another question on the
+# technology would change its rating. At least min_questions_per_technology and never more
+# than QUESTIONS_PER_TECHNOLOGY are asked, so a technology whose answers are already clearly
+# weak or clearly strong costs fewer question and rating calls than in fixed mode. It only
+# saves calls when QUESTIONS_PER_TECHNOLOGY is above the minimum, e.g. with 3 questions per
+# technology a clear first answer ends the technology after 1. Disabled, every technology
+# gets exactly QUESTIONS_PER_TECHNOLOGY questions.
+ADAPTIVE_INTERVIEW_CONFIG = {
+    "enabled": False,
+    "min_questions_per_technology": 1,
+    "follow_up_band": (0.3, 0.7)      # Only ask a follow-up while the running signal is ambiguous
+}
+
+# Local answer pre-screening (no model call for empty and non-answers)
+ANSWER_SCREENING_CONFIG = {
+    "enabled": True,
+    "non_answer_phrases": [
+        "idk", "i dont know", "i don't know", "dont know", "don't know", "no idea", "not sure",
+        "skip", "pass", "next", "n/a", "na", "none", "nothing", "no", "nope", "?"
+    ],
+    "min_answer_words": 2,            # Fewer words than this is treated as a non-answer (single words only:
+                                      # short replies like "Hash table" can be correct and go to the model)
+    "saturation_answer_words": 80,    # Answers longer than this count as fully developed
+    "non_answer_score": 1             # Deterministic rating for technologies with only non-answers
+}
+
+# Background job executor for model calls and database saves (off the Streamlit script thread)
+JOB_EXECUTOR_CONFIG = {
+    "enabled": True,                 # False runs jobs inline on the script thread
+    "max_workers": 4,
+    "poll_interval_seconds": 1.0,    # How often the chat refreshes while a job is running
+    "result_ttl_seconds": 900        # Uncollected results are dropped after this long
+}
+
+# Server-side interview snapshots so sessions survive dropped connections and restarts.
+# Snapshots are encrypted and keyed by a resume token carried in the page URL.
+SESSION_STORE_CONFIG = {
+    "enabled": True,
+    "backend": os.getenv("SESSION_STORE_BACKEND", "sqlite"),    # "sqlite" or "file"
+    "sqlite_path": os.getenv("SESSION_STORE_PATH", "interview_sessions.db"),
+    "file_dir": os.getenv("SESSION_STORE_DIR", "session_snapshots"),
+    "ttl_hours": 24,                  # Snapshots not updated for this long are purged
+    "query_param": "resume"           # URL query parameter holding the resume token
+}
+
+# Registry of live sessions: a reaper thread releases idle sessions' memory. Sessions idle for
+# session_timeout_minutes (SECURITY_CONFIG) are evicted; with a resume token they are spilled
+# to the session store earlier and reloaded on the next interaction.
+SESSION_REGISTRY_CONFIG = {
+    "enabled": True,
+    "reap_interval_seconds": 60,
+    "spill_after_minutes": 10         # None keeps idle sessions in memory until they expire
+}
+
+# Chat UI configuration
+UI_CONFIG = {
+    "max_visible_messages": 30,       # Older messages are collapsed and not rendered unless requested
+    "ai_status_ttl_seconds": 30       # How long the backend status check is reused across reruns
+}
 
 # Security Configuration
 SECURITY_CONFIG = {
@@ -91,7 +191,8 @@ SECURITY_CONFIG = {
     "enable_encryption": True,
     "enable_gdpr_compliance": True,
     "require_privacy_consent": True,
-    "enable_data_masking": True
+    "enable_data_masking": True,
+    "decrypted_cache_size": 16     # Decrypted fields kept in session memory (never persisted)
 }
 
 # Privacy and GDPR settings
@@ -105,7 +206,66 @@ PRIVACY_CONFIG = {
 # Database Configuration
 DATABASE_CONFIG = {
     "save_to_database": True,
+    # "supabase", "sqlite" (local file, single node) or "auto" (Supabase when configured)
+    "backend": os.getenv("DATABASE_BACKEND", "auto"),
+    "sqlite_path": os.getenv("DATABASE_PATH", "interviews.db"),
     "encrypt_sensitive_data": True,
     "auto_save_on_completion": True,
+    "compress_answers": True,         # zlib-compress answers before encryption
+    "compression_min_bytes": 256,     # Shorter answers are stored uncompressed
+    "interview_cache_entries": 200,   # Decoded interviews kept for repeated reads
+    "interview_cache_bytes": 8 * 1024 * 1024,
+    "interview_cache_ttl_seconds": 300,  # Upper bound on how long decrypted interviews stay in memory
     "retention_days": 365  # How long to keep interview data
 }
+
+# Supabase client pool: clients are created on first use (not at import) and shared by all
+# threads; each keeps its HTTP connections alive. Broken connections are retried with backoff.
+DATABASE_POOL_CONFIG = {
+    "pool_size": 4,
+    "connections_per_client": 4,
+    "acquire_timeout_seconds": 10,    # Wait for a free client when all are busy
+    "request_timeout_seconds": 30,
+    "keepalive_expiry_seconds": 60,
+    "health_check_idle_seconds": 60,  # Clients idle longer are checked before reuse
+    "base_backoff_seconds": 1,
+    "max_backoff_seconds": 60
+}
+
+# Local write-behind outbox: completed interviews are queued on disk and saved to the
+# database by a background worker, so the candidate never waits on database latency
+OUTBOX_CONFIG = {
+    "enabled": True,
+    "path": os.getenv("OUTBOX_PATH", "interview_outbox.db"),
+    "batch_size": 20,
+    "flush_interval_seconds": 5,      # Retry check interval (new entries are flushed immediately)
+    "base_backoff_seconds": 5,
+    "max_backoff_seconds": 600,
+    "max_attempts": 20                # Then the entry is parked (kept, no longer retried) and logged
+}
+
+# Returning candidates (opt-in): after the email and phone steps, check the blind index for a
+# recent completed interview. Nothing stored is shown to or loaded into the session unverified:
+# "skip" ends the chat with a neutral message, "reuse_profile" (email matches only) first sends
+# a one-time code to that address and only fills in the remaining profile steps once it is
+# entered. Either way the reply differs from a new candidate's, which tells whoever typed the
+# contact details that they applied recently, and "skip" also turns away candidates who share
+# or mistype a contact - only enable it where that is acceptable
+RETURNING_CANDIDATE_CONFIG = {
+    "enabled": False,
+    "lookback_days": 90,
+    "action": "skip"
+}
+
+# One-time codes for returning candidates. Without SMTP_HOST and VERIFICATION_SENDER no code
+# can be sent and "reuse_profile" falls back to the normal interview
+EMAIL_VERIFICATION_CONFIG = {
+    "smtp_host": os.getenv("SMTP_HOST", ""),
+    "smtp_port": int(os.getenv("SMTP_PORT", "587")),
+    "smtp_username": os.getenv("SMTP_USERNAME", ""),
+    "smtp_password": os.getenv("SMTP_PASSWORD", ""),
+    "sender": os.getenv("VERIFICATION_SENDER", ""),
+    "code_digits": 6,
+    "code_ttl_seconds": 900,
+    "max_attempts": 3
+}
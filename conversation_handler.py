@@ -1,20 +1,21 @@
 """
 Main conversation processing logic with security enhancements
 """
-import streamlit as st
 import logging
-from config import STEPS, DATABASE_CONFIG
+from config import STEPS, DATABASE_CONFIG, RETURNING_CANDIDATE_CONFIG
 from session_manager import (
     is_end, is_retry, is_restart, reset_conversation, add_message,
-    get_current_question, get_next_tech_question, prepare_tech_interview,
+    get_current_question, get_next_question_request, record_tech_question, prepare_tech_interview,
     store_interview_answer, is_technicalinterview_in_progress, is_interview_complete,
     get_question_answer_pairs, store_candidate_rating, store_overall_rating,
-    store_candidate_data_securely, get_candidate_data_securely
+    store_candidate_data_securely, get_candidate_data_securely, get_interview_state
 )
-from ai_service import rate_candidate_responses
+from ai_service import rate_candidate_responses, generate_next_question_ollama
+from job_executor import job_executor
 from security.session_security import SecureSessionManager
 from security.data_privacy import DataPrivacyManager
-from database.models import interview_data_manager
+from security.verification import email_verifier
+from database.models import get_interview_data_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,10 +23,16 @@ logger = logging.getLogger("conversation_handler")
 
 def process_user_input(user_input):
     """Process user input and handle validation with security checks"""
+    state = get_interview_state()
     # Validate session security first
     if not SecureSessionManager.validate_session():
         return
     
+    # One background job per session at a time - the answer to it is still on its way
+    if has_pending_job():
+        add_message("assistant", "I'm still working on your previous answer - one moment please.")
+        return
+    
     # Sanitize input for security
     user_input = DataPrivacyManager.sanitize_for_storage({"input": user_input})["input"]
     
@@ -53,6 +60,11 @@ def process_user_input(user_input):
     #         add_message("assistant", f"Sure! {question}")
     #     return
     
+    # A returning candidate was sent a one-time code
+    if state.pending_verification is not None:
+        handle_verification_code(user_input)
+        return
+    
     # Check if we're in the technical interview phase
     if is_technicalinterview_in_progress():
         # Store the answer and check if interview is complete
@@ -61,18 +73,13 @@ def process_user_input(user_input):
         if interview_complete:
             # If all questions are answered, complete the interview
             complete_interview()
-        else:
-            # Ask the next question
-            next_question = get_next_tech_question()
-            if next_question:
-                add_message("assistant", f"Thanks for your answer. Next question:\n\n{next_question}")
-            else:
-                # Should not happen, but just in case
-                complete_interview()
+        elif not submit_next_question("Thanks for your answer. Next question:\n\n"):
+            # Should not happen, but just in case
+            complete_interview()
         return
     
     # Process current step if not in interview
-    current_step = st.session_state["current_step"]
+    current_step = state.current_step
     
     if current_step < len(STEPS):
         step_config = STEPS[current_step]
@@ -84,7 +91,9 @@ def process_user_input(user_input):
         if is_valid:
             # Use secure storage
             store_candidate_data_securely(key, user_input.strip())
-            st.session_state["current_step"] += 1
+            state.current_step += 1
+            if key in ("email", "phone") and handle_returning_candidate():
+                return
             next_question = get_current_question()
             if next_question:
                 add_message("assistant", f"Thank you! {next_question}")
@@ -93,9 +102,8 @@ def process_user_input(user_input):
                     if is_valid:
                         # Use secure storage
                         store_candidate_data_securely(key, user_input.strip())
-                        st.session_state["current_step"] += 1
+                        state.current_step += 1
                         # If tech stack is set, prepare for technical interview
-                        st.session_state["is_technicalinterview_in_progress"] = True
                         start_technical_interview()
             else:
                 # Generate technical questions
@@ -104,17 +112,180 @@ def process_user_input(user_input):
             add_message("assistant", f"{error_msg} Please try again, or type 'retry' to see the question again, or 'restart' to start over.")
     else:
         # If interview is already complete, just acknowledge
-        if is_interview_complete():
+        if is_interview_complete() and state.candidate_rating:
             add_message("assistant", "Thank you! Your interview is complete and we've evaluated your responses. Type 'exit' to end the chat.")
+        elif is_interview_complete():
+            add_message("assistant", "Thank you! Our team will contact you with next steps. Type 'exit' to end the chat.")
         else:
             # Should not happen normally, but start the interview if we reach here
             start_technical_interview()
 
+def handle_returning_candidate():
+    """
+    Look up a recent completed interview of this candidate by email (and phone once known).
+    Returns True if one was found and the conversation was continued accordingly.
+    The lookup is an existence check on the blind index; nothing from the stored interview
+    enters the session before the candidate has proven they own its email address.
+    """
+    config = RETURNING_CANDIDATE_CONFIG
+    interview_data_manager = get_interview_data_manager() if config.get("enabled", True) else None
+    if not interview_data_manager:
+        return False
+    
+    phone = get_candidate_data_securely("phone")
+    interview = interview_data_manager.find_returning_candidate(
+        get_candidate_data_securely("email"), phone or None, config.get("lookback_days", 90)
+    )
+    if interview is None:
+        return False
+    
+    state = get_interview_state()
+    logger.info(f"Returning candidate, previous interview {interview['id']}")
+    
+    if config.get("action", "skip") == "reuse_profile":
+        if not interview["email_match"]:
+            # Matched on the phone only: the address on file is unknown here, so nothing can be verified
+            return False
+        # The email index matched, so the typed address is the one on file
+        challenge = email_verifier.start(interview["id"], get_candidate_data_securely("email"))
+        if challenge is None:
+            logger.warning("Cannot send a verification code - continuing with the normal interview")
+            return False
+        state.pending_verification = challenge
+        add_message("assistant", "It looks like you've applied with us recently. We've sent a verification code "
+                                 "to the email address we have on file - enter it to reuse your previous profile, "
+                                 "or type 'skip' to continue with the questions.")
+        return True
+    
+    # No need to repeat the interview; the previous evaluation stays with the recruiters
+    state.current_step = len(STEPS)
+    state.interview_complete = True
+    add_message("assistant", "Thank you! We don't need to repeat the technical interview at this time. "
+                             "Our team will contact you with next steps.")
+    return True
+
+def handle_verification_code(user_input):
+    """Check a code for the pending returning-candidate verification and reuse the profile if it matches"""
+    state = get_interview_state()
+    challenge = state.pending_verification
+    if user_input.strip().lower() != "skip" and email_verifier.check(challenge, user_input):
+        state.pending_verification = None
+        if reuse_stored_profile(challenge["subject"]):
+            return
+        add_message("assistant", f"Thanks, you're verified! Some details need updating. {get_current_question()}")
+        return
+    
+    if user_input.strip().lower() != "skip" and not email_verifier.is_exhausted(challenge):
+        add_message("assistant", "That code doesn't match. Please try again, or type 'skip' to continue with the questions.")
+        return
+    
+    state.pending_verification = None
+    add_message("assistant", f"No problem, let's continue. {get_current_question()}")
+
+def reuse_stored_profile(interview_id):
+    """Fill in the remaining profile steps from a verified candidate's previous interview"""
+    state = get_interview_state()
+    interview_data_manager = get_interview_data_manager()
+    interview = interview_data_manager.get_interview_by_id(interview_id) if interview_data_manager else None
+    if interview is None:
+        return False
+    
+    stored = dict(interview.get("candidate_info", {}),
+                  experience=interview.get("experience_years", ""),
+                  position=interview.get("position", ""),
+                  tech_stack=interview.get("tech_stack", ""))
+    for step in STEPS[state.current_step:]:
+        value = stored.get(step["key"], "")
+        if not value or not step["validator"](value)[0]:
+            # Missing or no longer valid - ask for the rest as usual
+            return False
+    for step in STEPS[state.current_step:]:
+        store_candidate_data_securely(step["key"], stored[step["key"]])
+    state.current_step = len(STEPS)
+    add_message("assistant", "Welcome back! I've used the profile from your previous interview.")
+    start_technical_interview()
+    return True
+
+def has_pending_job():
+    """Check if a background job is running for this session"""
+    return get_interview_state().pending_job is not None
+
+def submit_job(kind, fn, *args, **details):
+    """Submit background work for this session and remember its handle"""
+    state = get_interview_state()
+    job_id = job_executor.submit(fn, *args)
+    state.pending_job = {"id": job_id, "kind": kind, **details}
+    # Inline execution (executor disabled) finishes immediately - apply right away
+    poll_pending_job()
+
+def poll_pending_job():
+    """Apply the result of this session's background job once it has landed. Returns True if applied."""
+    state = get_interview_state()
+    job = state.pending_job
+    if job is None:
+        return False
+    
+    future = job_executor.pop_result(job["id"])
+    if future is None:
+        if job_executor.is_done(job["id"]):
+            # The executor no longer knows this job (it expired, or the session was resumed after a restart)
+            logger.warning(f"Background job {job['id'][:8]} was lost, submitting it again")
+            state.pending_job = None
+            resubmit_job(job)
+            return True
+        return False
+    
+    state.pending_job = None
+    try:
+        result = future.result()
+    except Exception as e:
+        logger.error(f"Background {job['kind']} job failed: {e}")
+        result = None
+    
+    if job["kind"] == "question":
+        apply_generated_question(job, result)
+    elif job["kind"] == "evaluation":
+        apply_interview_evaluation(job, result)
+    return True
+
+def resubmit_job(job):
+    """Run a lost job again from the current interview state"""
+    if job["kind"] == "question":
+        submit_next_question(job["message_prefix"], job["first_question"])
+    elif job["kind"] == "evaluation":
+        submit_evaluation()
+
+def submit_next_question(message_prefix, first_question=False):
+    """Generate the next interview question in the background. Returns False if none is left."""
+    request = get_next_question_request()
+    if request is None:
+        return False
+    
+    logger.info(f"Generating next question for tech_focus: '{request['tech_focus']}' with previous Q&A")
+    submit_job("question", generate_next_question_ollama, request["tech_stack"], request["experience_level"],
+               request["interested_role"], request["previous_question"], request["previous_answer"],
+               request["tech_focus"], tech_focus=request["tech_focus"], message_prefix=message_prefix,
+               first_question=first_question)
+    return True
+
+def apply_generated_question(job, question):
+    """Record a generated question and ask it"""
+    if not question or len(str(question).strip()) == 0:
+        logger.warning(f"Failed to generate a question or question is empty: '{question}'")
+        if job["first_question"]:
+            add_message("assistant", "It seems I couldn't generate proper questions. Let's end the interview.")
+            return
+    
+    formatted_question = record_tech_question(job["tech_focus"], question)
+    logger.info(f"Generated question: '{formatted_question}'")
+    add_message("assistant", f"{job['message_prefix']}{formatted_question}")
+
 def start_technical_interview():
     """Start the technical interview process by preparing tech stack and generating first question"""
+    state = get_interview_state()
     try:
-        tech_stack = st.session_state["candidate_data"].get("tech_stack", "")
-        experience = st.session_state["candidate_data"].get("experience", "")
+        tech_stack = state.candidate_data.get("tech_stack", "")
+        experience = state.candidate_data.get("experience", "")
         
         logger.info(f"Starting technical interview with tech_stack: '{tech_stack}' and experience: '{experience}'")
         
@@ -122,19 +293,11 @@ def start_technical_interview():
         tech_list = prepare_tech_interview()
         logger.info(f"Prepared interview with {len(tech_list)} technologies: {tech_list}")
         
-        # Get the first question
-        first_question = get_next_tech_question()
-        logger.info(f"Generated first question: '{first_question}'")
-        
-        if first_question and len(str(first_question).strip()) > 0:
-            # Introduction to technical interview
-            intro_message = f"Great! Now I'll ask you some technical questions based on your {experience} years of experience with {tech_stack}. I'll focus on each technology in your stack, with follow-up questions to understand your knowledge depth.\n\n"
-            intro_message += f"First question:\n\n{first_question}"
-        else:
-            logger.warning(f"Failed to generate the first question or question is empty: '{first_question}'")
-            intro_message = "It seems I couldn't generate proper questions. Let's end the interview."
-        
-        add_message("assistant", intro_message)
+        # Introduction to technical interview, followed by the first question once it is generated
+        intro_message = f"Great! Now I'll ask you some technical questions based on your {experience} years of experience with {tech_stack}. I'll focus on each technology in your stack, with follow-up questions to understand your knowledge depth.\n\n"
+        intro_message += "First question:\n\n"
+        if not submit_next_question(intro_message, first_question=True):
+            add_message("assistant", "It seems I couldn't generate proper questions. Let's end the interview.")
         logger.info("Technical interview started successfully")
         
     except Exception as e:
@@ -143,64 +306,93 @@ def start_technical_interview():
         import traceback
         logger.error(traceback.format_exc())
 
-def complete_interview():
-    """Complete the interview process and evaluate the candidate"""
-    # Get all question-answer pairs
-    qa_pairs = get_question_answer_pairs()
-    
-    if not qa_pairs:
-        add_message("assistant", "There were no questions answered. Let's end the interview.")
-        return
-    
-    # Get the tech stack and experience
-    tech_stack = st.session_state["candidate_data"].get("tech_stack", "")
-    experience_level = st.session_state["candidate_data"].get("experience", "")
-    interested_role = st.session_state["candidate_data"].get("position", "Software Engineer")
-    
-    # Rate the candidate's responses
-    add_message("assistant", "Thank you for completing the technical interview. I'm now evaluating your responses...")
-    
+def evaluate_interview(tech_stack, qa_pairs, interested_role, experience_level, candidate_data, interview_id):
+    """Rate the answers and save the interview (background job, no session state access)"""
     # Get ratings from AI
     rating_result = rate_candidate_responses(tech_stack, qa_pairs, interested_role, experience_level)
     ratings = rating_result.get("ratings", {})
     overall = rating_result.get("overall", "Error in rating process")
     
-    # Store ratings
-    store_candidate_rating(ratings)
-    store_overall_rating(overall)
-    
     # Save all data to database if enabled
-    if DATABASE_CONFIG.get("save_to_database", True) and interview_data_manager:
+    save_status = "disabled"
+    saved_id = None
+    interview_data_manager = get_interview_data_manager() if DATABASE_CONFIG.get("save_to_database", True) else None
+    if interview_data_manager:
         try:
-            if not interview_data_manager.is_available():
+            # The outbox also takes interviews while the database is reconnecting
+            if not interview_data_manager.is_available() and interview_data_manager.outbox is None:
                 logger.warning("Database not configured - skipping data save")
-                add_message("assistant", "⚠️ Database not configured. Interview complete but data not saved to database.")
+                save_status = "unavailable"
             else:
-                add_message("assistant", "Saving your interview data securely...")
-                
-                # Get all candidate data
-                candidate_data = st.session_state.get("candidate_data", {})
-                
-                # Save to database with encryption
-                interview_id = interview_data_manager.save_complete_interview(
+                # Queue for saving with encryption (written by the outbox worker)
+                saved_id = interview_data_manager.queue_complete_interview(
+                    interview_id=interview_id,
                     candidate_data=candidate_data,
                     qa_pairs=qa_pairs,
                     ratings=ratings,
                     overall_rating=overall
                 )
                 
-                if interview_id:
-                    logger.info(f"Successfully saved interview data to database with ID: {interview_id}")
-                    # Store interview ID in session for reference
-                    st.session_state["interview_id"] = interview_id
-                    add_message("assistant", "✅ Your interview data has been saved securely to our database.")
+                if saved_id:
+                    logger.info(f"Interview data recorded for database save with ID: {saved_id}")
+                    save_status = "saved"
                 else:
                     logger.error("Failed to save interview data to database")
-                    add_message("assistant", "⚠️ There was an issue saving your data to our database, but your interview is complete.")
+                    save_status = "failed"
                 
         except Exception as e:
             logger.error(f"Database save error: {e}")
-            add_message("assistant", "⚠️ There was an issue saving your data to our database, but your interview is complete.")
+            save_status = "failed"
+    
+    return {"ratings": ratings, "overall": overall, "save_status": save_status, "interview_id": saved_id}
+
+def complete_interview():
+    """Complete the interview process and evaluate the candidate"""
+    # Get all question-answer pairs
+    qa_pairs = get_question_answer_pairs()
+    
+    if not qa_pairs:
+        add_message("assistant", "There were no questions answered. Let's end the interview.")
+        return
+    
+    # Rate the candidate's responses
+    add_message("assistant", "Thank you for completing the technical interview. I'm now evaluating your responses...")
+    submit_evaluation()
+
+def submit_evaluation():
+    """Rate the answers and save the interview in the background"""
+    state = get_interview_state()
+    # Get the tech stack and experience
+    tech_stack = state.candidate_data.get("tech_stack", "")
+    experience_level = state.candidate_data.get("experience", "")
+    interested_role = state.candidate_data.get("position", "Software Engineer")
+    
+    # Plaintext values: the database layer encrypts them itself and hashes the email for lookups
+    candidate_data = {key: get_candidate_data_securely(key) for key in state.candidate_data}
+    
+    submit_job("evaluation", evaluate_interview, tech_stack, get_question_answer_pairs(), interested_role,
+               experience_level, candidate_data, state.interview_id)
+
+def apply_interview_evaluation(job, result):
+    """Store the evaluation and show it to the candidate"""
+    state = get_interview_state()
+    if result is None:
+        result = {"ratings": {}, "overall": "Error in rating process", "save_status": "failed", "interview_id": None}
+    ratings = result["ratings"]
+    overall = result["overall"]
+    
+    # Store ratings
+    store_candidate_rating(ratings)
+    store_overall_rating(overall)
+    
+    if result["save_status"] == "saved":
+        # Store interview ID in session for reference
+        state.interview_id = result["interview_id"]
+        add_message("assistant", "✅ Your interview data has been saved securely to our database.")
+    elif result["save_status"] == "unavailable":
+        add_message("assistant", "⚠️ Database not configured. Interview complete but data not saved to database.")
+    elif result["save_status"] == "failed":
+        add_message("assistant", "⚠️ There was an issue saving your data to our database, but your interview is complete.")
     
     # Create a summary message
     rating_message = "## Interview Evaluation\n\n"
@@ -218,4 +410,3 @@ def complete_interview():
     
     # Add the message to the chat
     add_message("assistant", rating_message)
-# ...existing code...
@@ -1,72 +1,196 @@
 """
 Supabase database connection and configuration
+
+Clients are created lazily on first use and kept in a small pool shared by all
+Streamlit and worker threads. Each client has its own keep-alive HTTP connections;
+clients idle for a while are health-checked before reuse, and after connection
+failures new connections are attempted with exponential backoff.
 """
 import os
+import time
+import queue
+import random
 import logging
-from typing import Optional
-from supabase import create_client, Client
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
 from dotenv import load_dotenv
+from config import DATABASE_POOL_CONFIG
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+class DatabaseUnavailable(Exception):
+    """No database client can be used right now"""
+
+def is_connection_error(error: Exception) -> bool:
+    """Check if an error means the connection is broken (rather than a failed query)"""
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, httpx.TransportError)
+
 class SupabaseManager:
-    """Handle Supabase database connections and operations"""
-    
-    def __init__(self):
-        self.client: Optional[Client] = None
-        self.url = os.getenv("SUPABASE_URL")
-        self.key = os.getenv("SUPABASE_KEY")
-        self.connected = False
-        
+    """Handle Supabase database connections through a lazily filled client pool"""
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None, config: Optional[dict] = None):
+        self.url = url or os.getenv("SUPABASE_URL")
+        self.key = key or os.getenv("SUPABASE_KEY")
+        self.config = config or DATABASE_POOL_CONFIG
+        self.pool_size = self.config.get("pool_size", 4)
+        # (client, last used) pairs; most recently used first so warm connections are reused
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
         if not self.url or not self.key:
             logger.warning("Supabase URL or KEY not found in environment variables. Database features will be disabled.")
-            return
-        
+
+    def is_configured(self) -> bool:
+        """Check if Supabase credentials are set"""
+        return bool(self.url and self.key)
+
+    def is_available(self) -> bool:
+        """Check if Supabase is configured and not backing off after connection failures"""
+        return self.is_configured() and time.time() >= self._retry_at
+
+    def _create_client(self):
+        """New client with its own keep-alive HTTP connection pool"""
+        import httpx
+        from supabase import create_client, ClientOptions
+
+        timeout = self.config.get("request_timeout_seconds", 30)
+        http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.config.get("connections_per_client", 4),
+                max_keepalive_connections=self.config.get("connections_per_client", 4),
+                keepalive_expiry=self.config.get("keepalive_expiry_seconds", 60)
+            )
+        )
+        return create_client(self.url, self.key, options=ClientOptions(
+            httpx_client=http_client, postgrest_client_timeout=timeout
+        ))
+
+    @staticmethod
+    def _ping(client) -> bool:
+        """Cheap query to check that a client still works"""
+        try:
+            client.table('interviews').select('id').limit(1).execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Database health check failed: {e}")
+            return False
+
+    def _record_failure(self, error: Exception) -> None:
+        """Back off before the next connection attempt"""
+        with self._lock:
+            self._failures += 1
+            delay = min(self.config.get("base_backoff_seconds", 1) * 2 ** (self._failures - 1),
+                        self.config.get("max_backoff_seconds", 60))
+            delay *= random.uniform(0.8, 1.2)
+            self._retry_at = time.time() + delay
+        logger.error(f"Database connection failed ({self._failures} in a row), retrying in {delay:.0f}s: {error}")
+
+    def _record_success(self) -> None:
+        if self._failures:
+            with self._lock:
+                self._failures = 0
+                self._retry_at = 0.0
+            logger.info("Database connection restored")
+
+    def _discard(self, client) -> None:
+        """Drop a broken client so a fresh one can take its place"""
+        with self._lock:
+            self._created -= 1
+        try:
+            client.postgrest.session.close()
+        except Exception:
+            pass
+
+    def _acquire(self):
+        """Take an idle client, create one while under pool_size, or wait for one"""
+        if not self.is_configured():
+            raise DatabaseUnavailable("Supabase URL or KEY not configured")
+        if time.time() < self._retry_at:
+            raise DatabaseUnavailable(f"Database reconnect backoff, next attempt in {self._retry_at - time.time():.0f}s")
+
+        while True:
+            try:
+                client, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.time() - last_used < self.config.get("health_check_idle_seconds", 60) or self._ping(client):
+                return client
+            self._discard(client)
+
+        with self._lock:
+            can_create = self._created < self.pool_size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                client = self._create_client()
+                logger.info(f"Opened database client {self._created}/{self.pool_size}")
+                return client
+            except Exception as e:
+                with self._lock:
+                    self._created -= 1
+                self._record_failure(e)
+                raise DatabaseUnavailable(f"Failed to connect to Supabase: {e}") from e
+
         try:
-            self._connect()
+            client, _ = self._idle.get(timeout=self.config.get("acquire_timeout_seconds", 10))
+            return client
+        except queue.Empty:
+            raise DatabaseUnavailable("All database clients are busy")
+
+    @contextmanager
+    def client(self) -> Iterator:
+        """Borrow a pooled client for one operation"""
+        client = self._acquire()
+        healthy = True
+        try:
+            yield client
         except Exception as e:
-            logger.error(f"Failed to initialize Supabase connection: {e}")
-    
-    def _connect(self):
-        """Establish connection to Supabase"""
+            if is_connection_error(e):
+                healthy = False
+                self._record_failure(e)
+            raise
+        finally:
+            if healthy:
+                self._idle.put((client, time.time()))
+            else:
+                self._discard(client)
+        self._record_success()
+
+    def get_client(self):
+        """A dedicated (unpooled) client for long-running jobs, or None if not configured"""
+        if not self.is_configured():
+            return None
         try:
-            if not self.url or not self.key:
-                return False
-            self.client = create_client(self.url, self.key)
-            self.connected = True
-            logger.info("Successfully connected to Supabase")
-            return True
+            return self._create_client()
         except Exception as e:
             logger.error(f"Failed to connect to Supabase: {e}")
-            self.connected = False
-            return False
-    
-    def get_client(self) -> Optional[Client]:
-        """Get the Supabase client"""
-        if not self.connected and self.url and self.key:
-            self._connect()
-        return self.client if self.connected else None
-    
-    def is_available(self) -> bool:
-        """Check if Supabase is available and configured"""
-        return self.connected and self.client is not None
-    
+            return None
+
     def test_connection(self) -> bool:
         """Test the database connection"""
         try:
-            if not self.is_available():
-                return False
-            # Try a simple query to test connection
-            result = self.client.table('interviews').select('id').limit(1).execute()
+            with self.client() as client:
+                # Try a simple query to test connection
+                client.table('interviews').select('id').limit(1).execute()
             return True
         except Exception as e:
             logger.error(f"Database connection test failed: {e}")
             return False
 
-# Global instance - will not raise error if env vars missing
+# Global instance - no connection is made until a client is first needed
 try:
     supabase_manager = SupabaseManager()
 except Exception as e:
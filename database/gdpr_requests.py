@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Process GDPR subject access and erasure requests in bulk
+
+Takes the email addresses of many requests at once and resolves all their stored
+interviews by email hash in a few indexed queries.
+
+Usage:
+    python -m database.gdpr_requests export --emails-file requests.txt --output export.jsonl
+    python -m database.gdpr_requests erase --emails-file requests.txt
+    python -m database.gdpr_requests erase jane@example.com john@example.com
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+def read_emails(emails: List[str], emails_file: str = None) -> List[str]:
+    """Emails from the command line and from a file with one address per line"""
+    emails = list(emails)
+    if emails_file:
+        with open(emails_file) as f:
+            emails.extend(line.strip() for line in f if line.strip())
+    return emails
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export or erase stored interviews for many email addresses")
+    parser.add_argument("action", choices=["export", "erase"], help="Subject access export or erasure")
+    parser.add_argument("emails", nargs="*", help="Email addresses of the requests")
+    parser.add_argument("--emails-file", help="File with one email address per line")
+    parser.add_argument("--output", default="-", help="JSON Lines export file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=100, help="Email hashes resolved per query")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    emails = read_emails(args.emails, args.emails_file)
+    if not emails:
+        print("❌ No email addresses given", file=sys.stderr)
+        return 1
+
+    from database.models import get_interview_data_manager
+    interview_data_manager = get_interview_data_manager()
+    if not interview_data_manager or not interview_data_manager.is_available():
+        print("❌ Database not available - check DATABASE_BACKEND or SUPABASE_URL and SUPABASE_KEY", file=sys.stderr)
+        return 1
+
+    if args.action == "export":
+        output = sys.stdout if args.output == "-" else open(args.output, "w")
+        count = 0
+        try:
+            # One line per interview, written as it arrives
+            for interview in interview_data_manager.export_subject_data(emails, args.chunk_size):
+                output.write(json.dumps(interview, default=str) + "\n")
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        print(f"📦 Exported {count} interviews for {len(emails)} requests", file=sys.stderr)
+    else:
+        deleted = interview_data_manager.erase_subject_data(emails, args.chunk_size)
+        print(f"🗑️ Erased {sum(deleted.values())} interviews for {len(emails)} requests "
+              f"({sum(1 for count in deleted.values() if count)} with stored data)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
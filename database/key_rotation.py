@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Re-encrypt every stored interview under the current primary encryption key
+
+Pages through candidate_info and questions_answers by primary key (keyset pagination),
+re-encrypts values that are not already under the primary key in a process pool, and
+writes each page back in one bulk upsert. Progress is checkpointed after every page,
+so an interrupted run resumes where it stopped, and the job throttles itself to a
+maximum row rate so it does not starve live traffic.
+
+Usage:
+    python -m database.key_rotation --rotate      # add a new primary key, then re-encrypt
+    python -m database.key_rotation               # re-encrypt under the current primary key
+    python -m database.key_rotation --retire      # also drop old keys once everything is done
+
+Only the Supabase tables are re-encrypted. --retire refuses to drop old keys while this
+host's local stores (the SQLite interview database, pending outbox entries and session
+snapshots) still hold values under them; let snapshots expire and the outbox drain first.
+
+Running app processes reload the key file the first time they read a value under a key
+they do not know, so re-encrypted rows stay readable. They keep encrypting under their
+loaded primary key, though: restart them after --rotate so new data is written under the
+new key, and before --retire so nothing is left under an old one.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_CONFIG, OUTBOX_CONFIG
+from security.encryption import get_data_encryption
+from security.envelope import is_envelope, envelope_key_id
+from security.key_ring import get_key_ring
+
+logger = logging.getLogger(__name__)
+
+# Encrypted columns per table
+ENCRYPTED_COLUMNS = {
+    "candidate_info": ["encrypted_name", "encrypted_email", "encrypted_phone", "encrypted_location"],
+    "questions_answers": ["encrypted_answer"]
+}
+
+# Columns stored compress-then-encrypt (see InterviewDataManager._build_questions_answers)
+COMPRESSED_COLUMNS = {"encrypted_answer"}
+
+DEFAULT_CHECKPOINT = "key_rotation_checkpoint.json"
+
+def needs_reencryption(value: Optional[str], primary_key_id: str) -> bool:
+    """Check if a stored value is not yet under the primary key (header check only for envelopes)"""
+    if not value:
+        return False
+    return not (is_envelope(value) and envelope_key_id(value) == primary_key_id)
+
+def is_under_old_key(value: Optional[str], primary_key_id: str) -> bool:
+    """Check if a value is encrypted under a key other than the primary (legacy Fernet tokens count)"""
+    if not value or not isinstance(value, str):
+        return False
+    if is_envelope(value):
+        return envelope_key_id(value) != primary_key_id
+    # Fernet tokens start with version byte 0x80, "gAAAAA" in base64
+    return value.startswith("gAAAAA")
+
+def local_values_under_old_keys(primary_key_id: str,
+                                sqlite_path: Optional[str] = None,
+                                outbox_path: Optional[str] = None,
+                                snapshot_store=None) -> Dict[str, int]:
+    """
+    Count values under old keys in the local stores this job does not re-encrypt: the SQLite
+    interview database, outbox payloads and session snapshots (including the encrypted fields
+    inside them). Stores that do not exist are skipped.
+    """
+    counts = {}
+    if sqlite_path and os.path.exists(sqlite_path):
+        conn = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+        try:
+            counts["sqlite interviews"] = sum(
+                is_under_old_key(value, primary_key_id)
+                for table, columns in ENCRYPTED_COLUMNS.items()
+                for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table}")
+                for value in row
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not scan {sqlite_path}: {e}")
+        finally:
+            conn.close()
+
+    if outbox_path and os.path.exists(outbox_path):
+        conn = sqlite3.connect(f"file:{outbox_path}?mode=ro", uri=True)
+        try:
+            count = 0
+            for (payload,) in conn.execute("SELECT payload FROM interview_outbox"):
+                records = json.loads(payload)
+                candidate = records.get("candidate") or {}
+                count += sum(is_under_old_key(candidate.get(column), primary_key_id)
+                             for column in ENCRYPTED_COLUMNS["candidate_info"])
+                count += sum(is_under_old_key(qa.get("encrypted_answer"), primary_key_id)
+                             for qa in records.get("qa") or [])
+            counts["outbox"] = count
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not scan {outbox_path}: {e}")
+        finally:
+            conn.close()
+
+    if snapshot_store is not None:
+        encryption = snapshot_store.encryption
+        count = 0
+        for snapshot in snapshot_store.backend.iter_snapshots():
+            if is_under_old_key(snapshot, primary_key_id):
+                count += 1
+            try:
+                state = json.loads(encryption.decrypt_data(snapshot) if encryption else snapshot)
+            except ValueError:
+                continue
+            candidate_data = state.get("candidate_data") or {}
+            count += sum(is_under_old_key(candidate_data.get(field), primary_key_id)
+                         for field in state.get("encrypted_fields") or [])
+        counts["session snapshots"] = count
+
+    return {store: count for store, count in counts.items() if count}
+
+def reencrypt_rows(rows: List[Dict[str, Any]], columns: List[str]) -> List[Dict[str, Any]]:
+    """Re-encrypt the given columns of rows under the primary key. Returns only the rows that changed."""
+    encryption = get_data_encryption()
+    primary_key_id = encryption.key_ring.primary_key_id
+    compress_min_bytes = (
+        DATABASE_CONFIG.get("compression_min_bytes", 256) if DATABASE_CONFIG.get("compress_answers", True) else None
+    )
+    changed = []
+    for row in rows:
+        updated = dict(row)
+        for column in columns:
+            value = row.get(column)
+            if needs_reencryption(value, primary_key_id):
+                plaintext = encryption.decrypt_data(value)
+                if plaintext == value:
+                    # Not decryptable with any key in the ring - leave it alone rather than corrupt it
+                    logger.warning(f"Row {row.get('id')}: {column} could not be decrypted, skipped")
+                    continue
+                updated[column] = encryption.encrypt_data(
+                    plaintext, compress_min_bytes=compress_min_bytes if column in COMPRESSED_COLUMNS else None
+                )
+        if updated != row:
+            changed.append(updated)
+    return changed
+
+class Checkpoint:
+    """Last processed ID per table, stored as JSON so a run can resume"""
+
+    def __init__(self, path: str, key_id: str):
+        self.path = path
+        self.data = {"key_id": key_id, "tables": {}, "rows_updated": 0}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            # A checkpoint for a different primary key is stale - start over
+            if saved.get("key_id") == key_id:
+                self.data = saved
+
+    def last_id(self, table: str) -> Optional[str]:
+        return self.data["tables"].get(table, {}).get("last_id")
+
+    def is_done(self, table: str) -> bool:
+        return self.data["tables"].get(table, {}).get("done", False)
+
+    def advance(self, table: str, last_id: Optional[str], rows_updated: int, done: bool = False) -> None:
+        """Record progress and write the checkpoint atomically"""
+        self.data["tables"][table] = {"last_id": last_id, "done": done}
+        self.data["rows_updated"] += rows_updated
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+class KeyRotationJob:
+    """Stream all encrypted rows through re-encryption under the primary key"""
+
+    def __init__(self, client, checkpoint: Checkpoint, batch_size: int = 500, workers: int = 2,
+                 max_rows_per_second: float = 200):
+        self.client = client
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_rows_per_second = max_rows_per_second
+
+    def _fetch_page(self, table: str, after_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Next page ordered by ID, starting after the last processed ID"""
+        query = self.client.table(table).select("*").order("id").limit(self.batch_size)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        return query.execute().data or []
+
+    def _reencrypt_page(self, pool, rows: List[Dict[str, Any]], columns: List[str]) -> List[Dict[str, Any]]:
+        """Split a page across the worker processes"""
+        if pool is None:
+            return reencrypt_rows(rows, columns)
+        chunk_size = max(1, len(rows) // self.workers)
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        changed = []
+        for result in pool.map(reencrypt_rows, chunks, [columns] * len(chunks)):
+            changed.extend(result)
+        return changed
+
+    def _throttle(self, rows: int, started: float) -> None:
+        """Sleep so the job stays under max_rows_per_second"""
+        if self.max_rows_per_second:
+            remaining = rows / self.max_rows_per_second - (time.time() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def run_table(self, table: str, pool=None) -> int:
+        """Re-encrypt one table. Returns the number of rows updated."""
+        if self.checkpoint.is_done(table):
+            logger.info(f"{table}: already done")
+            return 0
+
+        columns = ENCRYPTED_COLUMNS[table]
+        last_id = self.checkpoint.last_id(table)
+        updated_total = 0
+        while True:
+            started = time.time()
+            rows = self._fetch_page(table, last_id)
+            if not rows:
+                self.checkpoint.advance(table, last_id, 0, done=True)
+                break
+
+            changed = self._reencrypt_page(pool, rows, columns)
+            if changed:
+                # One bulk write per page
+                self.client.table(table).upsert(changed).execute()
+
+            last_id = rows[-1]["id"]
+            updated_total += len(changed)
+            self.checkpoint.advance(table, last_id, len(changed))
+            logger.info(f"{table}: {len(rows)} rows scanned, {len(changed)} re-encrypted (up to id {last_id})")
+            self._throttle(len(rows), started)
+
+        logger.info(f"{table}: done, {updated_total} rows re-encrypted")
+        return updated_total
+
+    def run(self) -> int:
+        """Re-encrypt every table. Returns the number of rows updated."""
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            return sum(self.run_table(table, pool) for table in ENCRYPTED_COLUMNS)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Re-encrypt stored interviews under the primary encryption key")
+    parser.add_argument("--rotate", action="store_true", help="Generate a new primary key before re-encrypting")
+    parser.add_argument("--retire", action="store_true", help="Retire all non-primary keys after a complete run")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per page and per bulk write")
+    parser.add_argument("--workers", type=int, default=2, help="Re-encryption processes (1 runs inline)")
+    parser.add_argument("--max-rows-per-second", type=float, default=200, help="Throttle, 0 for unlimited")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress file used to resume")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+
+    from database.connection import supabase_manager
+    client = supabase_manager.get_client() if supabase_manager else None
+    if client is None:
+        print("❌ Database not configured - set SUPABASE_URL and SUPABASE_KEY")
+        return 1
+
+    key_ring = get_key_ring()
+    if args.rotate:
+        print(f"🔑 New primary key: {key_ring.rotate()} (restart the app so it encrypts with it)")
+
+    checkpoint = Checkpoint(args.checkpoint, key_ring.primary_key_id)
+    job = KeyRotationJob(client, checkpoint, args.batch_size, args.workers, args.max_rows_per_second)
+    updated = job.run()
+    print(f"✅ Re-encrypted {checkpoint.data['rows_updated']} rows under key {key_ring.primary_key_id} "
+          f"({updated} in this run)")
+
+    if args.retire:
+        from session_store import session_store
+        leftovers = local_values_under_old_keys(
+            key_ring.primary_key_id, DATABASE_CONFIG.get("sqlite_path"), OUTBOX_CONFIG.get("path"), session_store
+        )
+        if leftovers:
+            print(f"❌ Not retiring old keys - local stores still hold values under them: {leftovers}. "
+                  "Let session snapshots expire and the outbox drain (interviews stored in SQLite "
+                  "are not re-encrypted by this job), then run --retire again.")
+            return 1
+        for old_key_id in list(key_ring.keys)[1:]:
+            key_ring.retire(old_key_id)
+        print("🗑️ Retired old keys")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
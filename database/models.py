@@ -1,39 +1,64 @@
 """
 Database models and operations for interview data storage
 """
-import json
+import re
+import copy
+import uuid
 import logging
-from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
-from security.encryption import DataEncryption
-from database.connection import supabase_manager
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from config import DATABASE_CONFIG, OUTBOX_CONFIG
+from security.encryption import get_data_encryption
+from database.storage import InterviewStorage, create_storage
+from database.outbox import create_outbox
+from result_store import ResultStore
 
 logger = logging.getLogger(__name__)
 
+# Questions are asked as "[Technology] question text" (see session_manager.record_tech_question)
+QUESTION_TECHNOLOGY_PATTERN = re.compile(r'^\s*\[([^\]]+)\]\s*(.*)$', re.DOTALL)
+
+def split_question_technology(question: str) -> Tuple[Optional[str], str]:
+    """Split the "[Technology]" prefix off a question. Returns (technology or None, question text)."""
+    match = QUESTION_TECHNOLOGY_PATTERN.match(question or '')
+    if not match:
+        return None, question or ''
+    return match.group(1).strip(), match.group(2)
+
+# Histogram columns of the skill_rollups table, by score
+SCORE_COLUMNS = {score: f'score_{score}' for score in range(1, 6)}
+
 class InterviewDataManager:
-    """Manage interview data storage in Supabase with encryption"""
+    """Manage interview data storage with encryption (Supabase or local SQLite)"""
     
-    def __init__(self):
-        self.encryption = DataEncryption()
-        self.supabase_manager = supabase_manager
-        self.client = None
-        
-        if self.supabase_manager and self.supabase_manager.is_available():
-            self.client = self.supabase_manager.get_client()
+    def __init__(self, storage: Optional[InterviewStorage] = None):
+        self.encryption = get_data_encryption()
+        self.storage = storage if storage is not None else create_storage(DATABASE_CONFIG)
+        self.outbox = None
+        # Decoded interviews for repeated reads (decrypted data, memory only)
+        self.interview_cache = ResultStore(
+            max_entries=DATABASE_CONFIG.get("interview_cache_entries", 200),
+            max_bytes=DATABASE_CONFIG.get("interview_cache_bytes", 8 * 1024 * 1024),
+            ttl_seconds=DATABASE_CONFIG.get("interview_cache_ttl_seconds", 300)
+        )
     
     def is_available(self) -> bool:
         """Check if database storage is available"""
-        return (self.supabase_manager is not None and 
-                self.supabase_manager.is_available() and 
-                self.client is not None)
+        return self.storage is not None and self.storage.is_available()
     
     def save_complete_interview(self, 
                               candidate_data: Dict[str, Any],
                               qa_pairs: List[Dict[str, str]],
                               ratings: Dict[str, int],
-                              overall_rating: str) -> Optional[str]:
+                              overall_rating: str,
+                              interview_id: Optional[str] = None) -> Optional[str]:
         """
-        Save complete interview data to Supabase after encryption
+        Save complete interview data after encryption
+        
+        All rows get client-generated IDs and are written in a single transaction
+        (the save_interview stored function on Supabase): no partial rows. Saving an
+        interview ID that already exists is a no-op.
         
         Returns: interview_id if successful, None if failed
         """
@@ -42,22 +67,9 @@ class InterviewDataManager:
             return None
             
         try:
-            # Create interview record
-            interview_id = self._create_interview_record(candidate_data, overall_rating)
-            
-            if not interview_id:
-                logger.error("Failed to create interview record")
-                return None
-            
-            # Save candidate personal info (encrypted)
-            self._save_candidate_info(interview_id, candidate_data)
-            
-            # Save questions and answers
-            self._save_questions_answers(interview_id, qa_pairs)
-            
-            # Save ratings
-            self._save_ratings(interview_id, ratings)
-            
+            records = self.build_interview_records(candidate_data, qa_pairs, ratings, overall_rating, interview_id)
+            self.save_interview_records(records)
+            interview_id = records['interview']['id']
             logger.info(f"Successfully saved complete interview data with ID: {interview_id}")
             return interview_id
             
@@ -67,188 +79,356 @@ class InterviewDataManager:
             logger.error(traceback.format_exc())
             return None
     
-    def _create_interview_record(self, candidate_data: Dict[str, Any], overall_rating: str) -> Optional[str]:
-        """Create main interview record"""
+    def queue_complete_interview(self,
+                                 interview_id: str,
+                                 candidate_data: Dict[str, Any],
+                                 qa_pairs: List[Dict[str, str]],
+                                 ratings: Dict[str, int],
+                                 overall_rating: str) -> Optional[str]:
+        """
+        Durably queue a complete interview in the local outbox and return at once;
+        the outbox worker writes it to the database. The interview ID is the outbox
+        idempotency key, so queueing the same interview twice saves it only once.
+        
+        Returns: interview_id if queued (or saved directly without an outbox), None if failed
+        """
+        if self.outbox is None:
+            return self.save_complete_interview(candidate_data, qa_pairs, ratings, overall_rating, interview_id)
+        
         try:
-            # Hash email for unique identification without storing plaintext
-            email_hash = self.encryption.hash_email(candidate_data.get('email', ''))
-            
-            interview_data = {
-                'email_hash': email_hash,
-                'overall_rating': overall_rating,
-                'tech_stack': candidate_data.get('tech_stack', ''),
-                'experience_years': candidate_data.get('experience', ''),
-                'position': candidate_data.get('position', ''),
-                'interview_date': datetime.now(timezone.utc).isoformat(),
-                'status': 'completed'
-            }
-            
-            result = self.client.table('interviews').insert(interview_data).execute()
-            
-            if result.data and len(result.data) > 0:
-                return result.data[0]['id']
-            else:
-                logger.error("No data returned from interview insert")
-                return None
-                
+            interview_id = interview_id or str(uuid.uuid4())
+            records = self.build_interview_records(candidate_data, qa_pairs, ratings, overall_rating, interview_id)
+            if not self.outbox.append(interview_id, records):
+                logger.info(f"Interview {interview_id} is already queued")
+            return interview_id
         except Exception as e:
-            logger.error(f"Error creating interview record: {e}")
+            logger.error(f"Error queueing interview data: {e}")
             return None
     
-    def _save_candidate_info(self, interview_id: str, candidate_data: Dict[str, Any]) -> bool:
-        """Save encrypted candidate personal information"""
+    def save_interview_records(self, records: Dict[str, Any]) -> None:
+        """Write prebuilt interview records in one transaction (raises on failure)"""
         try:
-            # Encrypt sensitive personal data
-            encrypted_name = self.encryption.encrypt_data(candidate_data.get('name', ''))
-            encrypted_email = self.encryption.encrypt_data(candidate_data.get('email', ''))
-            encrypted_phone = self.encryption.encrypt_data(candidate_data.get('phone', ''))
-            encrypted_location = self.encryption.encrypt_data(candidate_data.get('location', ''))
+            self.storage.save_interview_records(records)
+        finally:
+            self.invalidate_cached_interview(records['interview']['id'])
+    
+    def build_interview_records(self,
+                                candidate_data: Dict[str, Any],
+                                qa_pairs: List[Dict[str, str]],
+                                ratings: Dict[str, int],
+                                overall_rating: str,
+                                interview_id: Optional[str] = None) -> Dict[str, Any]:
+        """Build every row of an interview, encrypted and with client-generated IDs"""
+        interview_id = interview_id or str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            'interview': self._build_interview_record(interview_id, candidate_data, overall_rating, now),
+            'candidate': self._build_candidate_info(interview_id, candidate_data, now),
+            'qa': self._build_questions_answers(interview_id, qa_pairs, now),
+            'ratings': self._build_ratings(interview_id, ratings, now)
+        }
+    
+    def _build_interview_record(self, interview_id: str, candidate_data: Dict[str, Any],
+                                overall_rating: str, now: str) -> Dict[str, Any]:
+        """Main interview record"""
+        # Keyed blind indexes for lookups without storing plaintext
+        email_hash = self.encryption.hash_email(candidate_data.get('email', ''))
+        phone_hash = self.encryption.hash_phone(candidate_data.get('phone', ''))
+        
+        return {
+            'id': interview_id,
+            'email_hash': email_hash,
+            'phone_hash': phone_hash,
+            'overall_rating': overall_rating,
+            'tech_stack': candidate_data.get('tech_stack', ''),
+            'experience_years': candidate_data.get('experience', ''),
+            'position': candidate_data.get('position', ''),
+            'interview_date': now,
+            'status': 'completed'
+        }
+    
+    def _build_candidate_info(self, interview_id: str, candidate_data: Dict[str, Any], now: str) -> Dict[str, Any]:
+        """Encrypted candidate personal information"""
+        return {
+            'id': str(uuid.uuid4()),
+            'interview_id': interview_id,
+            'encrypted_name': self.encryption.encrypt_data(candidate_data.get('name', '')),
+            'encrypted_email': self.encryption.encrypt_data(candidate_data.get('email', '')),
+            'encrypted_phone': self.encryption.encrypt_data(candidate_data.get('phone', '')),
+            'encrypted_location': self.encryption.encrypt_data(candidate_data.get('location', '')),
+            'created_at': now
+        }
+    
+    def _build_questions_answers(self, interview_id: str, qa_pairs: List[Dict[str, str]], now: str) -> List[Dict[str, Any]]:
+        """Question records with encrypted answers"""
+        qa_records = []
+        compress_min_bytes = (
+            DATABASE_CONFIG.get("compression_min_bytes", 256) if DATABASE_CONFIG.get("compress_answers", True) else None
+        )
+        
+        for i, qa_pair in enumerate(qa_pairs):
+            answer_text = qa_pair.get('answer', '')
+            technology, question_text = split_question_technology(qa_pair.get('question', ''))
             
-            candidate_info = {
+            qa_records.append({
+                'id': str(uuid.uuid4()),
                 'interview_id': interview_id,
-                'encrypted_name': encrypted_name,
-                'encrypted_email': encrypted_email,
-                'encrypted_phone': encrypted_phone,
-                'encrypted_location': encrypted_location,
-                'created_at': datetime.now(timezone.utc).isoformat()
-            }
-            
-            result = self.client.table('candidate_info').insert(candidate_info).execute()
-            
-            if result.data:
-                logger.info(f"Successfully saved encrypted candidate info for interview {interview_id}")
-                return True
-            else:
-                logger.error("Failed to save candidate info")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error saving candidate info: {e}")
-            return False
+                'question_number': i + 1,
+                'question_text': question_text,
+                # Encrypt the answer (questions are not sensitive), compressing long ones first
+                'encrypted_answer': self.encryption.encrypt_data(answer_text, compress_min_bytes=compress_min_bytes),
+                'technology': (qa_pair.get('technology') or technology or 'general')[:100],
+                'asked_at': now
+            })
+        return qa_records
+    
+    @staticmethod
+    def _build_ratings(interview_id: str, ratings: Dict[str, int], now: str) -> List[Dict[str, Any]]:
+        """Skill rating records, scores clamped to 1-5 so one bad score cannot fail the whole save"""
+        records = []
+        for skill, score in ratings.items():
+            try:
+                score = min(max(int(score), 1), 5)
+            except (TypeError, ValueError):
+                logger.warning(f"Dropping non-numeric rating for {skill}: {score!r}")
+                continue
+            records.append({
+                'id': str(uuid.uuid4()),
+                'interview_id': interview_id,
+                'skill_name': skill,
+                'score': score,
+                'max_score': 5,
+                'created_at': now
+            })
+        return records
     
-    def _save_questions_answers(self, interview_id: str, qa_pairs: List[Dict[str, str]]) -> bool:
-        """Save all questions and answers"""
+    def get_interview_by_id(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve and decrypt interview data by ID (cached; one query with embedded related rows)"""
         try:
-            qa_records = []
+            cached = self.interview_cache.get(interview_id)
+            if cached is not None:
+                # Erasure and retention purges may run in another process; never serve a deleted interview
+                if self.storage.interview_exists(interview_id):
+                    return copy.deepcopy(cached)
+                self.invalidate_cached_interview(interview_id)
+                return None
             
-            for i, qa_pair in enumerate(qa_pairs):
-                question_text = qa_pair.get('question', '')
-                answer_text = qa_pair.get('answer', '')
-                technology = qa_pair.get('technology', 'general')
-                
-                # Encrypt the answer (questions are not sensitive)
-                encrypted_answer = self.encryption.encrypt_data(answer_text)
-                
-                qa_record = {
-                    'interview_id': interview_id,
-                    'question_number': i + 1,
-                    'question_text': question_text,
-                    'encrypted_answer': encrypted_answer,
-                    'technology': technology,
-                    'asked_at': datetime.now(timezone.utc).isoformat()
-                }
-                qa_records.append(qa_record)
+            row = self.storage.fetch_interview(interview_id)
+            if row is None:
+                return None
+            
+            interview_data = self._decode_interview(row)
+            self.interview_cache.put(interview_id, interview_data)
+            return copy.deepcopy(interview_data)
             
-            if qa_records:
-                result = self.client.table('questions_answers').insert(qa_records).execute()
-                
-                if result.data:
-                    logger.info(f"Successfully saved {len(qa_records)} Q&A pairs for interview {interview_id}")
-                    return True
-                else:
-                    logger.error("Failed to save questions and answers")
-                    return False
-            else:
-                logger.warning("No Q&A pairs to save")
-                return True
-                
         except Exception as e:
-            logger.error(f"Error saving questions and answers: {e}")
-            return False
+            logger.error(f"Error retrieving interview data: {e}")
+            return None
     
-    def _save_ratings(self, interview_id: str, ratings: Dict[str, int]) -> bool:
-        """Save skill ratings"""
-        try:
-            rating_records = []
-            
-            for skill, score in ratings.items():
-                rating_record = {
-                    'interview_id': interview_id,
-                    'skill_name': skill,
-                    'score': score,
-                    'max_score': 5,
-                    'created_at': datetime.now(timezone.utc).isoformat()
+    def _decode_interview(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn an interview row with embedded related rows into decrypted interview data"""
+        interview_data = dict(row)
+        candidate_rows = interview_data.pop('candidate_info', None) or []
+        qa_rows = interview_data.pop('questions_answers', None) or []
+        rating_rows = interview_data.pop('skill_ratings', None) or []
+        
+        # Decrypt candidate info
+        if candidate_rows:
+            candidate_info = candidate_rows[0]
+            interview_data['candidate_info'] = {
+                'name': self.encryption.decrypt_data(candidate_info['encrypted_name']),
+                'email': self.encryption.decrypt_data(candidate_info['encrypted_email']),
+                'phone': self.encryption.decrypt_data(candidate_info['encrypted_phone']),
+                'location': self.encryption.decrypt_data(candidate_info['encrypted_location'])
+            }
+        
+        # Questions and decrypted answers in the order they were asked
+        if qa_rows:
+            interview_data['qa_pairs'] = [
+                {
+                    'question': qa['question_text'],
+                    'answer': self.encryption.decrypt_data(qa['encrypted_answer']),
+                    'technology': qa['technology']
                 }
-                rating_records.append(rating_record)
-            
-            if rating_records:
-                result = self.client.table('skill_ratings').insert(rating_records).execute()
-                
-                if result.data:
-                    logger.info(f"Successfully saved {len(rating_records)} skill ratings for interview {interview_id}")
-                    return True
-                else:
-                    logger.error("Failed to save skill ratings")
-                    return False
-            else:
-                logger.warning("No ratings to save")
-                return True
-                
+                for qa in sorted(qa_rows, key=lambda qa: qa['question_number'])
+            ]
+        
+        # Ratings
+        if rating_rows:
+            interview_data['ratings'] = {rating['skill_name']: rating['score'] for rating in rating_rows}
+        
+        return interview_data
+    
+    def list_interviews_page(self,
+                             after: Optional[Tuple[str, str]] = None,
+                             page_size: int = 200,
+                             overall_rating: Optional[str] = None,
+                             position: Optional[str] = None,
+                             technology: Optional[str] = None,
+                             include_details: bool = False) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, str]]]:
+        """
+        One page of interviews, newest first, using keyset pagination on (interview_date, id)
+        
+        Pass the returned cursor as `after` to get the next page; it is None after the last page.
+        With include_details the candidate info, Q&A and ratings are embedded and decrypted.
+        """
+        rows = self.storage.list_interview_rows(
+            after, page_size, overall_rating=overall_rating, position=position,
+            technology=technology, include_details=include_details
+        )
+        
+        interviews = [self._decode_interview(row) for row in rows] if include_details else rows
+        cursor = (rows[-1]['interview_date'], rows[-1]['id']) if len(rows) == page_size else None
+        return interviews, cursor
+    
+    def iter_interviews(self, page_size: int = 200, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every matching interview page by page (see list_interviews_page for filters)
+        
+        Only one page is held in memory at a time, so exports can walk the whole table.
+        """
+        cursor = None
+        while True:
+            interviews, cursor = self.list_interviews_page(after=cursor, page_size=page_size, **filters)
+            yield from interviews
+            if cursor is None:
+                break
+    
+    def get_skill_analytics(self,
+                            technology: Optional[str] = None,
+                            position: Optional[str] = None,
+                            since: Optional[str] = None,
+                            by_week: bool = True) -> List[Dict[str, Any]]:
+        """
+        Skill score statistics from the precomputed rollups (no scan of the raw ratings)
+        
+        Each entry has the technology, position, rating count, mean score and a histogram
+        of scores; with by_week it is per week (week_start), otherwise summed over all weeks
+        since the given ISO date.
+        """
+        try:
+            rows = self.storage.fetch_skill_rollups(technology=technology, position=position, since=since)
         except Exception as e:
-            logger.error(f"Error saving ratings: {e}")
-            return False
+            logger.error(f"Error retrieving skill analytics: {e}")
+            return []
+        
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            key = (row['technology'], row['position'], row['week_start'] if by_week else None)
+            group = groups.setdefault(key, {
+                'technology': row['technology'],
+                'position': row['position'],
+                'rating_count': 0,
+                'score_sum': 0,
+                'histogram': {score: 0 for score in SCORE_COLUMNS}
+            })
+            if by_week:
+                group['week_start'] = row['week_start']
+            group['rating_count'] += row['rating_count']
+            group['score_sum'] += row['score_sum']
+            for score, column in SCORE_COLUMNS.items():
+                group['histogram'][score] += row[column]
+        
+        analytics = list(groups.values())
+        for group in analytics:
+            group['mean_score'] = round(group.pop('score_sum') / group['rating_count'], 2) if group['rating_count'] else None
+        return analytics
     
-    def get_interview_by_id(self, interview_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve and decrypt interview data by ID"""
+    def find_returning_candidate(self, email: str, phone: Optional[str] = None,
+                                 lookback_days: int = 90) -> Optional[Dict[str, Any]]:
+        """
+        Most recent completed interview of a candidate within the lookback period, matched
+        on the email or phone blind index in one query. Nothing is fetched or decrypted beyond
+        {'id', 'email_match'} (whether the email, not just the phone, matched). None if there is none.
+        """
+        if not self.is_available() or not email:
+            return None
+        since = (datetime.now(timezone.utc) - timedelta(days=lookback_days)).isoformat()
+        email_hash = self.encryption.hash_email(email)
         try:
-            # Get main interview data
-            interview_result = self.client.table('interviews').select('*').eq('id', interview_id).execute()
-            
-            if not interview_result.data:
-                return None
-            
-            interview_data = interview_result.data[0]
-            
-            # Get and decrypt candidate info
-            candidate_result = self.client.table('candidate_info').select('*').eq('interview_id', interview_id).execute()
-            if candidate_result.data:
-                candidate_info = candidate_result.data[0]
-                interview_data['candidate_info'] = {
-                    'name': self.encryption.decrypt_data(candidate_info['encrypted_name']),
-                    'email': self.encryption.decrypt_data(candidate_info['encrypted_email']),
-                    'phone': self.encryption.decrypt_data(candidate_info['encrypted_phone']),
-                    'location': self.encryption.decrypt_data(candidate_info['encrypted_location'])
-                }
-            
-            # Get questions and answers
-            qa_result = self.client.table('questions_answers').select('*').eq('interview_id', interview_id).order('question_number').execute()
-            if qa_result.data:
-                qa_pairs = []
-                for qa in qa_result.data:
-                    qa_pairs.append({
-                        'question': qa['question_text'],
-                        'answer': self.encryption.decrypt_data(qa['encrypted_answer']),
-                        'technology': qa['technology']
-                    })
-                interview_data['qa_pairs'] = qa_pairs
-            
-            # Get ratings
-            ratings_result = self.client.table('skill_ratings').select('*').eq('interview_id', interview_id).execute()
-            if ratings_result.data:
-                ratings = {}
-                for rating in ratings_result.data:
-                    ratings[rating['skill_name']] = rating['score']
-                interview_data['ratings'] = ratings
-            
-            return interview_data
-            
+            row = self.storage.find_latest_interview(
+                email_hash, self.encryption.hash_phone(phone) if phone else None, since
+            )
         except Exception as e:
-            logger.error(f"Error retrieving interview data: {e}")
+            logger.error(f"Error looking up returning candidate: {e}")
             return None
+        return {'id': row['id'], 'email_match': row['email_hash'] == email_hash} if row else None
+    
+    def _email_hash_chunks(self, emails: List[str], chunk_size: int) -> Iterator[Dict[str, str]]:
+        """Distinct email hashes of the addresses, as {email_hash: email} chunks"""
+        subjects = {self.encryption.hash_email(email): email for email in emails if email and email.strip()}
+        hashes = list(subjects)
+        for start in range(0, len(hashes), chunk_size):
+            yield {email_hash: subjects[email_hash] for email_hash in hashes[start:start + chunk_size]}
+    
+    def export_subject_data(self, emails: List[str], chunk_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every stored interview of the given email addresses, decrypted (subject access requests)
+        
+        Emails are hashed like at save time and resolved with one email_hash query per chunk,
+        so hundreds of requests take a handful of queries. Each interview carries 'subject_email'.
+        """
+        for subjects in self._email_hash_chunks(emails, chunk_size):
+            for row in self.storage.find_interviews_by_email_hashes(list(subjects), include_details=True):
+                interview = self._decode_interview(row)
+                interview['subject_email'] = subjects[row['email_hash']]
+                yield interview
+    
+    def erase_subject_data(self, emails: List[str], chunk_size: int = 100) -> Dict[str, int]:
+        """
+        Delete every stored interview of the given email addresses (erasure requests), including
+        interviews still waiting in the outbox. Returns the number of interviews deleted per email.
+        """
+        deleted = {email: 0 for email in emails}
+        for subjects in self._email_hash_chunks(emails, chunk_size):
+            rows = self.storage.find_interviews_by_email_hashes(list(subjects))
+            interview_ids = [row['id'] for row in rows]
+            self.storage.delete_interviews(interview_ids)
+            for row in rows:
+                deleted[subjects[row['email_hash']]] += 1
+                self.invalidate_cached_interview(row['id'])
+            if self.outbox is not None:
+                self.outbox.discard_email_hashes(list(subjects))
+        logger.info(f"Erased {sum(deleted.values())} interviews for {len(emails)} erasure requests")
+        return deleted
+    
+    def invalidate_cached_interview(self, interview_id: str) -> None:
+        """Drop an interview from the read cache after it was written or deleted"""
+        self.interview_cache.invalidate(interview_id)
+
+def _create_interview_data_manager() -> Optional[InterviewDataManager]:
+    """Create the manager and, for remote storage, its write-behind outbox"""
+    try:
+        manager = InterviewDataManager()
+    except Exception as e:
+        logger.error(f"Failed to create InterviewDataManager: {e}")
+        return None
+    
+    # Write-behind outbox, flushed to the database by a background worker
+    # (remote databases only - a local SQLite write is already durable and fast)
+    if manager.is_available() and manager.storage.remote:
+        try:
+            manager.outbox = create_outbox(OUTBOX_CONFIG, manager.save_interview_records)
+        except Exception as e:
+            logger.error(f"Failed to create interview outbox, saving directly: {e}")
+    return manager
+
+_interview_data_manager = None
+_interview_data_manager_created = False
+_interview_data_manager_lock = threading.Lock()
+
+def get_interview_data_manager() -> Optional[InterviewDataManager]:
+    """Get the process-wide interview data manager, creating it on first use (None if that failed)"""
+    global _interview_data_manager, _interview_data_manager_created
+    if not _interview_data_manager_created:
+        with _interview_data_manager_lock:
+            if not _interview_data_manager_created:
+                _interview_data_manager = _create_interview_data_manager()
+                _interview_data_manager_created = True
+    return _interview_data_manager
 
-# Global instance - will be available even if database is not configured
-try:
-    interview_data_manager = InterviewDataManager()
-except Exception as e:
-    logger.error(f"Failed to create InterviewDataManager: {e}")
-    interview_data_manager = None
+def __getattr__(name):
+    # `from database.models import interview_data_manager` keeps working, created on first access
+    if name == 'interview_data_manager':
+        return get_interview_data_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,203 @@
+"""
+Durable write-behind outbox for completed interviews
+
+Interviews are appended to a local SQLite database (WAL mode) and acknowledged at once;
+a background worker flushes them to the database in batches, retrying with exponential
+backoff. Each entry is keyed by its interview ID, generated once per interview in the
+session state, so a retried or duplicated save never creates a second interview.
+Entries that still fail after max_attempts are parked: kept on disk, but no longer
+retried or counted against the batch size until they are requeued.
+"""
+import json
+import time
+import random
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class InterviewOutbox:
+    """Append-only queue of interview records waiting to be written to the database"""
+
+    def __init__(self, path: str, base_backoff_seconds: float = 5, max_backoff_seconds: float = 600,
+                 max_attempts: int = 20):
+        self.path = path
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS interview_outbox ("
+            "idempotency_key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, last_error TEXT, "
+            "status TEXT NOT NULL DEFAULT 'pending')"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(interview_outbox)")}
+        if "status" not in columns:
+            # Outbox files from before parking existed
+            self._conn.execute("ALTER TABLE interview_outbox ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'")
+        self._conn.execute("DROP INDEX IF EXISTS idx_interview_outbox_due")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_interview_outbox_status_due ON interview_outbox(status, next_attempt_at)"
+        )
+        self._conn.commit()
+
+    def append(self, idempotency_key: str, records: Dict[str, Any]) -> bool:
+        """Durably queue records. Returns False if this key is already queued."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO interview_outbox (idempotency_key, payload, created_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?)",
+                (idempotency_key, json.dumps(records), now, now)
+            )
+            self._conn.commit()
+        self._wakeup.set()
+        return cursor.rowcount == 1
+
+    def due(self, limit: int) -> List[Tuple[str, Dict[str, Any], int]]:
+        """Entries whose next attempt is due, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idempotency_key, payload, attempts FROM interview_outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [(key, json.loads(payload), attempts) for key, payload, attempts in rows]
+
+    def mark_done(self, keys: List[str]) -> None:
+        """Remove flushed entries"""
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM interview_outbox WHERE idempotency_key = ?", [(key,) for key in keys])
+            self._conn.commit()
+
+    def mark_failed(self, key: str, attempts: int, error: str) -> Optional[float]:
+        """
+        Schedule a retry with exponential backoff and jitter. Returns the delay, or None
+        if the entry used up max_attempts and was parked instead.
+        """
+        if attempts + 1 >= self.max_attempts:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE interview_outbox SET attempts = ?, last_error = ?, status = 'parked' WHERE idempotency_key = ?",
+                    (attempts + 1, error[:500], key)
+                )
+                self._conn.commit()
+            return None
+        delay = min(self.base_backoff_seconds * 2 ** attempts, self.max_backoff_seconds)
+        delay *= random.uniform(0.8, 1.2)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE interview_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE idempotency_key = ?",
+                (attempts + 1, time.time() + delay, error[:500], key)
+            )
+            self._conn.commit()
+        return delay
+
+    def parked(self) -> List[Tuple[str, int, str]]:
+        """(key, attempts, last error) of entries that are no longer retried"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT idempotency_key, attempts, last_error FROM interview_outbox WHERE status = 'parked' "
+                "ORDER BY created_at"
+            ).fetchall()
+
+    def requeue_parked(self) -> int:
+        """Retry all parked entries from scratch (after fixing their cause). Returns the number requeued."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE interview_outbox SET status = 'pending', attempts = 0, next_attempt_at = ? "
+                "WHERE status = 'parked'",
+                (time.time(),)
+            )
+            self._conn.commit()
+        self._wakeup.set()
+        return cursor.rowcount
+
+    def discard_email_hashes(self, email_hashes: List[str]) -> int:
+        """Drop queued interviews of the given email hashes (erasure requests). Returns the number dropped."""
+        wanted = set(email_hashes)
+        with self._lock:
+            keys = [
+                key for key, payload in self._conn.execute("SELECT idempotency_key, payload FROM interview_outbox")
+                if json.loads(payload).get("interview", {}).get("email_hash") in wanted
+            ]
+            self._conn.executemany("DELETE FROM interview_outbox WHERE idempotency_key = ?", [(key,) for key in keys])
+            self._conn.commit()
+        return len(keys)
+
+    def pending_count(self) -> int:
+        """Number of entries still being retried (parked entries are not counted)"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM interview_outbox WHERE status = 'pending'").fetchone()[0]
+
+    def flush(self, save: Callable[[Dict[str, Any]], None], batch_size: int = 20) -> int:
+        """Write due entries with save(records). Returns the number flushed."""
+        flushed = []
+        for key, records, attempts in self.due(batch_size):
+            try:
+                save(records)
+                flushed.append(key)
+            except Exception as e:
+                delay = self.mark_failed(key, attempts, str(e))
+                if delay is None:
+                    logger.error(f"Outbox entry {key[:8]} failed {attempts + 1} times, parked until requeued: {e}")
+                else:
+                    logger.warning(f"Outbox entry {key[:8]} failed (attempt {attempts + 1}), retrying in {delay:.0f}s: {e}")
+        self.mark_done(flushed)
+        if flushed:
+            logger.info(f"Flushed {len(flushed)} interviews from the outbox")
+        return len(flushed)
+
+    def start_worker(self, save: Callable[[Dict[str, Any]], None], interval_seconds: float = 5,
+                     batch_size: int = 20) -> None:
+        """Flush in the background: right after each append, and every interval for retries"""
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._flush_forever, args=(save, interval_seconds, batch_size),
+                name="interview-outbox", daemon=True
+            )
+            self._worker.start()
+
+    def _flush_forever(self, save, interval_seconds: float, batch_size: int) -> None:
+        while True:
+            self._wakeup.wait(interval_seconds)
+            self._wakeup.clear()
+            try:
+                # Keep going while full batches come back, then wait for more work
+                while self.flush(save, batch_size) == batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Outbox worker failed: {e}")
+
+def create_outbox(config: Dict[str, Any], save: Optional[Callable[[Dict[str, Any]], None]]) -> Optional[InterviewOutbox]:
+    """Create the outbox and start its worker as configured"""
+    if not config.get("enabled", True):
+        return None
+    outbox = InterviewOutbox(
+        config.get("path", "interview_outbox.db"),
+        base_backoff_seconds=config.get("base_backoff_seconds", 5),
+        max_backoff_seconds=config.get("max_backoff_seconds", 600),
+        max_attempts=config.get("max_attempts", 20)
+    )
+    if save is not None:
+        outbox.start_worker(save, config.get("flush_interval_seconds", 5), config.get("batch_size", 20))
+    pending = outbox.pending_count()
+    if pending:
+        logger.info(f"{pending} interviews waiting in the outbox from a previous run")
+    parked = outbox.parked()
+    if parked:
+        logger.error(f"{len(parked)} interviews parked in the outbox after repeated failures "
+                     f"(last error: {parked[-1][2]}) - fix the cause and call requeue_parked()")
+    return outbox
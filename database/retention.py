@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Delete stored interviews older than the retention period
+
+Finds expired interviews through the interview_date index, oldest first, and deletes
+them in small batches; candidate info, answers and ratings go with them through
+ON DELETE CASCADE. Each batch is a short transaction, the job throttles itself to a
+maximum row rate so live saves are not held up, and progress is checkpointed after
+every batch so an interrupted purge resumes where it stopped. Skill rollups are
+aggregates without personal data and are kept.
+
+Usage:
+    python -m database.retention --dry-run        # count what would be deleted
+    python -m database.retention                  # delete interviews older than retention_days
+    python -m database.retention --retention-days 30 --batch-size 50 --max-rows-per-second 20
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = "retention_checkpoint.json"
+
+def retention_cutoff(retention_days: int, now: Optional[datetime] = None) -> str:
+    """ISO timestamp before which interviews have expired"""
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(days=retention_days)).isoformat()
+
+class RetentionCheckpoint:
+    """Cutoff, cursor and counts of a purge, stored as JSON so a run can resume"""
+
+    def __init__(self, path: str, cutoff: str, dry_run: bool = False):
+        self.path = path
+        self.data = {"cutoff": cutoff, "dry_run": dry_run, "after": None, "matched": 0, "deleted": 0, "done": False}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            # Resume an unfinished run of the same kind with its original cutoff
+            if not saved.get("done") and saved.get("dry_run") == dry_run:
+                self.data = saved
+
+    @property
+    def cutoff(self) -> str:
+        return self.data["cutoff"]
+
+    @property
+    def after(self):
+        return tuple(self.data["after"]) if self.data["after"] else None
+
+    def advance(self, after, matched: int, deleted: int, done: bool = False) -> None:
+        """Record progress and write the checkpoint atomically"""
+        self.data["after"] = list(after) if after else None
+        self.data["matched"] += matched
+        self.data["deleted"] += deleted
+        self.data["done"] = done
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+class RetentionJob:
+    """Purge expired interviews batch by batch"""
+
+    def __init__(self, storage, checkpoint: RetentionCheckpoint, batch_size: int = 100,
+                 max_rows_per_second: float = 50, dry_run: bool = False, on_deleted=None):
+        self.storage = storage
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.max_rows_per_second = max_rows_per_second
+        self.dry_run = dry_run
+        # Called with each deleted batch of IDs, e.g. to drop them from a read cache
+        self.on_deleted = on_deleted
+
+    def _throttle(self, rows: int, started: float) -> None:
+        """Sleep so the job stays under max_rows_per_second"""
+        if self.max_rows_per_second:
+            remaining = rows / self.max_rows_per_second - (time.time() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def run(self) -> int:
+        """Run to completion. Returns the number of interviews deleted (or matched in a dry run)."""
+        cutoff = self.checkpoint.cutoff
+        after = self.checkpoint.after
+        total = 0
+        while True:
+            started = time.time()
+            keys = self.storage.expired_interview_keys(cutoff, after, self.batch_size)
+            if not keys:
+                self.checkpoint.advance(after, 0, 0, done=True)
+                break
+
+            interview_ids = [interview_id for _, interview_id in keys]
+            deleted = 0
+            if not self.dry_run:
+                deleted = self.storage.delete_interviews(interview_ids)
+                if self.on_deleted:
+                    self.on_deleted(interview_ids)
+
+            after = keys[-1]
+            total += len(keys) if self.dry_run else deleted
+            self.checkpoint.advance(after, len(keys), deleted)
+            logger.info(f"{'Would delete' if self.dry_run else 'Deleted'} {len(keys) if self.dry_run else deleted} "
+                        f"interviews (up to {after[0]})")
+            self._throttle(len(keys), started)
+
+        logger.info(f"Retention purge done: {total} interviews {'expired' if self.dry_run else 'deleted'} "
+                    f"before {cutoff}")
+        return total
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Delete stored interviews older than the retention period")
+    parser.add_argument("--retention-days", type=int, default=DATABASE_CONFIG.get("retention_days", 365),
+                        help="Keep interviews this many days (default: DATABASE_CONFIG retention_days)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the interviews that would be deleted")
+    parser.add_argument("--batch-size", type=int, default=100, help="Interviews per delete transaction")
+    parser.add_argument("--max-rows-per-second", type=float, default=50, help="Throttle, 0 for unlimited")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress file used to resume")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+
+    from database.storage import create_storage
+    storage = create_storage(DATABASE_CONFIG)
+    if storage is None or not storage.is_available():
+        print("❌ Database not available - check DATABASE_BACKEND or SUPABASE_URL and SUPABASE_KEY")
+        return 1
+
+    checkpoint = RetentionCheckpoint(args.checkpoint, retention_cutoff(args.retention_days), args.dry_run)
+    job = RetentionJob(storage, checkpoint, args.batch_size, args.max_rows_per_second, args.dry_run)
+    count = job.run()
+    if args.dry_run:
+        print(f"🔎 {checkpoint.data['matched']} interviews dated before {checkpoint.cutoff} would be deleted")
+    else:
+        print(f"🗑️ Deleted {checkpoint.data['deleted']} interviews dated before {checkpoint.cutoff} "
+              f"({count} in this run)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
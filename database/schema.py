@@ -9,6 +9,7 @@ CREATE_TABLES_SQL = """
 CREATE TABLE IF NOT EXISTS interviews (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     email_hash VARCHAR(64) NOT NULL,
+    phone_hash VARCHAR(64),
     overall_rating TEXT NOT NULL,
     tech_stack TEXT,
     experience_years TEXT,
@@ -19,6 +20,9 @@ CREATE TABLE IF NOT EXISTS interviews (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Keyed blind indexes (HMAC-SHA256, see security/blind_index.py); for databases created before phone_hash
+ALTER TABLE interviews ADD COLUMN IF NOT EXISTS phone_hash VARCHAR(64);
+
 -- Encrypted candidate personal information
 CREATE TABLE IF NOT EXISTS candidate_info (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -51,19 +55,97 @@ CREATE TABLE IF NOT EXISTS skill_ratings (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Precomputed skill analytics: score count, sum and histogram per technology, position and week,
+-- updated incrementally by save_interview (mean score = score_sum / rating_count)
+CREATE TABLE IF NOT EXISTS skill_rollups (
+    technology VARCHAR(100) NOT NULL,
+    position TEXT NOT NULL,
+    week_start DATE NOT NULL,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    score_sum INTEGER NOT NULL DEFAULT 0,
+    score_1 INTEGER NOT NULL DEFAULT 0,
+    score_2 INTEGER NOT NULL DEFAULT 0,
+    score_3 INTEGER NOT NULL DEFAULT 0,
+    score_4 INTEGER NOT NULL DEFAULT 0,
+    score_5 INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (technology, position, week_start)
+);
+
 -- Indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_interviews_email_hash ON interviews(email_hash);
 CREATE INDEX IF NOT EXISTS idx_interviews_date ON interviews(interview_date);
+-- Returning-candidate lookup: latest interview by email or phone index
+CREATE INDEX IF NOT EXISTS idx_interviews_email_hash_date ON interviews(email_hash, interview_date DESC);
+CREATE INDEX IF NOT EXISTS idx_interviews_phone_hash_date ON interviews(phone_hash, interview_date DESC)
+    WHERE phone_hash IS NOT NULL;
+-- Keyset pagination for interview listings: ORDER BY interview_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_interviews_date_id ON interviews(interview_date DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_candidate_info_interview_id ON candidate_info(interview_id);
 CREATE INDEX IF NOT EXISTS idx_questions_answers_interview_id ON questions_answers(interview_id);
 CREATE INDEX IF NOT EXISTS idx_questions_answers_question_number ON questions_answers(interview_id, question_number);
 CREATE INDEX IF NOT EXISTS idx_skill_ratings_interview_id ON skill_ratings(interview_id);
+CREATE INDEX IF NOT EXISTS idx_skill_rollups_week ON skill_rollups(week_start DESC);
+
+-- Save a whole interview in one call and one transaction (rows carry client-generated IDs).
+-- Saving the same interview ID again is a no-op, so retries are safe.
+CREATE OR REPLACE FUNCTION save_interview(interview JSONB, candidate JSONB, qa JSONB, ratings JSONB)
+RETURNS UUID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO interviews (id, email_hash, phone_hash, overall_rating, tech_stack, experience_years, position, interview_date, status)
+    SELECT id, email_hash, phone_hash, overall_rating, tech_stack, experience_years, position, interview_date, status
+    FROM jsonb_populate_record(NULL::interviews, interview)
+    ON CONFLICT (id) DO NOTHING;
+    
+    IF NOT FOUND THEN
+        RETURN (interview->>'id')::UUID;
+    END IF;
+    
+    INSERT INTO candidate_info (id, interview_id, encrypted_name, encrypted_email, encrypted_phone, encrypted_location, created_at)
+    SELECT id, interview_id, encrypted_name, encrypted_email, encrypted_phone, encrypted_location, created_at
+    FROM jsonb_populate_record(NULL::candidate_info, candidate);
+    
+    INSERT INTO questions_answers (id, interview_id, question_number, question_text, encrypted_answer, technology, asked_at)
+    SELECT id, interview_id, question_number, question_text, encrypted_answer, technology, asked_at
+    FROM jsonb_populate_recordset(NULL::questions_answers, qa);
+    
+    INSERT INTO skill_ratings (id, interview_id, skill_name, score, max_score, created_at)
+    SELECT id, interview_id, skill_name, score, max_score, created_at
+    FROM jsonb_populate_recordset(NULL::skill_ratings, ratings);
+    
+    -- Fold this interview's scores into the analytics rollups (same transaction, so exactly once)
+    INSERT INTO skill_rollups (technology, position, week_start, rating_count, score_sum,
+                               score_1, score_2, score_3, score_4, score_5)
+    SELECT r.skill_name, lower(trim(coalesce(i.position, ''))), date_trunc('week', i.interview_date)::DATE,
+           count(*), sum(r.score),
+           count(*) FILTER (WHERE r.score = 1), count(*) FILTER (WHERE r.score = 2),
+           count(*) FILTER (WHERE r.score = 3), count(*) FILTER (WHERE r.score = 4),
+           count(*) FILTER (WHERE r.score = 5)
+    FROM jsonb_populate_recordset(NULL::skill_ratings, ratings) r,
+         jsonb_populate_record(NULL::interviews, interview) i
+    GROUP BY 1, 2, 3
+    ON CONFLICT (technology, position, week_start) DO UPDATE SET
+        rating_count = skill_rollups.rating_count + EXCLUDED.rating_count,
+        score_sum = skill_rollups.score_sum + EXCLUDED.score_sum,
+        score_1 = skill_rollups.score_1 + EXCLUDED.score_1,
+        score_2 = skill_rollups.score_2 + EXCLUDED.score_2,
+        score_3 = skill_rollups.score_3 + EXCLUDED.score_3,
+        score_4 = skill_rollups.score_4 + EXCLUDED.score_4,
+        score_5 = skill_rollups.score_5 + EXCLUDED.score_5,
+        updated_at = NOW();
+    
+    RETURN (interview->>'id')::UUID;
+END;
+$$;
 
 -- Row Level Security (RLS) policies - optional but recommended
 ALTER TABLE interviews ENABLE ROW LEVEL SECURITY;
 ALTER TABLE candidate_info ENABLE ROW LEVEL SECURITY;
 ALTER TABLE questions_answers ENABLE ROW LEVEL SECURITY;
 ALTER TABLE skill_ratings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE skill_rollups ENABLE ROW LEVEL SECURITY;
 
 -- Basic policy to allow all operations for authenticated users
 -- You may want to customize these based on your specific security requirements
@@ -78,6 +160,26 @@ CREATE POLICY "Enable all operations for authenticated users" ON questions_answe
 
 CREATE POLICY "Enable all operations for authenticated users" ON skill_ratings
     FOR ALL USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Enable all operations for authenticated users" ON skill_rollups
+    FOR ALL USING (auth.role() = 'authenticated');
+"""
+
+# Recompute skill_rollups from the raw ratings, e.g. once after creating the table on a
+# database that already holds interviews. Safe to run again: it replaces the rollups.
+REBUILD_SKILL_ROLLUPS_SQL = """
+BEGIN;
+DELETE FROM skill_rollups;
+INSERT INTO skill_rollups (technology, position, week_start, rating_count, score_sum,
+                           score_1, score_2, score_3, score_4, score_5)
+SELECT r.skill_name, lower(trim(coalesce(i.position, ''))), date_trunc('week', i.interview_date)::DATE,
+       count(*), sum(r.score),
+       count(*) FILTER (WHERE r.score = 1), count(*) FILTER (WHERE r.score = 2),
+       count(*) FILTER (WHERE r.score = 3), count(*) FILTER (WHERE r.score = 4),
+       count(*) FILTER (WHERE r.score = 5)
+FROM skill_ratings r JOIN interviews i ON i.id = r.interview_id
+GROUP BY 1, 2, 3;
+COMMIT;
 """
 
 # Instructions for setup
@@ -102,6 +204,10 @@ The tables created:
 - candidate_info: Encrypted personal information (name, email, phone, location)
 - questions_answers: All technical questions asked and encrypted answers
 - skill_ratings: Individual skill scores from the AI evaluation
+- skill_rollups: Score count, sum and histogram per technology, position and week for analytics
+  (on an existing database, run REBUILD_SKILL_ROLLUPS_SQL once to include older interviews)
+- save_interview(): stored function that writes all of the above for one interview in a
+  single transaction and updates skill_rollups (required: saves fail until it is installed)
 
 All sensitive data (personal info and answers) are encrypted before storage.
 """
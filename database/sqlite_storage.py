@@ -0,0 +1,294 @@
+"""
+Local SQLite interview storage, mirroring the tables in database/schema.py
+
+For single-node deployments, development without Supabase credentials and tests.
+"""
+import re
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from database.storage import InterviewStorage
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interviews (
+    id TEXT PRIMARY KEY,
+    email_hash TEXT NOT NULL,
+    phone_hash TEXT,
+    overall_rating TEXT NOT NULL,
+    tech_stack TEXT,
+    experience_years TEXT,
+    position TEXT,
+    interview_date TEXT NOT NULL,
+    status TEXT DEFAULT 'completed',
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS candidate_info (
+    id TEXT PRIMARY KEY,
+    interview_id TEXT REFERENCES interviews(id) ON DELETE CASCADE,
+    encrypted_name TEXT NOT NULL,
+    encrypted_email TEXT NOT NULL,
+    encrypted_phone TEXT,
+    encrypted_location TEXT,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS questions_answers (
+    id TEXT PRIMARY KEY,
+    interview_id TEXT REFERENCES interviews(id) ON DELETE CASCADE,
+    question_number INTEGER NOT NULL,
+    question_text TEXT NOT NULL,
+    encrypted_answer TEXT NOT NULL,
+    technology TEXT,
+    asked_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS skill_ratings (
+    id TEXT PRIMARY KEY,
+    interview_id TEXT REFERENCES interviews(id) ON DELETE CASCADE,
+    skill_name TEXT NOT NULL,
+    score INTEGER NOT NULL CHECK (score >= 1 AND score <= 5),
+    max_score INTEGER DEFAULT 5,
+    created_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS skill_rollups (
+    technology TEXT NOT NULL,
+    position TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    score_sum INTEGER NOT NULL DEFAULT 0,
+    score_1 INTEGER NOT NULL DEFAULT 0,
+    score_2 INTEGER NOT NULL DEFAULT 0,
+    score_3 INTEGER NOT NULL DEFAULT 0,
+    score_4 INTEGER NOT NULL DEFAULT 0,
+    score_5 INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT,
+    PRIMARY KEY (technology, position, week_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_interviews_email_hash ON interviews(email_hash);
+CREATE INDEX IF NOT EXISTS idx_interviews_email_hash_date ON interviews(email_hash, interview_date DESC);
+CREATE INDEX IF NOT EXISTS idx_interviews_phone_hash_date ON interviews(phone_hash, interview_date DESC)
+    WHERE phone_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_interviews_date_id ON interviews(interview_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_candidate_info_interview_id ON candidate_info(interview_id);
+CREATE INDEX IF NOT EXISTS idx_questions_answers_question_number ON questions_answers(interview_id, question_number);
+CREATE INDEX IF NOT EXISTS idx_skill_ratings_interview_id ON skill_ratings(interview_id);
+CREATE INDEX IF NOT EXISTS idx_skill_rollups_week ON skill_rollups(week_start DESC);
+"""
+
+# Same rollup update as the save_interview stored function; weeks start on Monday (UTC)
+UPDATE_ROLLUPS_SQL = """
+INSERT INTO skill_rollups (technology, position, week_start, rating_count, score_sum,
+                           score_1, score_2, score_3, score_4, score_5, updated_at)
+SELECT r.skill_name, lower(trim(coalesce(i.position, ''))), date(i.interview_date, 'weekday 0', '-6 days'),
+       count(*), sum(r.score),
+       sum(r.score = 1), sum(r.score = 2), sum(r.score = 3), sum(r.score = 4), sum(r.score = 5),
+       strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+FROM skill_ratings r JOIN interviews i ON i.id = r.interview_id
+WHERE r.interview_id = ?
+GROUP BY 1, 2, 3
+ON CONFLICT (technology, position, week_start) DO UPDATE SET
+    rating_count = rating_count + excluded.rating_count,
+    score_sum = score_sum + excluded.score_sum,
+    score_1 = score_1 + excluded.score_1,
+    score_2 = score_2 + excluded.score_2,
+    score_3 = score_3 + excluded.score_3,
+    score_4 = score_4 + excluded.score_4,
+    score_5 = score_5 + excluded.score_5,
+    updated_at = excluded.updated_at
+"""
+
+# Columns written per table, in insert order
+TABLE_COLUMNS = {
+    'interviews': ['id', 'email_hash', 'phone_hash', 'overall_rating', 'tech_stack', 'experience_years', 'position',
+                   'interview_date', 'status'],
+    'candidate_info': ['id', 'interview_id', 'encrypted_name', 'encrypted_email', 'encrypted_phone',
+                       'encrypted_location', 'created_at'],
+    'questions_answers': ['id', 'interview_id', 'question_number', 'question_text', 'encrypted_answer',
+                          'technology', 'asked_at'],
+    'skill_ratings': ['id', 'interview_id', 'skill_name', 'score', 'max_score', 'created_at']
+}
+
+# Embedded related tables, as Supabase returns them
+DETAIL_TABLES = ['candidate_info', 'questions_answers', 'skill_ratings']
+
+class SQLiteStorage(InterviewStorage):
+    """Interview storage in a local SQLite database (WAL mode, one transaction per interview)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._migrate()
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database file was created"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(interviews)")}
+        if columns and 'phone_hash' not in columns:
+            self._conn.execute("ALTER TABLE interviews ADD COLUMN phone_hash TEXT")
+
+    def is_available(self) -> bool:
+        """A local database is always available"""
+        return True
+
+    @staticmethod
+    def _insert_sql(table: str, or_ignore: bool = False) -> str:
+        columns = TABLE_COLUMNS[table]
+        verb = "INSERT OR IGNORE" if or_ignore else "INSERT"
+        return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    @staticmethod
+    def _values(table: str, rows: List[Dict[str, Any]]) -> List[tuple]:
+        return [tuple(row.get(column) for column in TABLE_COLUMNS[table]) for row in rows]
+
+    def save_interview_records(self, records: Dict[str, Any]) -> None:
+        """Write all records in one transaction, one batched insert per table"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                self._insert_sql('interviews', or_ignore=True), self._values('interviews', [records['interview']])[0]
+            )
+            if cursor.rowcount == 0:
+                # Already saved (retry) - same as the save_interview stored function
+                return
+            for table, key in (('candidate_info', 'candidate'), ('questions_answers', 'qa'), ('skill_ratings', 'ratings')):
+                rows = records[key] if isinstance(records[key], list) else [records[key]]
+                if rows:
+                    self._conn.executemany(self._insert_sql(table), self._values(table, rows))
+            self._conn.execute(UPDATE_ROLLUPS_SQL, (records['interview']['id'],))
+
+    def fetch_skill_rollups(self, technology=None, position=None, since=None):
+        """Precomputed skill rollups"""
+        conditions, params = [], []
+        if technology:
+            conditions.append("technology = ? COLLATE NOCASE")
+            params.append(technology)
+        if position:
+            conditions.append("position LIKE ?")
+            params.append(f"%{position}%")
+        if since:
+            conditions.append("week_start >= ?")
+            params.append(since)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                f"SELECT * FROM skill_rollups {where} ORDER BY week_start DESC", params
+            ).fetchall()]
+
+    def _embed_details(self, rows: List[Dict[str, Any]]) -> None:
+        """Attach related rows to interview rows, one query per related table for the whole page"""
+        if not rows:
+            return
+        by_id = {row['id']: row for row in rows}
+        placeholders = ', '.join('?' * len(by_id))
+        for table in DETAIL_TABLES:
+            for row in by_id.values():
+                row[table] = []
+            related = self._conn.execute(
+                f"SELECT * FROM {table} WHERE interview_id IN ({placeholders})", list(by_id)
+            ).fetchall()
+            for related_row in related:
+                by_id[related_row['interview_id']][table].append(dict(related_row))
+
+    def fetch_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Interview row with related rows embedded"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM interviews WHERE id = ?", (interview_id,)).fetchone()
+            if row is None:
+                return None
+            rows = [dict(row)]
+            self._embed_details(rows)
+        return rows[0]
+
+    def interview_exists(self, interview_id: str) -> bool:
+        """Primary key lookup"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM interviews WHERE id = ?", (interview_id,)).fetchone() is not None
+
+    def expired_interview_keys(self, cutoff, after, limit):
+        """Expired interview keys, oldest first"""
+        conditions, params = ["interview_date < ?"], [cutoff]
+        if after is not None:
+            conditions.append("(interview_date, id) > (?, ?)")
+            params.extend(after)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT interview_date, id FROM interviews WHERE {' AND '.join(conditions)} "
+                f"ORDER BY interview_date, id LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [(row['interview_date'], row['id']) for row in rows]
+
+    def delete_interviews(self, interview_ids):
+        """Delete a batch in one short transaction"""
+        if not interview_ids:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM interviews WHERE id IN ({', '.join('?' * len(interview_ids))})", interview_ids
+            )
+        return cursor.rowcount
+
+    def find_interviews_by_email_hashes(self, email_hashes, include_details=False):
+        """One query with an IN filter on email_hash"""
+        if not email_hashes:
+            return []
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(
+                f"SELECT * FROM interviews WHERE email_hash IN ({', '.join('?' * len(email_hashes))})",
+                list(email_hashes)
+            ).fetchall()]
+            if include_details:
+                self._embed_details(rows)
+        return rows
+
+    def find_latest_interview(self, email_hash, phone_hash, since):
+        """One query on the email and phone index"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, email_hash, interview_date FROM interviews WHERE (email_hash = ? OR phone_hash = ?) "
+                "AND status = 'completed' AND interview_date >= ? ORDER BY interview_date DESC LIMIT 1",
+                (email_hash, phone_hash, since)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def list_interview_rows(self, after, page_size, overall_rating=None, position=None, technology=None,
+                            include_details=False):
+        """One page of interviews using keyset pagination on (interview_date, id)"""
+        conditions, params = [], []
+        if overall_rating:
+            conditions.append("overall_rating = ?")
+            params.append(overall_rating)
+        if position:
+            conditions.append("position LIKE ?")
+            params.append(f"%{position}%")
+        if technology:
+            # Whole entries of the comma-separated stack, so "Java" does not match "JavaScript"
+            conditions.append("(',' || REPLACE(tech_stack, ' ', '') || ',') LIKE ? ESCAPE '\\'")
+            entry = re.sub(r'([\\%_])', r'\\\1', technology.replace(' ', ''))
+            params.append(f"%,{entry},%")
+        if after is not None:
+            conditions.append("(interview_date, id) < (?, ?)")
+            params.extend(after)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(
+                f"SELECT * FROM interviews {where} ORDER BY interview_date DESC, id DESC LIMIT ?",
+                params + [page_size]
+            ).fetchall()]
+            if include_details:
+                self._embed_details(rows)
+        return rows
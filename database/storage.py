@@ -0,0 +1,233 @@
+"""
+Storage interface for interview data, with the Supabase implementation
+
+A storage backend only moves rows: InterviewDataManager builds, encrypts and decodes them.
+Rows are plain dictionaries shaped like the tables in database/schema.py; a fetched
+interview row carries its related rows embedded under 'candidate_info',
+'questions_answers' and 'skill_ratings', as PostgREST returns them.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MissingSchemaError(Exception):
+    """The database lacks a table or function the app needs (run database/schema.py)"""
+
+class InterviewStorage(ABC):
+    """Interface every interview storage backend implements"""
+
+    # Remote backends get a write-behind outbox in front of them
+    remote = False
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check if the backend can be used"""
+
+    @abstractmethod
+    def save_interview_records(self, records: Dict[str, Any]) -> None:
+        """
+        Write one interview's records ('interview', 'candidate', 'qa', 'ratings') atomically
+        and fold its ratings into the skill rollups in the same transaction.
+        Saving an interview ID that already exists is a no-op. Raises on failure.
+        """
+
+    @abstractmethod
+    def fetch_skill_rollups(self,
+                            technology: Optional[str] = None,
+                            position: Optional[str] = None,
+                            since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Skill rollup rows, newest week first, optionally filtered (since is an ISO date)"""
+
+    @abstractmethod
+    def fetch_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Interview row with its related rows embedded, or None"""
+
+    @abstractmethod
+    def interview_exists(self, interview_id: str) -> bool:
+        """Check if an interview is still stored (a primary key lookup)"""
+
+    @abstractmethod
+    def expired_interview_keys(self,
+                               cutoff: str,
+                               after: Optional[Tuple[str, str]],
+                               limit: int) -> List[Tuple[str, str]]:
+        """
+        (interview_date, id) of interviews dated before the cutoff, oldest first and strictly
+        after the cursor if given (an index range scan on interview_date)
+        """
+
+    @abstractmethod
+    def delete_interviews(self, interview_ids: List[str]) -> int:
+        """Delete interviews and, through ON DELETE CASCADE, all their rows. Returns the number deleted."""
+
+    @abstractmethod
+    def find_interviews_by_email_hashes(self, email_hashes: List[str],
+                                        include_details: bool = False) -> List[Dict[str, Any]]:
+        """Interview rows of all the given email hashes in one query on the email_hash index"""
+
+    @abstractmethod
+    def find_latest_interview(self, email_hash: str, phone_hash: Optional[str],
+                              since: str) -> Optional[Dict[str, Any]]:
+        """
+        id, email_hash and interview_date of the most recent completed interview since the
+        given ISO timestamp whose email or phone index matches, or None
+        """
+
+    @abstractmethod
+    def list_interview_rows(self,
+                            after: Optional[Tuple[str, str]],
+                            page_size: int,
+                            overall_rating: Optional[str] = None,
+                            position: Optional[str] = None,
+                            technology: Optional[str] = None,
+                            include_details: bool = False) -> List[Dict[str, Any]]:
+        """
+        Interview rows ordered by (interview_date DESC, id DESC), strictly after the
+        (interview_date, id) cursor if given. Related rows are embedded with include_details.
+        """
+
+class SupabaseStorage(InterviewStorage):
+    """Interview storage in Supabase PostgreSQL"""
+
+    remote = True
+
+    # Related tables embedded through their interview_id foreign keys
+    DETAILS_SELECT = '*, candidate_info(*), questions_answers(*), skill_ratings(*)'
+
+    def __init__(self, supabase_manager):
+        # Clients are borrowed from the manager's pool per operation
+        self.supabase_manager = supabase_manager
+
+    def is_available(self) -> bool:
+        """Check if Supabase is configured and not reconnecting"""
+        return self.supabase_manager is not None and self.supabase_manager.is_available()
+
+    def save_interview_records(self, records: Dict[str, Any]) -> None:
+        """Write all records in one call to the save_interview stored function"""
+        with self.supabase_manager.client() as client:
+            try:
+                client.rpc('save_interview', records).execute()
+            except Exception as e:
+                if self._is_missing_function(e):
+                    # Separate inserts would leave partial interviews behind, so there is no fallback
+                    raise MissingSchemaError(
+                        "save_interview function not installed - run the SQL in database/schema.py "
+                        "in the Supabase SQL editor to create it"
+                    ) from e
+                raise
+
+    @staticmethod
+    def _is_missing_function(error: Exception) -> bool:
+        """Check if an RPC failed because the stored function does not exist"""
+        message = str(error)
+        return 'PGRST202' in message or 'Could not find the function' in message
+
+    def fetch_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """One request with the related rows embedded"""
+        with self.supabase_manager.client() as client:
+            result = client.table('interviews').select(self.DETAILS_SELECT).eq('id', interview_id).execute()
+        return result.data[0] if result.data else None
+
+    def interview_exists(self, interview_id: str) -> bool:
+        """One request selecting only the ID"""
+        with self.supabase_manager.client() as client:
+            result = client.table('interviews').select('id').eq('id', interview_id).limit(1).execute()
+        return bool(result.data)
+
+    def fetch_skill_rollups(self, technology=None, position=None, since=None):
+        """Precomputed skill rollups"""
+        with self.supabase_manager.client() as client:
+            query = client.table('skill_rollups').select('*')
+            if technology:
+                query = query.ilike('technology', technology)
+            if position:
+                query = query.ilike('position', f'%{position}%')
+            if since:
+                query = query.gte('week_start', since)
+            return query.order('week_start', desc=True).execute().data or []
+
+    def expired_interview_keys(self, cutoff, after, limit):
+        """Expired interview keys, oldest first"""
+        with self.supabase_manager.client() as client:
+            query = client.table('interviews').select('id, interview_date').lt('interview_date', cutoff)
+            if after is not None:
+                after_date, after_id = after
+                query = query.or_(
+                    f'interview_date.gt."{after_date}",and(interview_date.eq."{after_date}",id.gt.{after_id})'
+                )
+            result = query.order('interview_date').order('id').limit(limit).execute()
+        return [(row['interview_date'], row['id']) for row in result.data or []]
+
+    def delete_interviews(self, interview_ids):
+        """One DELETE request for the whole batch"""
+        if not interview_ids:
+            return 0
+        with self.supabase_manager.client() as client:
+            result = client.table('interviews').delete().in_('id', interview_ids).execute()
+        return len(result.data or [])
+
+    def find_interviews_by_email_hashes(self, email_hashes, include_details=False):
+        """One request with an IN filter on email_hash"""
+        if not email_hashes:
+            return []
+        with self.supabase_manager.client() as client:
+            result = client.table('interviews').select(
+                self.DETAILS_SELECT if include_details else 'id, email_hash, interview_date'
+            ).in_('email_hash', email_hashes).execute()
+        return result.data or []
+
+    def find_latest_interview(self, email_hash, phone_hash, since):
+        """One request on the email and phone index"""
+        with self.supabase_manager.client() as client:
+            query = client.table('interviews').select('id, email_hash, interview_date')
+            if phone_hash:
+                query = query.or_(f'email_hash.eq.{email_hash},phone_hash.eq.{phone_hash}')
+            else:
+                query = query.eq('email_hash', email_hash)
+            result = query.eq('status', 'completed').gte('interview_date', since).order(
+                'interview_date', desc=True
+            ).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    def list_interview_rows(self, after, page_size, overall_rating=None, position=None, technology=None,
+                            include_details=False):
+        """One page of interviews using keyset pagination"""
+        with self.supabase_manager.client() as client:
+            query = client.table('interviews').select(self.DETAILS_SELECT if include_details else '*')
+
+            if overall_rating:
+                query = query.eq('overall_rating', overall_rating)
+            if position:
+                query = query.ilike('position', f'%{position}%')
+            if technology:
+                # Whole entries of the comma-separated stack, so "Java" does not match "JavaScript"
+                entry = technology.strip()
+                patterns = (entry, f'{entry},%', f'%,{entry}', f'%, {entry}', f'%,{entry},%', f'%, {entry},%')
+                query = query.or_(','.join(f'tech_stack.ilike."{pattern}"' for pattern in patterns))
+            if after is not None:
+                after_date, after_id = after
+                # Rows strictly after the cursor in (interview_date DESC, id DESC) order
+                query = query.or_(
+                    f'interview_date.lt."{after_date}",and(interview_date.eq."{after_date}",id.lt.{after_id})'
+                )
+
+            result = query.order('interview_date', desc=True).order('id', desc=True).limit(page_size).execute()
+        return result.data or []
+
+def create_storage(config: Dict[str, Any]) -> Optional[InterviewStorage]:
+    """Create the storage backend selected in DATABASE_CONFIG"""
+    backend = config.get("backend", "auto")
+    if backend in ("auto", "supabase"):
+        from database.connection import supabase_manager
+        storage = SupabaseStorage(supabase_manager)
+        if backend == "supabase" or (supabase_manager is not None and supabase_manager.is_configured()):
+            return storage
+        logger.info("Supabase not configured - storing interviews in local SQLite")
+    elif backend != "sqlite":
+        logger.error(f"Unknown database backend: {backend}")
+        return None
+
+    from database.sqlite_storage import SQLiteStorage
+    return SQLiteStorage(config.get("sqlite_path", "interviews.db"))
@@ -9,6 +9,13 @@ from datetime import datetime
 # Add the parent directory to Python path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# This script writes sample interviews to the configured database; with "auto" and no
+# Supabase that is the developer's local interviews.db, so the test suite leaves it alone
+if "pytest" in sys.modules and not os.getenv("DATABASE_BACKEND"):
+    import pytest
+    pytest.skip("writes sample data to the configured database - set DATABASE_BACKEND to run it",
+                allow_module_level=True)
+
 from database.connection import supabase_manager
 from database.models import interview_data_manager
 from database.schema import CREATE_TABLES_SQL, SETUP_INSTRUCTIONS
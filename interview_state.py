@@ -0,0 +1,145 @@
+"""
+Typed, compact container for one candidate's interview state
+"""
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from config import QUESTIONS_PER_TECHNOLOGY, SECURITY_CONFIG
+
+class Message(NamedTuple):
+    """One chat message"""
+    role: str
+    content: str
+
+class DecryptedValueCache:
+    """Size-bounded LRU of decrypted field values, held in memory only"""
+
+    __slots__ = ("max_entries", "_entries")
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str, ciphertext: str) -> Optional[str]:
+        """Cached plaintext for a field, if it was decrypted from this exact ciphertext"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != ciphertext:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, ciphertext: str, plaintext: str) -> None:
+        """Remember a decrypted value, evicting the least recently used past the limit"""
+        self._entries[key] = (ciphertext, plaintext)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Forget one field"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget every field"""
+        self._entries.clear()
+
+class InterviewState:
+    """All interview state of a session in one object, with a single reset path"""
+
+    __slots__ = (
+        "messages", "current_step", "candidate_data", "encrypted_fields",
+        "tech_stack_list", "current_tech_index", "questions_per_tech", "current_tech_question_count",
+        "current_tech_signals", "interview_questions", "interview_answers",
+        "previous_question", "previous_answer", "interview_complete",
+        "candidate_rating", "overall_rating", "interview_id", "pending_job",
+        "pending_verification", "decrypted_cache"
+    )
+
+    # Slots that are never serialized (plaintext must not reach snapshots)
+    TRANSIENT = ("decrypted_cache",)
+
+    # Bump when the serialized layout changes so old snapshots can be migrated or rejected
+    VERSION = 1
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Return to the state of a brand new conversation"""
+        self.messages: List[Message] = []
+        self.current_step = 0
+        self.candidate_data: Dict[str, Any] = {}
+        self.encrypted_fields: Set[str] = set()
+        self.tech_stack_list: List[str] = []
+        self.current_tech_index = 0
+        self.questions_per_tech = QUESTIONS_PER_TECHNOLOGY
+        self.current_tech_question_count = 0
+        self.current_tech_signals: List[float] = []
+        self.interview_questions: List[str] = []
+        self.interview_answers: List[str] = []
+        self.previous_question: Optional[str] = None
+        self.previous_answer: Optional[str] = None
+        self.interview_complete = False
+        self.candidate_rating: Dict[str, int] = {}
+        self.overall_rating = ""
+        # New for every interview (also after a reset): the idempotency key of its save
+        self.interview_id = str(uuid.uuid4())
+        self.pending_job: Optional[Dict[str, Any]] = None
+        self.pending_verification: Optional[Dict[str, Any]] = None
+        self.decrypted_cache = DecryptedValueCache(SECURITY_CONFIG.get("decrypted_cache_size", 16))
+
+    def clear_sensitive_data(self) -> None:
+        """Drop candidate data and answers while keeping the conversation position"""
+        self.candidate_data = {}
+        self.encrypted_fields = set()
+        self.decrypted_cache.clear()
+        self.interview_questions = []
+        self.interview_answers = []
+        self.previous_question = None
+        self.previous_answer = None
+        self.tech_stack_list = []
+
+    def add_message(self, role: str, content: str) -> None:
+        """Append a chat message"""
+        self.messages.append(Message(role, content))
+
+    def qa_pairs(self) -> List[Dict[str, str]]:
+        """Answered questions as question/answer dictionaries"""
+        return [
+            {"question": question, "answer": answer}
+            for question, answer in zip(self.interview_questions, self.interview_answers)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain, JSON-serializable form of the state (encrypted fields stay encrypted)"""
+        data = {slot: getattr(self, slot) for slot in self.__slots__ if slot not in self.TRANSIENT}
+        for slot in ("candidate_data", "candidate_rating", "pending_job", "pending_verification"):
+            data[slot] = dict(data[slot]) if data[slot] is not None else None
+        for slot in ("tech_stack_list", "current_tech_signals", "interview_questions", "interview_answers"):
+            data[slot] = list(data[slot])
+        data["messages"] = [list(message) for message in self.messages]
+        data["encrypted_fields"] = sorted(self.encrypted_fields)
+        data["version"] = self.VERSION
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InterviewState":
+        """Rebuild a state from to_dict output, ignoring unknown keys"""
+        state = cls()
+        for slot in cls.__slots__:
+            if slot in data and slot not in cls.TRANSIENT:
+                setattr(state, slot, data[slot])
+        state.messages = [Message(*message) for message in data.get("messages", [])]
+        state.encrypted_fields = set(data.get("encrypted_fields", []))
+        state.candidate_data = dict(state.candidate_data)
+        state.tech_stack_list = list(state.tech_stack_list)
+        state.current_tech_signals = list(state.current_tech_signals)
+        state.interview_questions = list(state.interview_questions)
+        state.interview_answers = list(state.interview_answers)
+        state.candidate_rating = dict(state.candidate_rating)
+        state.interview_id = state.interview_id or str(uuid.uuid4())
+        return state
+
+    def snapshot(self) -> "InterviewState":
+        """Independent copy of the current state"""
+        return InterviewState.from_dict(self.to_dict())
@@ -0,0 +1,92 @@
+"""
+Per-process background executor for slow work (model calls, database saves)
+Keeps the Streamlit script thread free while results are computed
+"""
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from config import JOB_EXECUTOR_CONFIG
+
+logger = logging.getLogger("job_executor")
+
+class JobExecutor:
+    """Run jobs on a shared thread pool and hand results back by job ID"""
+
+    def __init__(self, max_workers: int = 4, enabled: bool = True, result_ttl_seconds: int = 900):
+        self.enabled = enabled
+        self.result_ttl_seconds = result_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job") if enabled else None
+        self._jobs: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        Submit a job and return its ID.
+
+        Jobs must not touch st.session_state: they receive plain arguments and return a
+        result that the script thread applies to the session. With the executor disabled
+        the job runs inline and is already done when this returns.
+        """
+        job_id = str(uuid.uuid4())
+        if self._executor:
+            future = self._executor.submit(self._run, job_id, fn, *args, **kwargs)
+        else:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = (future, time.time())
+        return job_id
+
+    @staticmethod
+    def _run(job_id: str, fn: Callable[..., Any], *args, **kwargs):
+        """Run a job, logging failures (they are re-raised to the collector)"""
+        start = time.time()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Job {job_id[:8]} failed: {e}")
+            raise
+        finally:
+            logger.info(f"Job {job_id[:8]} ({getattr(fn, '__name__', 'job')}) finished in {time.time() - start:.2f}s")
+
+    def _prune(self):
+        """Forget finished jobs nobody collected (abandoned sessions)"""
+        cutoff = time.time() - self.result_ttl_seconds
+        stale = [job_id for job_id, (future, submitted) in self._jobs.items() if future.done() and submitted < cutoff]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+    def is_done(self, job_id: str) -> bool:
+        """Check if a job has finished (unknown jobs count as finished)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job is None or job[0].done()
+
+    def pop_result(self, job_id: str) -> Optional[Future]:
+        """Remove a finished job and return its future (None if unknown or still running)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job[0].done():
+                return None
+            del self._jobs[job_id]
+        return job[0]
+
+    def pending_count(self) -> int:
+        """Number of jobs not yet finished"""
+        with self._lock:
+            return sum(1 for future, _ in self._jobs.values() if not future.done())
+
+# Global instance shared by every session in this process
+job_executor = JobExecutor(
+    max_workers=JOB_EXECUTOR_CONFIG.get("max_workers", 4),
+    enabled=JOB_EXECUTOR_CONFIG.get("enabled", True),
+    result_ttl_seconds=JOB_EXECUTOR_CONFIG.get("result_ttl_seconds", 900)
+)
@@ -0,0 +1,127 @@
+"""
+Inference backends behind one chat interface
+Ollama daemon over HTTP, or a local GGUF model loaded in-process with llama.cpp
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from config import LLM_BACKEND_CONFIG
+
+logger = logging.getLogger("llm_backend")
+
+# Try to import llama.cpp bindings, the in-process backend is unavailable without them
+try:
+    from llama_cpp import Llama
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+
+class OllamaBackend:
+    """Send chat requests to the Ollama daemon"""
+
+    name = "ollama"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def chat(self, messages: List[Dict[str, str]], options: Dict[str, Any], keep_alive: Optional[str] = None) -> str:
+        """Run a chat request and return the reply text"""
+        import ollama
+
+        response = ollama.chat(model=self.model, messages=messages, options=options, keep_alive=keep_alive)
+        return response['message']['content'].strip()
+
+class InferenceScheduler:
+    """Serialize requests to a shared model in FIFO order"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-scheduler")
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def run(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """Queue a call behind any in-flight requests and wait for its result"""
+        with self._lock:
+            self.pending += 1
+        try:
+            return self._executor.submit(fn, *args, **kwargs).result(timeout=timeout)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+class LlamaCppBackend:
+    """Run a local GGUF model in-process, loaded once and shared by all sessions"""
+
+    name = "llama_cpp"
+
+    # Ollama options that are fixed when the model is loaded, mapped to llama.cpp arguments
+    LOAD_OPTIONS = {"num_ctx": "n_ctx", "num_thread": "n_threads", "num_batch": "n_batch"}
+
+    def __init__(self, model_path: str, load_options: Optional[Dict[str, Any]] = None):
+        self.model_path = model_path
+        self.load_options = {
+            "n_ctx": LLM_BACKEND_CONFIG.get("llama_cpp_n_ctx", 4096),
+            "n_threads": LLM_BACKEND_CONFIG.get("llama_cpp_n_threads"),
+            "n_batch": LLM_BACKEND_CONFIG.get("llama_cpp_n_batch", 512)
+        }
+        for option, value in (load_options or {}).items():
+            if option in self.LOAD_OPTIONS:
+                self.load_options[self.LOAD_OPTIONS[option]] = value
+        self.scheduler = InferenceScheduler()
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def check_status(self) -> Tuple[bool, str]:
+        """Check that the bindings and the model file are there"""
+        if not LLAMA_CPP_AVAILABLE:
+            return False, "llama-cpp-python is not installed"
+        if not self.model_path or not os.path.exists(self.model_path):
+            return False, f"GGUF model not found: {self.model_path or 'LLAMA_CPP_MODEL_PATH not set'}"
+        return True, f"{os.path.basename(self.model_path)} loaded in-process" if self._model else f"{os.path.basename(self.model_path)} ready"
+
+    def _get_model(self):
+        """Load the model on first use"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    available, message = self.check_status()
+                    if not available:
+                        raise RuntimeError(message)
+                    logger.info(f"Loading {self.model_path} in-process with {self.load_options}")
+                    self._model = Llama(model_path=self.model_path, verbose=False, **self.load_options)
+        return self._model
+
+    def _complete(self, messages: List[Dict[str, str]], options: Dict[str, Any]) -> str:
+        """Run one completion on the shared model (scheduler thread only)"""
+        response = self._get_model().create_chat_completion(
+            messages=messages,
+            temperature=options.get("temperature", 0.8),
+            top_p=options.get("top_p", 0.95),
+            max_tokens=options.get("num_predict")
+        )
+        return response["choices"][0]["message"]["content"].strip()
+
+    def chat(self, messages: List[Dict[str, str]], options: Dict[str, Any], keep_alive: Optional[str] = None) -> str:
+        """Run a chat request and return the reply text (keep_alive is meaningless in-process)"""
+        return self.scheduler.run(
+            self._complete, messages, options,
+            timeout=LLM_BACKEND_CONFIG.get("request_timeout_seconds", 300)
+        )
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend(model: str, load_options: Optional[Dict[str, Any]] = None):
+    """Get the process-wide inference backend selected in LLM_BACKEND_CONFIG"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if LLM_BACKEND_CONFIG.get("backend") == "llama_cpp":
+                    _backend = LlamaCppBackend(LLM_BACKEND_CONFIG.get("llama_cpp_model_path", ""), load_options)
+                else:
+                    _backend = OllamaBackend(model)
+                logger.info(f"Using inference backend: {_backend.name}")
+    return _backend
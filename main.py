@@ -3,15 +3,58 @@ TalentScout Hiring Assistant Chatbot with Security Features
 Main Streamlit application
 """
 import streamlit as st
-from config import INITIAL_GREETING, SECURITY_CONFIG, PRIVACY_CONFIG
+from config import INITIAL_GREETING, SECURITY_CONFIG, PRIVACY_CONFIG, JOB_EXECUTOR_CONFIG
 from session_manager import (
-    initialize_session_state, add_message, display_chat_history, is_interview_complete
+    initialize_session_state, add_message, display_chat_history, render_messages, is_interview_complete,
+    get_interview_state, save_interview_snapshot, track_session_activity
 )
-from conversation_handler import process_user_input
+from conversation_handler import process_user_input, has_pending_job, poll_pending_job
 from utils import create_sidebar, display_help, display_ai_info, send_candidate_report_email
 from security.session_security import SecureSessionManager
 from security.gdpr_compliance import GDPRCompliance
 
+@st.fragment(run_every=JOB_EXECUTOR_CONFIG.get("poll_interval_seconds", 1.0))
+def show_pending_job(first_new_message):
+    """Refresh until the session's background job lands, then append the new messages"""
+    state = get_interview_state()
+    job = state.pending_job
+    if job and poll_pending_job():
+        save_interview_snapshot()
+        if job["kind"] == "evaluation":
+            # The evaluation changes the sidebar and rating panels - the only case needing a full page rerun
+            st.rerun()
+    
+    render_messages(state.messages[first_new_message:])
+    if has_pending_job():
+        st.caption("⏳ Thinking...")
+
+@st.fragment
+def chat_area():
+    """Chat history and input, rerun on their own so the rest of the page is not rebuilt per message"""
+    track_session_activity()
+    state = get_interview_state()
+    display_chat_history()
+    
+    # Keep checking on slow work (question generation, rating) without blocking the page
+    if has_pending_job():
+        show_pending_job(len(state.messages))
+    
+    # User input form
+    with st.form("chat_form", clear_on_submit=True):
+        user_input = st.text_input("Your message:", key="user_input")
+        submit_button = st.form_submit_button("Send")
+    
+    # Process user input
+    if submit_button and user_input:
+        step_before = state.current_step
+        add_message("user", user_input)
+        process_user_input(user_input)
+        save_interview_snapshot()
+        # Candidate details feed the sidebar; technical answers only change the chat
+        if state.current_step != step_before or is_interview_complete():
+            st.rerun()
+        st.rerun(scope="fragment")
+
 def main():
     """Main application function with security features"""
     st.set_page_config(page_title="TalentScout Hiring Assistant", page_icon="🤖")
@@ -45,31 +88,21 @@ def main():
     display_help()
     
     # Initial greeting
-    if not st.session_state["messages"]:
+    state = get_interview_state()
+    if not state.messages:
         add_message("assistant", INITIAL_GREETING)
     
-    # Display chat history
-    display_chat_history()
+    # Chat history and input
+    chat_area()
     
     # Add email report button if interview is complete
-    if is_interview_complete() and st.session_state.get("candidate_rating"):
+    if is_interview_complete() and state.candidate_rating:
         if st.button("📧 Send Candidate Report"):
             success, message = send_candidate_report_email()
             if success:
                 st.success(message)
             else:
                 st.error(message)
-    
-    # User input form
-    with st.form("chat_form", clear_on_submit=True):
-        user_input = st.text_input("Your message:", key="user_input")
-        submit_button = st.form_submit_button("Send")
-    
-    # Process user input
-    if submit_button and user_input:
-        add_message("user", user_input)
-        process_user_input(user_input)
-        st.rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark-driven tuner for Ollama runtime options on CPU-only hosts
+
+Sweeps num_thread, num_ctx and num_batch against a fixed prompt set built from the
+real question and rating templates, measures tokens/s and latency, and writes the
+fastest combination to a per-host profile that ai_service loads at startup.
+
+A smaller context is always faster because Ollama silently truncates prompts that do
+not fit, so num_ctx values too small for the prompts plus their num_predict (and a
+margin for longer real interviews) are dropped before the sweep.
+
+Usage:
+    python ollama_tuner.py
+    python ollama_tuner.py --threads 4 8 --ctx 2048 4096 --batch 256 512 --repeats 3
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import ollama
+
+from config import OLLAMA_CONFIG
+from ai_service import (
+    build_question_prompt, build_rating_messages, get_ollama_profile_path,
+    QUESTION_OPTIONS, RATING_OPTIONS
+)
+
+# Fixed candidate used for every benchmark prompt, so runs are comparable across hosts
+SAMPLE_CANDIDATE = {
+    "tech_stack": "Python, React, PostgreSQL, Docker",
+    "experience": "4",
+    "position": "Backend Engineer"
+}
+
+SAMPLE_QA_PAIRS = [
+    {
+        "question": "[Python] How would you find and fix a memory leak in a long-running Python service?",
+        "answer": "I would compare tracemalloc snapshots over time to find allocation sites that keep growing, then check caches and global lists holding references."
+    },
+    {
+        "question": "[PostgreSQL] A query on a 50M row table got slow after a deploy. How do you investigate?",
+        "answer": "Run EXPLAIN ANALYZE, compare with the old plan, check whether an index stopped being used or statistics are stale, and look at lock waits."
+    },
+    {
+        "question": "[Docker] How do you keep image builds fast and images small?",
+        "answer": "Order layers so dependencies are cached, use multi-stage builds and a slim base image, and keep a .dockerignore."
+    }
+]
+
+def get_benchmark_requests():
+    """Build the fixed prompt set: an opening question, a follow-up and a rating call"""
+    opening_prompt = build_question_prompt(
+        SAMPLE_CANDIDATE["tech_stack"], SAMPLE_CANDIDATE["experience"], SAMPLE_CANDIDATE["position"],
+        tech_focus="Python"
+    )
+    follow_up_prompt = build_question_prompt(
+        SAMPLE_CANDIDATE["tech_stack"], SAMPLE_CANDIDATE["experience"], SAMPLE_CANDIDATE["position"],
+        previous_question=SAMPLE_QA_PAIRS[0]["question"].split("] ", 1)[1],
+        previous_answer=SAMPLE_QA_PAIRS[0]["answer"],
+        tech_focus="Python"
+    )
+    rating_messages = build_rating_messages(
+        SAMPLE_CANDIDATE["tech_stack"], SAMPLE_QA_PAIRS, SAMPLE_CANDIDATE["position"], SAMPLE_CANDIDATE["experience"]
+    )
+    return [
+        ("question", [{"role": "user", "content": opening_prompt}], QUESTION_OPTIONS),
+        ("follow_up", [{"role": "user", "content": follow_up_prompt}], QUESTION_OPTIONS),
+        ("rating", rating_messages, RATING_OPTIONS)
+    ]
+
+def measure_prompt_tokens(model, requests, num_ctx):
+    """
+    Prompt tokens of each request, counted by the model itself. keep_alive=0 unloads the
+    model after every call, so no request is shortened by the prompt cache of the previous one.
+    """
+    prompt_tokens = {}
+    for name, messages, _ in requests:
+        response = ollama.chat(model=model, messages=messages, options={"num_ctx": num_ctx, "num_predict": 1},
+                               keep_alive=0)
+        count = response.get("prompt_eval_count") or 0
+        if not count:
+            # Rough upper bound when the server does not report the count
+            count = sum(len(message["content"]) for message in messages) // 3
+        elif count >= num_ctx:
+            print(f"⚠️  The {name} prompt may be truncated even at num_ctx={num_ctx}")
+        prompt_tokens[name] = count
+    return prompt_tokens
+
+def required_context(requests, prompt_tokens, margin):
+    """Smallest num_ctx that fits every prompt with its full num_predict and the margin"""
+    return max(prompt_tokens[name] + options.get("num_predict", 0) for name, _, options in requests) + margin
+
+def run_request(model, messages, options, keep_alive):
+    """Run one chat request and return its latency and generation speed"""
+    start = time.perf_counter()
+    response = ollama.chat(model=model, messages=messages, options=options, keep_alive=keep_alive)
+    latency = time.perf_counter() - start
+
+    eval_count = response.get("eval_count") or 0
+    eval_duration = response.get("eval_duration") or 0
+    prompt_eval_count = response.get("prompt_eval_count") or 0
+    prompt_eval_duration = response.get("prompt_eval_duration") or 0
+    return {
+        "latency_s": latency,
+        "tokens_per_s": eval_count / (eval_duration / 1e9) if eval_duration else 0.0,
+        "prompt_tokens_per_s": prompt_eval_count / (prompt_eval_duration / 1e9) if prompt_eval_duration else 0.0
+    }
+
+def benchmark_options(model, runtime_options, requests, repeats, keep_alive):
+    """Benchmark one combination of runtime options over the whole prompt set"""
+    # Changing num_ctx/num_thread reloads the model; keep the load out of the measurements
+    warmup_options = {**runtime_options, "num_predict": 1}
+    ollama.chat(model=model, messages=requests[0][1], options=warmup_options, keep_alive=keep_alive)
+
+    runs = []
+    for _ in range(repeats):
+        for name, messages, options in requests:
+            run = run_request(model, messages, {**options, **runtime_options}, keep_alive)
+            run["request"] = name
+            runs.append(run)
+
+    latencies = [run["latency_s"] for run in runs]
+    return {
+        "options": runtime_options,
+        "mean_latency_s": round(statistics.mean(latencies), 3),
+        "max_latency_s": round(max(latencies), 3),
+        "tokens_per_s": round(statistics.mean(run["tokens_per_s"] for run in runs), 2),
+        "prompt_tokens_per_s": round(statistics.mean(run["prompt_tokens_per_s"] for run in runs), 2)
+    }
+
+def default_thread_counts():
+    """Thread counts worth trying for this host's core count"""
+    cores = os.cpu_count() or 4
+    return sorted({max(1, cores // 4), max(1, cores // 2), cores})
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Tune Ollama runtime options for this host")
+    parser.add_argument("--model", default=OLLAMA_CONFIG["model"], help="Model to benchmark")
+    parser.add_argument("--threads", type=int, nargs="+", default=default_thread_counts(), help="num_thread values")
+    parser.add_argument("--ctx", type=int, nargs="+", default=[2048, 3072, 4096], help="num_ctx values")
+    parser.add_argument("--ctx-margin", type=int, default=512,
+                        help="Tokens of num_ctx kept free beyond the largest benchmark prompt and its num_predict, "
+                             "for interviews with more or longer answers")
+    parser.add_argument("--batch", type=int, nargs="+", default=[128, 256, 512], help="num_batch values")
+    parser.add_argument("--keep-alive", default="30m", help="keep_alive to store in the profile and use while tuning")
+    parser.add_argument("--repeats", type=int, default=2, help="Runs of the prompt set per combination")
+    parser.add_argument("--output", default=None, help="Profile path (default: per-host profile read by ai_service)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Sweep the option grid and write the best combination to the host profile"""
+    args = parse_args(argv)
+    requests = get_benchmark_requests()
+
+    try:
+        prompt_tokens = measure_prompt_tokens(args.model, requests, max(args.ctx))
+    except Exception as e:
+        print(f"❌ Could not measure the benchmark prompts: {e}. Is Ollama running and the model pulled?")
+        return 1
+    min_ctx = required_context(requests, prompt_tokens, args.ctx_margin)
+    contexts = [num_ctx for num_ctx in args.ctx if num_ctx >= min_ctx]
+    print(f"Prompt tokens: {prompt_tokens}; num_ctx must be at least {min_ctx}")
+    if len(contexts) < len(args.ctx):
+        print(f"   Skipping num_ctx {sorted(set(args.ctx) - set(contexts))}: prompts would be truncated")
+    if not contexts:
+        print(f"❌ No --ctx value fits the prompts; try --ctx {min_ctx} or larger")
+        return 1
+    grid = list(itertools.product(args.threads, contexts, args.batch))
+
+    print(f"Tuning {args.model} on {socket.gethostname()} ({os.cpu_count()} CPUs): {len(grid)} combinations")
+    results = []
+    for num_thread, num_ctx, num_batch in grid:
+        runtime_options = {"num_thread": num_thread, "num_ctx": num_ctx, "num_batch": num_batch}
+        try:
+            result = benchmark_options(args.model, runtime_options, requests, args.repeats, args.keep_alive)
+        except Exception as e:
+            print(f"❌ {runtime_options}: {e}")
+            continue
+        results.append(result)
+        print(f"   {runtime_options}: {result['mean_latency_s']}s mean, {result['tokens_per_s']} tok/s")
+
+    if not results:
+        print("❌ No combination completed. Is Ollama running and the model pulled?")
+        return 1
+
+    # Candidates feel latency, so rank by mean latency and break ties on generation speed
+    results.sort(key=lambda result: (result["mean_latency_s"], -result["tokens_per_s"]))
+    best = results[0]
+
+    profile = {
+        "host": socket.gethostname(),
+        "cpu_count": os.cpu_count(),
+        "model": args.model,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "options": best["options"],
+        "keep_alive": args.keep_alive,
+        "min_num_ctx": min_ctx,
+        "results": results
+    }
+    output_path = args.output or get_ollama_profile_path()
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(profile, f, indent=2)
+
+    print(f"✅ Best options: {best['options']} ({best['mean_latency_s']}s mean, {best['tokens_per_s']} tok/s)")
+    print(f"   Profile written to {output_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
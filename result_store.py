@@ -0,0 +1,105 @@
+"""
+Content-addressed, size-bounded store for repeatable results
+"""
+import hashlib
+import json
+import sys
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("result_store")
+
+def normalize_prompt(text: str) -> str:
+    """Normalize prompt text so formatting-only differences map to the same key"""
+    return " ".join(text.split())
+
+def make_result_key(model: str, options: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
+    """Hash of (model, options, normalized prompt) identifying a model call"""
+    normalized = [
+        {"role": message.get("role", ""), "content": normalize_prompt(message.get("content", ""))}
+        for message in messages
+    ]
+    payload = json.dumps([model, options, normalized], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultStore:
+    """Thread-safe LRU store bounded by entry count and approximate size in bytes, with optional expiry"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size_of(value: Any) -> int:
+        """Approximate memory footprint of a stored value"""
+        if isinstance(value, str):
+            return len(value.encode())
+        try:
+            return len(json.dumps(value, default=str).encode())
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and time.monotonic() >= entry[2]:
+                self.total_bytes -= self._entries.pop(key)[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting least recently used entries past the limits"""
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+            self._entries[key] = (value, size, expires_at)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
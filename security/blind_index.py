@@ -0,0 +1,83 @@
+"""
+Keyed blind index for looking up candidates by email or phone
+
+Values are normalized and hashed with HMAC-SHA256 under a dedicated secret key, so equal
+inputs match in an indexed query but the stored hashes cannot be brute-forced from a list
+of likely addresses without the key. The index key is kept apart from the encryption key
+ring: rotating encryption keys must not change the index.
+"""
+import os
+import re
+import hmac
+import base64
+import hashlib
+import logging
+import secrets
+import threading
+from typing import Optional
+from security.key_ring import create_key_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_KEY_FILE = '.env_index_key'
+
+# Shorter digit strings are not phone numbers worth matching on
+MIN_PHONE_DIGITS = 7
+
+def get_index_key_file() -> str:
+    """Index key file location (BLIND_INDEX_KEY_FILE overrides the default)"""
+    return os.getenv("BLIND_INDEX_KEY_FILE", DEFAULT_INDEX_KEY_FILE)
+
+def normalize_email(email: str) -> str:
+    """Case and surrounding spaces do not distinguish addresses"""
+    return (email or '').strip().lower()
+
+def normalize_phone(phone: str) -> str:
+    """Digits only, so formatting does not distinguish numbers"""
+    return re.sub(r'\D', '', phone or '')
+
+class BlindIndex:
+    """HMAC-SHA256 blind index over normalized values"""
+
+    def __init__(self, key_file: str):
+        self.key_file = key_file
+        self._key = self._load_or_create()
+
+    def _load_or_create(self) -> bytes:
+        """Read the index key, creating it if it does not exist yet"""
+        try:
+            if not os.path.exists(self.key_file):
+                create_key_file(self.key_file, base64.urlsafe_b64encode(secrets.token_bytes(32)))
+            with open(self.key_file, 'rb') as f:
+                return base64.urlsafe_b64decode(f.read().strip())
+        except Exception as e:
+            logger.error(f"Error handling blind index key: {e}")
+            # Fallback to a process-only key (lookups only match within this process)
+            return secrets.token_bytes(32)
+
+    def compute(self, field: str, normalized_value: str) -> str:
+        """Index of a normalized value; the field name keeps email and phone indexes apart"""
+        return hmac.new(self._key, f"{field}:{normalized_value}".encode(), hashlib.sha256).hexdigest()
+
+    def email(self, email: str) -> str:
+        """Index of an email address"""
+        return self.compute("email", normalize_email(email))
+
+    def phone(self, phone: str) -> Optional[str]:
+        """Index of a phone number, None if it has too few digits"""
+        digits = normalize_phone(phone)
+        if len(digits) < MIN_PHONE_DIGITS:
+            return None
+        return self.compute("phone", digits)
+
+_blind_index = None
+_blind_index_lock = threading.Lock()
+
+def get_blind_index() -> BlindIndex:
+    """Get the process-wide blind index, loading its key on first use"""
+    global _blind_index
+    if _blind_index is None:
+        with _blind_index_lock:
+            if _blind_index is None:
+                _blind_index = BlindIndex(get_index_key_file())
+    return _blind_index
@@ -1,73 +1,54 @@
 """
 Data encryption utilities for sensitive information
 """
-import hashlib
 import base64
-import os
+import zlib
 import logging
+import threading
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-# Try to import cryptography, fallback to base64 if not available
-try:
-    from cryptography.fernet import Fernet
-    ENCRYPTION_AVAILABLE = True
-except ImportError:
+# Fallback to base64 if the cryptography library is not available
+from security.key_ring import get_key_ring, ENCRYPTION_AVAILABLE
+from security.envelope import seal, open_envelope, is_envelope, FLAG_ZLIB
+from security.blind_index import get_blind_index
+if not ENCRYPTION_AVAILABLE:
     logger.warning("Cryptography library not available. Using base64 encoding as fallback.")
-    ENCRYPTION_AVAILABLE = False
 
 class DataEncryption:
     """Handle encryption and decryption of sensitive data"""
     
     def __init__(self):
         if ENCRYPTION_AVAILABLE:
-            self.key = self._get_or_create_key()
-            self.cipher_suite = Fernet(self.key)
+            # Keys come from the process-wide key ring - no file I/O per instance
+            self.key_ring = get_key_ring()
         else:
-            self.key = None
-            self.cipher_suite = None
+            self.key_ring = None
             logger.warning("Using fallback encryption (base64 encoding)")
     
-    def _get_or_create_key(self):
-        """Generate or load encryption key"""
-        if not ENCRYPTION_AVAILABLE:
-            return None
-            
-        key_file = '.env_key'
-        try:
-            if os.path.exists(key_file):
-                with open(key_file, 'rb') as f:
-                    return f.read()
-            else:
-                key = Fernet.generate_key()
-                with open(key_file, 'wb') as f:
-                    f.write(key)
-                # Add to .gitignore if it exists
-                self._add_to_gitignore(key_file)
-                return key
-        except Exception as e:
-            logger.error(f"Error handling encryption key: {e}")
-            # Fallback to session-based key (not persistent)
-            return Fernet.generate_key()
+    @property
+    def key(self):
+        """Primary encryption key"""
+        return self.key_ring.primary_key if self.key_ring else None
     
-    def _add_to_gitignore(self, filename):
-        """Add filename to .gitignore if it exists"""
-        try:
-            gitignore_path = '.gitignore'
-            if os.path.exists(gitignore_path):
-                with open(gitignore_path, 'r') as f:
-                    content = f.read()
-                if filename not in content:
-                    with open(gitignore_path, 'a') as f:
-                        f.write(f"\n{filename}\n")
-        except Exception as e:
-            logger.warning(f"Could not update .gitignore: {e}")
+    @property
+    def cipher_suite(self):
+        """Shared Fernet cipher, used to read values written before the AES-GCM envelope format"""
+        return self.key_ring.cipher if self.key_ring else None
     
-    def encrypt_data(self, data: str) -> str:
-        """Encrypt sensitive data"""
+    def encrypt_data(self, data: str, compress_min_bytes: Optional[int] = None) -> str:
+        """Encrypt sensitive data, zlib-compressing it first if it is at least compress_min_bytes long"""
         try:
-            if ENCRYPTION_AVAILABLE and self.cipher_suite:
-                return self.cipher_suite.encrypt(data.encode()).decode()
+            if ENCRYPTION_AVAILABLE and self.key_ring:
+                plaintext = data.encode()
+                if compress_min_bytes is not None and len(plaintext) >= compress_min_bytes:
+                    compressed = zlib.compress(plaintext)
+                    # Short or random-looking text can grow - only keep a real saving
+                    if len(compressed) < len(plaintext):
+                        return seal(self.key_ring, compressed, FLAG_ZLIB)
+                # AES-GCM envelope under the primary key: one pass, ~36 bytes of overhead
+                return seal(self.key_ring, plaintext)
             else:
                 # Fallback to base64 encoding (not secure, but better than plaintext)
                 return base64.b64encode(data.encode()).decode()
@@ -78,7 +59,13 @@ class DataEncryption:
     def decrypt_data(self, encrypted_data: str) -> str:
         """Decrypt sensitive data"""
         try:
-            if ENCRYPTION_AVAILABLE and self.cipher_suite:
+            if ENCRYPTION_AVAILABLE and self.key_ring:
+                if is_envelope(encrypted_data):
+                    plaintext, flags = open_envelope(self.key_ring, encrypted_data)
+                    if flags & FLAG_ZLIB:
+                        plaintext = zlib.decompress(plaintext)
+                    return plaintext.decode()
+                # Legacy Fernet value
                 return self.cipher_suite.decrypt(encrypted_data.encode()).decode()
             else:
                 # Fallback from base64 encoding
@@ -88,14 +75,21 @@ class DataEncryption:
             return encrypted_data  # Fallback to returning as-is
     
     def hash_email(self, email: str) -> str:
-        """Hash email for identification without storing plaintext"""
-        return hashlib.sha256(email.encode()).hexdigest()
+        """Keyed blind index of an email for identification without storing plaintext"""
+        return get_blind_index().email(email)
+    
+    def hash_phone(self, phone: str) -> Optional[str]:
+        """Keyed blind index of a phone number (None for too short numbers)"""
+        return get_blind_index().phone(phone)
     
     def is_encrypted(self, data: str) -> bool:
         """Check if data appears to be encrypted"""
         try:
-            if ENCRYPTION_AVAILABLE and self.cipher_suite:
-                # Try to decrypt - if successful, it was encrypted
+            if ENCRYPTION_AVAILABLE and self.key_ring:
+                # Envelopes are recognized from their header alone
+                if is_envelope(data):
+                    return True
+                # Legacy Fernet value - try to decrypt, if successful it was encrypted
                 self.cipher_suite.decrypt(data.encode())
                 return True
             else:
@@ -104,3 +98,15 @@ class DataEncryption:
                 return True
         except:
             return False
+
+_shared_encryption = None
+_shared_encryption_lock = threading.Lock()
+
+def get_data_encryption() -> DataEncryption:
+    """Get the process-wide DataEncryption instance (every session uses the same key)"""
+    global _shared_encryption
+    if _shared_encryption is None:
+        with _shared_encryption_lock:
+            if _shared_encryption is None:
+                _shared_encryption = DataEncryption()
+    return _shared_encryption
@@ -0,0 +1,59 @@
+"""
+Versioned AES-GCM record format for encrypted fields
+
+    magic "TS" | version (1) | flags (1) | key ID (4) | nonce (12) | ciphertext + tag
+
+encoded as unpadded base64url. The header is authenticated as associated data.
+Because the first three bytes are fixed, every record starts with the same text
+prefix and can be told apart from legacy Fernet tokens without decrypting.
+"""
+import os
+import base64
+from typing import Tuple
+
+MAGIC = b"TS"
+VERSION = 1
+HEADER_SIZE = 2 + 1 + 1 + 4 + 12
+TAG_SIZE = 16
+
+# Header flags
+FLAG_ZLIB = 0x01    # Plaintext was zlib-compressed before encryption
+
+# Text form of MAGIC + VERSION: base64 maps each 3 bytes to the same 4 characters
+PREFIX = base64.urlsafe_b64encode(MAGIC + bytes([VERSION])).decode()
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def is_envelope(token: str) -> bool:
+    """Check if a value is an envelope record (header check only, no decryption)"""
+    return (
+        isinstance(token, str)
+        and token.startswith(PREFIX)
+        and len(token) >= (HEADER_SIZE + TAG_SIZE) * 4 // 3
+    )
+
+def seal(key_ring, plaintext: bytes, flags: int = 0) -> str:
+    """Encrypt bytes under the key ring's primary key"""
+    key_id = key_ring.primary_key_id
+    nonce = os.urandom(12)
+    header = MAGIC + bytes([VERSION, flags]) + bytes.fromhex(key_id) + nonce
+    return _b64encode(header + key_ring.aead(key_id).encrypt(nonce, plaintext, header))
+
+def open_envelope(key_ring, token: str) -> Tuple[bytes, int]:
+    """Decrypt a record, returning the plaintext bytes and the header flags"""
+    data = _b64decode(token)
+    if len(data) < HEADER_SIZE + TAG_SIZE or data[:2] != MAGIC or data[2] != VERSION:
+        raise ValueError("Not an encryption envelope")
+    header, ciphertext = data[:HEADER_SIZE], data[HEADER_SIZE:]
+    flags = header[3]
+    key_id = header[4:8].hex()
+    nonce = header[8:HEADER_SIZE]
+    return key_ring.aead(key_id).decrypt(nonce, ciphertext, header), flags
+
+def envelope_key_id(token: str) -> str:
+    """ID of the key a record was encrypted with (header only)"""
+    return _b64decode(token[:12])[4:8].hex()
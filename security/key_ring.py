@@ -0,0 +1,227 @@
+"""
+Process-wide encryption key ring
+Keys are read from disk once per process and shared by every session and worker thread
+"""
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from cryptography.fernet import Fernet, MultiFernet
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    ENCRYPTION_AVAILABLE = True
+except ImportError:
+    ENCRYPTION_AVAILABLE = False
+
+DEFAULT_KEY_FILE = '.env_key'
+
+# HKDF context for the AES-GCM record key derived from each ring key
+AEAD_KEY_INFO = b"talentscout-field-encryption-aes256gcm-v1"
+
+def get_key_file() -> str:
+    """Key file location (ENCRYPTION_KEY_FILE overrides the default)"""
+    return os.getenv("ENCRYPTION_KEY_FILE", DEFAULT_KEY_FILE)
+
+def key_id(key: bytes) -> str:
+    """Short, stable identifier of a key (safe to log and store)"""
+    return hashlib.sha256(key).hexdigest()[:8]
+
+def create_key_file(path: str, content: bytes) -> bool:
+    """
+    Create a key file atomically: the content is written to a temporary file which is then
+    hard-linked into place. If another worker created the file first the link fails and
+    its key is used, so concurrent first starts never end up with different keys.
+    Returns True if this call created the file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.key-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.link(tmp_path, path)
+        logger.info(f"Created key file {path}")
+        add_to_gitignore(path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp_path)
+
+def add_to_gitignore(filename):
+    """Add a file inside the working directory to its .gitignore, if there is one"""
+    try:
+        gitignore_path = '.gitignore'
+        relative = os.path.relpath(os.path.abspath(filename))
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            # Outside the repository (e.g. a temporary directory): nothing to ignore
+            return
+        entry = relative.replace(os.sep, '/')
+        if os.path.exists(gitignore_path):
+            with open(gitignore_path, 'r') as f:
+                entries = {line.strip().lstrip('/') for line in f}
+            if entry not in entries:
+                with open(gitignore_path, 'a') as f:
+                    f.write(f"/{entry}\n")
+    except Exception as e:
+        logger.warning(f"Could not update .gitignore: {e}")
+
+class KeyRing:
+    """
+    Ordered set of Fernet keys: the first is the primary key used to encrypt, all of
+    them can decrypt. The key file holds one key per line, primary first.
+    """
+
+    def __init__(self, key_file: str):
+        self.key_file = key_file
+        self._lock = threading.Lock()
+        self.keys: "OrderedDict[str, bytes]" = OrderedDict()
+        self.cipher = None
+        self._aeads = {}
+        # Identity of the key file contents the keys were loaded from
+        self._file_version = None
+        if ENCRYPTION_AVAILABLE:
+            self._set_keys(self._load_or_create())
+
+    @property
+    def primary_key(self) -> Optional[bytes]:
+        """Key used for new encryptions"""
+        return next(iter(self.keys.values()), None)
+
+    @property
+    def primary_key_id(self) -> Optional[str]:
+        """ID of the primary key"""
+        return next(iter(self.keys), None)
+
+    def get(self, key_id_value: str) -> Optional[bytes]:
+        """Look up a key by ID"""
+        return self.keys.get(key_id_value)
+
+    def aead(self, key_id_value: str):
+        """AES-256-GCM cipher for a key, derived with HKDF once and then reused"""
+        aead = self._aeads.get(key_id_value)
+        if aead is None:
+            key = self.keys.get(key_id_value)
+            if key is None and self._reload_if_changed():
+                # Written under a key another process added (database.key_rotation --rotate)
+                key = self.keys.get(key_id_value)
+            if key is None:
+                raise ValueError(f"Unknown encryption key {key_id_value}")
+            derived = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=AEAD_KEY_INFO).derive(key)
+            aead = AESGCM(derived)
+            self._aeads[key_id_value] = aead
+        return aead
+
+    def _set_keys(self, keys: List[bytes]) -> None:
+        """Replace the keys and rebuild the shared cipher"""
+        self.keys = OrderedDict((key_id(key), key) for key in keys)
+        self.cipher = MultiFernet([Fernet(key) for key in self.keys.values()])
+        self._aeads = {}
+
+    def _stat_key_file(self):
+        """(inode, mtime, size) of the key file, None if it cannot be read"""
+        try:
+            stat = os.stat(self.key_file)
+            return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _reload_if_changed(self) -> bool:
+        """Re-read the key file if it was replaced since it was loaded. Returns True if it was."""
+        with self._lock:
+            version = self._stat_key_file()
+            if version is None or version == self._file_version:
+                return False
+            try:
+                self._set_keys(self._read_keys())
+            except Exception as e:
+                # Keep the loaded ring; a replacement key would make new data unreadable after a restart
+                logger.error(f"Could not reload encryption keys, keeping the loaded ones: {e}")
+                return False
+            logger.info("Reloaded encryption keys changed by another process")
+            return True
+
+    @staticmethod
+    def _parse(content: bytes) -> List[bytes]:
+        return [line.strip() for line in content.splitlines() if line.strip()]
+
+    def _read_keys(self) -> List[bytes]:
+        """Read the key file (raises if it is missing, unreadable or empty)"""
+        version = self._stat_key_file()
+        with open(self.key_file, 'rb') as f:
+            keys = self._parse(f.read())
+        if not keys:
+            raise ValueError(f"{self.key_file} contains no keys")
+        self._file_version = version
+        logger.info(f"Loaded {len(keys)} encryption key(s), primary {key_id(keys[0])}")
+        return keys
+
+    def _load_or_create(self) -> List[bytes]:
+        """Read the key file, creating it with a new key if it does not exist yet (first load only)"""
+        try:
+            if not os.path.exists(self.key_file):
+                create_key_file(self.key_file, Fernet.generate_key())
+            return self._read_keys()
+        except Exception as e:
+            logger.error(f"Error handling encryption key: {e}")
+            # Fallback to a process-only key (not persistent)
+            return [Fernet.generate_key()]
+
+    def _write_key_file(self, keys: List[bytes]) -> None:
+        """Atomically replace the key file contents"""
+        directory = os.path.dirname(os.path.abspath(self.key_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.key-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"\n".join(keys) + b"\n")
+        os.replace(tmp_path, self.key_file)
+        self._file_version = self._stat_key_file()
+
+    def reload(self) -> None:
+        """
+        Re-read the key file (after another process rotated the keys). Raises if it cannot be
+        read, keeping the loaded keys: no new key is ever created on a reload.
+        """
+        with self._lock:
+            self._set_keys(self._read_keys())
+
+    def rotate(self, new_key: Optional[bytes] = None) -> str:
+        """
+        Make a new key primary, keeping the old ones for decryption. Returns the new key ID.
+        Old keys can be dropped with retire() once data has been re-encrypted.
+        """
+        new_key = new_key or Fernet.generate_key()
+        with self._lock:
+            keys = [new_key] + [key for key in self.keys.values() if key != new_key]
+            self._write_key_file(keys)
+            self._set_keys(keys)
+        logger.info(f"Rotated encryption key, new primary {key_id(new_key)}")
+        return key_id(new_key)
+
+    def retire(self, key_id_value: str) -> None:
+        """Remove a non-primary key from the ring"""
+        with self._lock:
+            if key_id_value == self.primary_key_id:
+                raise ValueError("The primary key cannot be retired")
+            keys = [key for kid, key in self.keys.items() if kid != key_id_value]
+            self._write_key_file(keys)
+            self._set_keys(keys)
+        logger.info(f"Retired encryption key {key_id_value}")
+
+_key_ring = None
+_key_ring_lock = threading.Lock()
+
+def get_key_ring() -> KeyRing:
+    """Get the process-wide key ring, loading it on first use"""
+    global _key_ring
+    if _key_ring is None:
+        with _key_ring_lock:
+            if _key_ring is None:
+                _key_ring = KeyRing(get_key_file())
+    return _key_ring
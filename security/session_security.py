@@ -27,19 +27,10 @@ class SecureSessionManager:
     @staticmethod
     def clear_sensitive_data():
         """Clear sensitive data from session"""
-        sensitive_keys = [
-            'candidate_data', 'interview_answers', 'interview_questions',
-            'previous_answer', 'tech_stack_list'
-        ]
-        
-        cleared_keys = []
-        for key in sensitive_keys:
-            if key in st.session_state:
-                del st.session_state[key]
-                cleared_keys.append(key)
-        
-        if cleared_keys:
-            logger.info(f"Cleared sensitive data: {cleared_keys}")
+        interview_state = st.session_state.get('interview')
+        if interview_state is not None:
+            interview_state.clear_sensitive_data()
+            logger.info("Cleared sensitive interview data")
     
     @staticmethod
     def is_session_expired(timeout_minutes: int = 30) -> bool:
@@ -71,9 +62,13 @@ class SecureSessionManager:
         SecureSessionManager.clear_sensitive_data()
         
         # Reset to initial state
-        st.session_state.current_step = 0
-        st.session_state.messages = []
-        st.session_state.interview_complete = False
+        interview_state = st.session_state.get('interview')
+        if interview_state is not None:
+            interview_state.reset()
+        
+        # The stored snapshot must not bring the expired interview back
+        from session_manager import discard_interview_snapshot
+        discard_interview_snapshot()
         
         # Show restart button
         if st.button("🔄 Start New Session"):
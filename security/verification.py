@@ -0,0 +1,85 @@
+"""
+One-time codes proving that a candidate owns the email address of a stored interview
+
+Nothing from a stored interview may reach a session on the strength of a typed email or
+phone number alone. The code is sent to the address on file, so only its owner can enter
+it; only a keyed hash of the code is kept in the (snapshotted) session state.
+"""
+import hmac
+import time
+import logging
+import secrets
+import smtplib
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, Optional
+from config import EMAIL_VERIFICATION_CONFIG
+from security.blind_index import get_blind_index
+
+logger = logging.getLogger(__name__)
+
+class EmailVerifier:
+    """Send one-time codes by email and check them against a pending challenge"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 send: Optional[Callable[[str, str], None]] = None):
+        self.config = config or EMAIL_VERIFICATION_CONFIG
+        # send(address, code) delivers a code; SMTP unless another transport is given
+        self._send = send
+
+    def is_configured(self) -> bool:
+        """Check if codes can be delivered at all"""
+        return self._send is not None or bool(self.config.get("smtp_host") and self.config.get("sender"))
+
+    def _send_smtp(self, address: str, code: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.config["sender"]
+        message["To"] = address
+        message["Subject"] = "Your TalentScout verification code"
+        minutes = self.config.get("code_ttl_seconds", 900) // 60
+        message.set_content(f"Your verification code is {code}. It expires in {minutes} minutes.\n\n"
+                            "If you did not request it, you can ignore this email.")
+        with smtplib.SMTP(self.config["smtp_host"], self.config.get("smtp_port", 587), timeout=10) as smtp:
+            smtp.starttls()
+            if self.config.get("smtp_username"):
+                smtp.login(self.config["smtp_username"], self.config.get("smtp_password", ""))
+            smtp.send_message(message)
+
+    @staticmethod
+    def _hash(subject: str, code: str) -> str:
+        """Keyed hash of a code, bound to what it unlocks"""
+        return get_blind_index().compute("verification", f"{subject}:{code}")
+
+    def start(self, subject: str, address: str) -> Optional[Dict[str, Any]]:
+        """
+        Send a new code to the address and return the challenge to keep in the session,
+        or None if it could not be sent. subject names what a correct code unlocks.
+        """
+        if not self.is_configured() or not address:
+            return None
+        digits = self.config.get("code_digits", 6)
+        code = f"{secrets.randbelow(10 ** digits):0{digits}d}"
+        try:
+            (self._send or self._send_smtp)(address, code)
+        except Exception as e:
+            logger.error(f"Failed to send verification code: {e}")
+            return None
+        return {
+            "subject": subject,
+            "code_hash": self._hash(subject, code),
+            "expires_at": time.time() + self.config.get("code_ttl_seconds", 900),
+            "attempts_left": self.config.get("max_attempts", 3)
+        }
+
+    def check(self, challenge: Dict[str, Any], code: str) -> bool:
+        """Check a code, using up one attempt of the challenge"""
+        if challenge["attempts_left"] <= 0 or time.time() > challenge["expires_at"]:
+            return False
+        challenge["attempts_left"] -= 1
+        return hmac.compare_digest(challenge["code_hash"], self._hash(challenge["subject"], code.strip()))
+
+    @staticmethod
+    def is_exhausted(challenge: Dict[str, Any]) -> bool:
+        """No further codes can succeed for this challenge"""
+        return challenge["attempts_left"] <= 0 or time.time() > challenge["expires_at"]
+
+email_verifier = EmailVerifier()
@@ -3,10 +3,17 @@ Session state management and utility functions with security enhancements
 """
 import streamlit as st
 import logging
-from config import STEPS, END_KEYWORDS, RETRY_KEYWORDS, RESTART_KEYWORDS, QUESTIONS_PER_TECHNOLOGY, SECURITY_CONFIG
+from config import (
+    STEPS, END_KEYWORDS, RETRY_KEYWORDS, RESTART_KEYWORDS, QUESTIONS_PER_TECHNOLOGY, SECURITY_CONFIG,
+    ADAPTIVE_INTERVIEW_CONFIG, UI_CONFIG, SESSION_STORE_CONFIG
+)
 from security.session_security import SecureSessionManager
 from security.data_privacy import DataPrivacyManager
-from security.encryption import DataEncryption
+from security.encryption import get_data_encryption
+from answer_screening import screen_answer, is_non_answer
+from interview_state import InterviewState
+from session_store import session_store, new_resume_token
+from session_registry import session_registry
 
 # Configure logging
 logger = logging.getLogger("session_manager")
@@ -16,41 +23,67 @@ def initialize_session_state():
     # Initialize secure session
     SecureSessionManager.initialize_secure_session()
     
-    if "messages" not in st.session_state:
-        st.session_state["messages"] = []
-    if "current_step" not in st.session_state:
-        st.session_state["current_step"] = 0
-    if "candidate_data" not in st.session_state:
-        st.session_state["candidate_data"] = {}
+    # All interview state lives in one object
+    get_interview_state()
+    track_session_activity()
     
-    # Initialize encryption if enabled
+    # Initialize encryption if enabled (one shared instance, not one per session)
     if SECURITY_CONFIG.get("enable_encryption", True):
         if "encryption" not in st.session_state:
-            st.session_state["encryption"] = DataEncryption()
-    
-    # Interview state
-    if "tech_stack_list" not in st.session_state:
-        st.session_state["tech_stack_list"] = []
-    if "current_tech_index" not in st.session_state:
-        st.session_state["current_tech_index"] = 0
-    if "questions_per_tech" not in st.session_state:
-        st.session_state["questions_per_tech"] = QUESTIONS_PER_TECHNOLOGY  # Use config value
-    if "current_tech_question_count" not in st.session_state:
-        st.session_state["current_tech_question_count"] = 0
-    if "interview_questions" not in st.session_state:
-        st.session_state["interview_questions"] = []
-    if "interview_answers" not in st.session_state:
-        st.session_state["interview_answers"] = []
-    if "previous_question" not in st.session_state:
-        st.session_state["previous_question"] = None
-    if "previous_answer" not in st.session_state:
-        st.session_state["previous_answer"] = None
-    if "interview_complete" not in st.session_state:
-        st.session_state["interview_complete"] = False
-    if "candidate_rating" not in st.session_state:
-        st.session_state["candidate_rating"] = {}
-    if "overall_rating" not in st.session_state:
-        st.session_state["overall_rating"] = ""
+            st.session_state["encryption"] = get_data_encryption()
+
+def get_interview_state() -> InterviewState:
+    """Get this session's interview state, resuming a stored snapshot or creating it on first use"""
+    if "interview" not in st.session_state:
+        st.session_state["interview"] = restore_interview_state() or InterviewState()
+    return st.session_state["interview"]
+
+def restore_interview_state():
+    """Load the snapshot for the resume token in the page URL, if there is one"""
+    token = st.query_params.get(SESSION_STORE_CONFIG.get("query_param", "resume"))
+    if not token or session_store is None:
+        return None
+    
+    data = session_store.load(token)
+    if data is None or data.get("version") != InterviewState.VERSION:
+        return None
+    
+    st.session_state["resume_token"] = token
+    logger.info(f"Resumed interview at step {data.get('current_step')} from stored snapshot")
+    return InterviewState.from_dict(data)
+
+def track_session_activity():
+    """Report activity to the session registry, reloading the state if it was spilled while idle"""
+    if session_registry is None:
+        return
+    
+    state = get_interview_state()
+    session_id = st.session_state.get("session_id", "unknown")
+    spilled_token = session_registry.touch(session_id, state, st.session_state.get("resume_token"))
+    if spilled_token is not None:
+        data = session_store.load(spilled_token) if session_store is not None else None
+        st.session_state["interview"] = InterviewState.from_dict(data) if data else InterviewState()
+        logger.info("Reloaded idle session from stored snapshot")
+        session_registry.touch(session_id, st.session_state["interview"], spilled_token)
+
+def save_interview_snapshot():
+    """Store a snapshot of the interview so it can be resumed after a disconnect or restart"""
+    if session_store is None:
+        return
+    
+    token = st.session_state.get("resume_token")
+    if token is None:
+        token = new_resume_token()
+        st.session_state["resume_token"] = token
+        st.query_params[SESSION_STORE_CONFIG.get("query_param", "resume")] = token
+    session_store.save(token, get_interview_state().to_dict())
+
+def discard_interview_snapshot():
+    """Forget the stored snapshot and resume token of this session"""
+    token = st.session_state.pop("resume_token", None)
+    if token is not None and session_store is not None:
+        session_store.delete(token)
+    st.query_params.pop(SESSION_STORE_CONFIG.get("query_param", "resume"), None)
 
 def is_end(msg):
     """Check if message is a conversation ending keyword"""
@@ -73,39 +106,38 @@ def is_restart(msg):
 
 def reset_conversation():
     """Reset conversation to start"""
-    st.session_state["current_step"] = 0
-    st.session_state["candidate_data"] = {}
-    st.session_state["messages"] = []
-    # Reset interview state
-    st.session_state["tech_stack_list"] = []
-    st.session_state["current_tech_index"] = 0
-    st.session_state["questions_per_tech"] = QUESTIONS_PER_TECHNOLOGY
-    st.session_state["current_tech_question_count"] = 0
-    st.session_state["interview_questions"] = []
-    st.session_state["interview_answers"] = []
-    st.session_state["previous_question"] = None
-    st.session_state["previous_answer"] = None
-    st.session_state["interview_complete"] = False
-    st.session_state["candidate_rating"] = {}
-    st.session_state["overall_rating"] = ""
+    get_interview_state().reset()
+    discard_interview_snapshot()
 
 def add_message(role, content):
     """Add message to chat history"""
-    st.session_state["messages"].append({"role": role, "content": content})
+    get_interview_state().add_message(role, content)
 
 def get_current_question():
     """Get current question based on step"""
-    if st.session_state["current_step"] < len(STEPS):
-        return STEPS[st.session_state["current_step"]]["question"]
+    state = get_interview_state()
+    if state.current_step < len(STEPS):
+        return STEPS[state.current_step]["question"]
     return None
 
+def render_messages(messages):
+    """Render chat messages as chat bubbles"""
+    for msg in messages:
+        with st.chat_message("assistant" if msg.role == "assistant" else "user"):
+            st.markdown(msg.content)
+
 def display_chat_history():
-    """Display chat history in Streamlit"""
-    for msg in st.session_state["messages"]:
-        if msg["role"] == "assistant":
-            st.markdown(f"**Assistant:** {msg['content']}")
-        else:
-            st.markdown(f"**You:** {msg['content']}")
+    """Display chat history in Streamlit, collapsing older messages past the configured threshold"""
+    state = get_interview_state()
+    messages = state.messages
+    hidden_count = max(len(messages) - UI_CONFIG.get("max_visible_messages", 30), 0)
+    
+    # Older messages are only rendered on request, so rerun cost does not grow with the interview
+    if hidden_count:
+        if st.toggle(f"Show {hidden_count} earlier messages", key="show_earlier_messages"):
+            render_messages(messages[:hidden_count])
+    
+    render_messages(messages[hidden_count:])
 
 def get_candidate_summary():
     """Get a summary of collected candidate data using secure retrieval"""
@@ -138,6 +170,7 @@ def get_candidate_summary():
 
 def prepare_tech_interview():
     """Prepare the technical interview by setting up the tech stack list using secure data"""
+    state = get_interview_state()
     tech_stack = get_candidate_data_securely("tech_stack")
     
     # Parse tech stack into list and clean up
@@ -148,56 +181,78 @@ def prepare_tech_interview():
         tech_list = ["General Programming"]
     
     # Store in session state
-    st.session_state["tech_stack_list"] = tech_list
-    st.session_state["current_tech_index"] = 0
-    st.session_state["current_tech_question_count"] = 0
+    state.tech_stack_list = tech_list
+    state.current_tech_index = 0
+    state.current_tech_question_count = 0
+    state.current_tech_signals = []
     
     # Calculate questions per tech (configurable)
-    st.session_state["questions_per_tech"] = QUESTIONS_PER_TECHNOLOGY
+    state.questions_per_tech = QUESTIONS_PER_TECHNOLOGY
     
     return tech_list
 
+def get_candidate_role():
+    """Get the first position the candidate is interested in"""
+    state = get_interview_state()
+    position = state.candidate_data.get("position", "Software Engineer")
+    if isinstance(position, list):
+        return position[0] if position else "Software Engineer"
+    return position.split(',')[0].strip() or "Software Engineer"
+
+def get_next_question_request():
+    """
+    Get the arguments for generating the next interview question.
+
+    Returns None (and marks the interview complete) once every technology is covered.
+    The request holds plain values only, so it can be generated off the script thread.
+    """
+    state = get_interview_state()
+    tech_list = state.tech_stack_list
+    current_tech_index = state.current_tech_index
+    
+    # Check if we've gone through all technologies
+    if current_tech_index >= len(tech_list):
+        state.interview_complete = True
+        return None
+    
+    return {
+        "tech_stack": state.candidate_data.get("tech_stack", ""),
+        "experience_level": state.candidate_data.get("experience", "3-5"),
+        "interested_role": get_candidate_role(),
+        "previous_question": state.previous_question,
+        "previous_answer": state.previous_answer,
+        "tech_focus": tech_list[current_tech_index]
+    }
+
+def record_tech_question(tech_focus, question):
+    """Store a generated question for the current technology and return it formatted for display"""
+    state = get_interview_state()
+    # Ensure we have a valid question
+    if not question or len(str(question).strip()) == 0:
+        question = f"Can you explain a basic concept in {tech_focus}?"
+    
+    # Format the question with tech focus for display and storage
+    formatted_question = f"[{tech_focus}] {question}"
+    
+    # Store the formatted question (this is what will be used for evaluation)
+    state.interview_questions.append(formatted_question)
+    state.previous_question = question  # Store raw question for follow-up generation
+    
+    return formatted_question
+
 def get_next_tech_question():
     """Generate and get the next interview question based on tech focus and previous Q&A"""
+    state = get_interview_state()
+    request = get_next_question_request()
+    if request is None:
+        return None
+    
     try:
-        from ai_service import generate_next_question
-        
-        tech_stack = st.session_state["candidate_data"].get("tech_stack", "")
-        tech_list = st.session_state["tech_stack_list"]
-        current_tech_index = st.session_state["current_tech_index"]
-        
-        # Check if we've gone through all technologies
-        if current_tech_index >= len(tech_list):
-            st.session_state["interview_complete"] = True
-            return None
-        
-        # Get current technology focus
-        current_tech = tech_list[current_tech_index]
-        
-        # Get previous question and answer if they exist
-        previous_question = st.session_state["previous_question"]
-        previous_answer = st.session_state["previous_answer"]
-        
-        # Generate the next question
-        question = generate_next_question(
-            tech_stack,
-            tech_focus=current_tech,
-            previous_question=previous_question,
-            previous_answer=previous_answer
-        )
-        
-        # Ensure we have a valid question
-        if not question or len(str(question).strip()) == 0:
-            question = f"Can you explain a basic concept in {current_tech}?"
+        from ai_service import generate_next_question_ollama
         
-        # Format the question with tech focus for display and storage
-        formatted_question = f"[{current_tech}] {question}"
-        
-        # Store the formatted question (this is what will be used for evaluation)
-        st.session_state["interview_questions"].append(formatted_question)
-        st.session_state["previous_question"] = question  # Store raw question for follow-up generation
-        
-        return formatted_question
+        logger.info(f"Generating next question for tech_focus: '{request['tech_focus']}' with previous Q&A")
+        question = generate_next_question_ollama(**request)
+        return record_tech_question(request["tech_focus"], question)
         
     except Exception as e:
         logger.error(f"Error in get_next_tech_question: {str(e)}")
@@ -205,70 +260,101 @@ def get_next_tech_question():
         logger.error(traceback.format_exc())
         
         # Return a fallback question
-        current_tech = st.session_state["tech_stack_list"][st.session_state["current_tech_index"]] if st.session_state["tech_stack_list"] else "programming"
+        current_tech = request["tech_focus"]
         fallback_question = f"[{current_tech}] Can you explain a basic concept in {current_tech}? [Error occurred during generation]"
         
         # Still store it for consistency
-        st.session_state["interview_questions"].append(fallback_question)
-        st.session_state["previous_question"] = fallback_question
+        state.interview_questions.append(fallback_question)
+        state.previous_question = fallback_question
         
         return fallback_question
 
+def should_move_to_next_technology():
+    """Decide whether another follow-up on the current technology would add information"""
+    state = get_interview_state()
+    question_count = state.current_tech_question_count
+    
+    if not ADAPTIVE_INTERVIEW_CONFIG.get("enabled", False):
+        return question_count >= state.questions_per_tech
+    
+    if question_count < ADAPTIVE_INTERVIEW_CONFIG.get("min_questions_per_technology", 1):
+        return False
+    if question_count >= state.questions_per_tech:
+        # Never more questions than fixed mode would ask
+        return True
+    
+    # Clearly weak or clearly strong answers so far: another follow-up would not change the rating
+    signals = state.current_tech_signals
+    running_signal = sum(signals) / len(signals) if signals else 0.0
+    low, high = ADAPTIVE_INTERVIEW_CONFIG.get("follow_up_band", (0.3, 0.7))
+    move_on = not (low < running_signal < high)
+    logger.info(f"Adaptive follow-up: signal={running_signal:.2f} after {question_count} question(s), move_on={move_on}")
+    return move_on
+
 def store_interview_answer(answer):
     """Store candidate's answer and prepare for next question"""
+    state = get_interview_state()
     # Store the answer
-    st.session_state["interview_answers"].append(answer)
-    st.session_state["previous_answer"] = answer
+    state.interview_answers.append(answer)
+    state.previous_answer = answer
     
     # Update counters
-    st.session_state["current_tech_question_count"] += 1
+    state.current_tech_question_count += 1
+    
+    # Screen the answer locally - a non-answer never gets a follow-up on the same technology
+    tech_list = state.tech_stack_list
+    current_tech_index = state.current_tech_index
+    current_tech = tech_list[current_tech_index] if current_tech_index < len(tech_list) else None
+    screening = screen_answer(answer, state.previous_question, current_tech)
+    state.current_tech_signals.append(screening["signal"])
+    if is_non_answer(screening):
+        logger.info(f"Answer pre-screened as {screening['verdict']} ({screening['reason']}) - skipping follow-ups")
     
     # Check if we should move to the next technology
-    if st.session_state["current_tech_question_count"] >= st.session_state["questions_per_tech"]:
-        st.session_state["current_tech_index"] += 1
-        st.session_state["current_tech_question_count"] = 0
-        st.session_state["previous_question"] = None
-        st.session_state["previous_answer"] = None
+    if is_non_answer(screening) or should_move_to_next_technology():
+        state.current_tech_index += 1
+        state.current_tech_question_count = 0
+        state.current_tech_signals = []
+        state.previous_question = None
+        state.previous_answer = None
     
     # Check if interview is complete
-    if st.session_state["current_tech_index"] >= len(st.session_state["tech_stack_list"]):
-        st.session_state["interview_complete"] = True
+    if state.current_tech_index >= len(state.tech_stack_list):
+        state.interview_complete = True
         return True
     
     return False
 
 def get_question_answer_pairs():
     """Get pairs of questions and answers for evaluation"""
-    pairs = []
-    for i, question in enumerate(st.session_state["interview_questions"]):
-        if i < len(st.session_state["interview_answers"]):
-            pairs.append({
-                "question": question,
-                "answer": st.session_state["interview_answers"][i]
-            })
-    return pairs
+    return get_interview_state().qa_pairs()
 
 def store_candidate_rating(rating_data):
     """Store the rating data for the candidate"""
-    st.session_state["candidate_rating"] = rating_data
+    state = get_interview_state()
+    state.candidate_rating = rating_data
     
 def store_overall_rating(rating):
     """Store the overall rating for the candidate"""
-    st.session_state["overall_rating"] = rating
+    state = get_interview_state()
+    state.overall_rating = rating
 
 def is_technicalinterview_in_progress():
     """Check if the technical interview is in progress"""
+    state = get_interview_state()
     # Check if we have tech_stack_list populated and the interview isn't complete
-    return (len(st.session_state["tech_stack_list"]) > 0 and 
-            not st.session_state["interview_complete"])
+    return (len(state.tech_stack_list) > 0 and 
+            not state.interview_complete)
 
 def is_interview_complete():
     """Check if the technical interview is complete"""
-    return st.session_state["interview_complete"]
+    state = get_interview_state()
+    return state.interview_complete
 
 def get_rating_display():
     """Get HTML for displaying the candidate rating"""
-    if not st.session_state["candidate_rating"]:
+    state = get_interview_state()
+    if not state.candidate_rating:
         return ""
     
     rating_html = "<div style='background-color: #1e1e1e; color: white; padding: 20px; border-radius: 10px; margin-top: 20px; border: 1px solid #333;'>"
@@ -277,14 +363,14 @@ def get_rating_display():
     # Add skill ratings
     rating_html += "<h4 style='color: white; margin-bottom: 10px;'>Technical Skills Assessment:</h4>"
     rating_html += "<ul style='color: white; margin: 0; padding-left: 20px;'>"
-    for skill, score in st.session_state["candidate_rating"].items():
+    for skill, score in state.candidate_rating.items():
         # Convert numerical score to stars for visual appeal
         stars = "★" * int(score) + "☆" * (5 - int(score))
         rating_html += f"<li style='color: white; margin-bottom: 5px;'><strong style='color: white;'>{skill}:</strong> <span style='color: #ffd700;'>{stars}</span> <span style='color: #ccc;'>({score}/5)</span></li>"
     rating_html += "</ul>"
     
     # Add overall rating with appropriate color (brighter colors for dark background)
-    overall = st.session_state["overall_rating"]
+    overall = state.overall_rating
     color_map = {
         "Very Strong Hire": "#4CAF50",  # Bright green
         "Strong Hire": "#66BB6A",       # Light green
@@ -303,6 +389,7 @@ def get_rating_display():
 
 def store_candidate_data_securely(key: str, value: str):
     """Securely store candidate data with encryption if enabled"""
+    state = get_interview_state()
     try:
         if SECURITY_CONFIG.get("enable_encryption", True) and hasattr(st.session_state, "encryption"):
             encryption = st.session_state.encryption
@@ -310,44 +397,49 @@ def store_candidate_data_securely(key: str, value: str):
             # Encrypt sensitive fields
             if DataPrivacyManager.is_sensitive_field(key):
                 encrypted_value = encryption.encrypt_data(value)
-                st.session_state["candidate_data"][key] = encrypted_value
+                state.candidate_data[key] = encrypted_value
+                state.decrypted_cache.invalidate(key)
                 # Store whether this field is encrypted
-                if "encrypted_fields" not in st.session_state:
-                    st.session_state["encrypted_fields"] = set()
-                st.session_state["encrypted_fields"].add(key)
+                state.encrypted_fields.add(key)
                 
                 # Log anonymized version
                 anonymized_data = DataPrivacyManager.anonymize_for_logging({key: value})
                 logger.info(f"Stored encrypted data: {anonymized_data}")
             else:
                 # Non-sensitive data can be stored as-is
-                st.session_state["candidate_data"][key] = value
+                state.candidate_data[key] = value
         else:
             # Fallback to regular storage
-            st.session_state["candidate_data"][key] = value
+            state.candidate_data[key] = value
             
     except Exception as e:
         logger.error(f"Error storing candidate data securely: {e}")
         # Fallback to regular storage
-        st.session_state["candidate_data"][key] = value
+        state.candidate_data[key] = value
 
 def get_candidate_data_securely(key: str) -> str:
     """Securely retrieve candidate data with decryption if needed"""
+    state = get_interview_state()
     try:
-        if key not in st.session_state["candidate_data"]:
+        if key not in state.candidate_data:
             return ""
             
-        value = st.session_state["candidate_data"][key]
+        value = state.candidate_data[key]
         
         # Check if this field was encrypted
-        encrypted_fields = st.session_state.get("encrypted_fields", set())
+        encrypted_fields = state.encrypted_fields
         if key in encrypted_fields and hasattr(st.session_state, "encryption"):
-            encryption = st.session_state.encryption
-            return encryption.decrypt_data(value)
+            # Reruns read the same fields over and over - only decrypt a ciphertext once
+            plaintext = state.decrypted_cache.get(key, value)
+            if plaintext is None:
+                plaintext = st.session_state.encryption.decrypt_data(value)
+                if plaintext != value:
+                    state.decrypted_cache.put(key, value, plaintext)
+            return plaintext
         else:
             return value
             
     except Exception as e:
         logger.error(f"Error retrieving candidate data securely: {e}")
         # Fallback to returning raw value
-        return st.session_state["candidate_data"].get(key, "")
+        return state.candidate_data.get(key, "")
@@ -0,0 +1,154 @@
+"""
+Process-wide registry of live interview sessions
+A reaper thread spills idle sessions to the session store and evicts expired ones,
+so abandoned tabs do not hold interview data in server memory
+"""
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from config import SESSION_REGISTRY_CONFIG, SECURITY_CONFIG
+from interview_state import InterviewState
+from session_store import session_store
+
+logger = logging.getLogger("session_registry")
+
+def estimate_state_bytes(state: InterviewState) -> int:
+    """Approximate memory held by an interview state (text content dominates)"""
+    total = sum(len(message.content) for message in state.messages)
+    total += sum(len(text) for text in state.interview_questions)
+    total += sum(len(text) for text in state.interview_answers)
+    total += sum(len(str(value)) for value in state.candidate_data.values())
+    return total
+
+class SessionEntry:
+    """Bookkeeping for one live session"""
+
+    __slots__ = ("state", "resume_token", "last_activity", "bytes")
+
+    def __init__(self, state: InterviewState, resume_token: Optional[str]):
+        self.state = state
+        self.resume_token = resume_token
+        self.last_activity = time.time()
+        self.bytes = estimate_state_bytes(state)
+
+class SessionRegistry:
+    """Track live sessions' activity and footprint, and release idle ones"""
+
+    def __init__(self, session_store=None, timeout_seconds: float = 1800, spill_after_seconds: Optional[float] = None):
+        self.session_store = session_store
+        self.timeout_seconds = timeout_seconds
+        self.spill_after_seconds = spill_after_seconds
+        self._sessions: Dict[str, SessionEntry] = {}
+        self._spilled: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self.spills = 0
+        self.evictions = 0
+
+    def touch(self, session_id: str, state: InterviewState, resume_token: Optional[str] = None) -> Optional[str]:
+        """
+        Record activity for a session.
+
+        Returns the resume token if the session was spilled while idle - the caller must
+        then reload its state from the session store, the in-memory copy was released.
+        """
+        with self._lock:
+            spilled = self._spilled.pop(session_id, None)
+            if spilled is None:
+                entry = self._sessions.get(session_id)
+                if entry is None or entry.state is not state:
+                    entry = SessionEntry(state, resume_token)
+                    self._sessions[session_id] = entry
+                entry.last_activity = time.time()
+                entry.resume_token = resume_token
+                entry.bytes = estimate_state_bytes(state)
+        return spilled[0] if spilled else None
+
+    def forget(self, session_id: str) -> None:
+        """Stop tracking a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._spilled.pop(session_id, None)
+
+    def reap(self) -> None:
+        """Spill idle sessions and evict expired ones"""
+        now = time.time()
+        with self._lock:
+            for session_id, entry in list(self._sessions.items()):
+                idle = now - entry.last_activity
+                if idle > self.timeout_seconds:
+                    # Same outcome as the session expiring in the browser: the interview is gone
+                    self._delete_snapshot(entry.resume_token)
+                    entry.state.reset()
+                    del self._sessions[session_id]
+                    self.evictions += 1
+                elif (self.spill_after_seconds is not None and idle > self.spill_after_seconds
+                      and entry.resume_token and self.session_store is not None
+                      and entry.state.pending_job is None):
+                    if self.session_store.save(entry.resume_token, entry.state.to_dict()):
+                        entry.state.reset()
+                        del self._sessions[session_id]
+                        self._spilled[session_id] = (entry.resume_token, entry.last_activity)
+                        self.spills += 1
+
+            for session_id, (resume_token, last_activity) in list(self._spilled.items()):
+                if now - last_activity > self.timeout_seconds:
+                    self._delete_snapshot(resume_token)
+                    del self._spilled[session_id]
+                    self.evictions += 1
+
+        stats = self.stats()
+        logger.info(
+            f"Live sessions: {stats['sessions']}, ~{stats['bytes'] / 1024:.1f} KB, "
+            f"spilled: {stats['spilled']}, evicted so far: {stats['evictions']}"
+        )
+
+    def _delete_snapshot(self, resume_token: Optional[str]) -> None:
+        if resume_token and self.session_store is not None:
+            self.session_store.delete(resume_token)
+
+    def stats(self) -> Dict[str, int]:
+        """Session count and memory metrics"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": sum(entry.bytes for entry in self._sessions.values()),
+                "spilled": len(self._spilled),
+                "spills": self.spills,
+                "evictions": self.evictions
+            }
+
+    def start_reaper(self, interval_seconds: float = 60) -> None:
+        """Run reap() periodically on a daemon thread (once per process)"""
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_forever, args=(interval_seconds,), name="session-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def _reap_forever(self, interval_seconds: float) -> None:
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Session reaper failed: {e}")
+
+def create_session_registry() -> Optional[SessionRegistry]:
+    """Create the registry and start its reaper as configured"""
+    if not SESSION_REGISTRY_CONFIG.get("enabled", True):
+        return None
+    spill_after_minutes = SESSION_REGISTRY_CONFIG.get("spill_after_minutes")
+    registry = SessionRegistry(
+        session_store=session_store,
+        timeout_seconds=SECURITY_CONFIG.get("session_timeout_minutes", 30) * 60,
+        spill_after_seconds=spill_after_minutes * 60 if spill_after_minutes is not None else None
+    )
+    registry.start_reaper(SESSION_REGISTRY_CONFIG.get("reap_interval_seconds", 60))
+    return registry
+
+# Global instance shared by every session in this process
+session_registry = create_session_registry()
@@ -0,0 +1,196 @@
+"""
+Server-side store for interview snapshots
+Lets a candidate resume an interview after a dropped connection or an app restart
+"""
+import os
+import json
+import time
+import hashlib
+import secrets
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterator, Optional
+from config import SESSION_STORE_CONFIG, SECURITY_CONFIG
+from security.encryption import DataEncryption, get_data_encryption
+
+logger = logging.getLogger("session_store")
+
+def new_resume_token() -> str:
+    """Generate an unguessable resume token for a session"""
+    return secrets.token_urlsafe(24)
+
+def token_key(token: str) -> str:
+    """Storage key for a resume token (the token itself is never stored)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class SQLiteSessionStore:
+    """Keep snapshots in a local SQLite database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS interview_sessions ("
+            "key TEXT PRIMARY KEY, snapshot TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_interview_sessions_updated ON interview_sessions(updated_at)")
+        self._conn.commit()
+
+    def save(self, key: str, snapshot: str) -> None:
+        """Insert or replace a snapshot"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO interview_sessions (key, snapshot, updated_at) VALUES (?, ?, ?)",
+                (key, snapshot, time.time())
+            )
+            self._conn.commit()
+
+    def load(self, key: str) -> Optional[str]:
+        """Get a snapshot, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT snapshot FROM interview_sessions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def iter_snapshots(self) -> Iterator[str]:
+        """Every stored snapshot (key rotation checks)"""
+        with self._lock:
+            snapshots = [row[0] for row in self._conn.execute("SELECT snapshot FROM interview_sessions")]
+        return iter(snapshots)
+
+    def delete(self, key: str) -> None:
+        """Remove a snapshot"""
+        with self._lock:
+            self._conn.execute("DELETE FROM interview_sessions WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self, max_age_seconds: float) -> int:
+        """Remove snapshots not updated within max_age_seconds. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM interview_sessions WHERE updated_at < ?", (time.time() - max_age_seconds,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+class FileSessionStore:
+    """Keep one snapshot file per session in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.snapshot")
+
+    def save(self, key: str, snapshot: str) -> None:
+        """Write a snapshot atomically so a crash never leaves a torn file"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, path)
+
+    def load(self, key: str) -> Optional[str]:
+        """Get a snapshot, or None"""
+        try:
+            with open(self._path(key)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def iter_snapshots(self) -> Iterator[str]:
+        """Every stored snapshot (key rotation checks)"""
+        for name in os.listdir(self.directory):
+            if name.endswith(".snapshot"):
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        yield f.read()
+                except OSError:
+                    continue
+
+    def delete(self, key: str) -> None:
+        """Remove a snapshot"""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self, max_age_seconds: float) -> int:
+        """Remove snapshots not updated within max_age_seconds. Returns the number removed."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+class SessionSnapshotManager:
+    """Serialize, encrypt and store interview state snapshots by resume token"""
+
+    def __init__(self, backend, encryption: Optional[DataEncryption] = None):
+        self.backend = backend
+        self.encryption = encryption
+
+    def save(self, token: str, state_data: Dict[str, Any]) -> bool:
+        """Store a snapshot of InterviewState.to_dict() output"""
+        try:
+            snapshot = json.dumps(state_data, separators=(",", ":"))
+            if self.encryption:
+                # Fields encrypted in the state stay encrypted; the whole snapshot is encrypted on top
+                snapshot = self.encryption.encrypt_data(snapshot)
+            self.backend.save(token_key(token), snapshot)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save session snapshot: {e}")
+            return False
+
+    def load(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get the snapshot stored for a resume token, or None"""
+        try:
+            snapshot = self.backend.load(token_key(token))
+            if snapshot is None:
+                return None
+            if self.encryption:
+                snapshot = self.encryption.decrypt_data(snapshot)
+            return json.loads(snapshot)
+        except Exception as e:
+            logger.error(f"Failed to load session snapshot: {e}")
+            return None
+
+    def delete(self, token: str) -> None:
+        """Forget the snapshot for a resume token"""
+        try:
+            self.backend.delete(token_key(token))
+        except Exception as e:
+            logger.error(f"Failed to delete session snapshot: {e}")
+
+def create_session_store() -> Optional[SessionSnapshotManager]:
+    """Create the snapshot manager selected in SESSION_STORE_CONFIG"""
+    if not SESSION_STORE_CONFIG.get("enabled", True):
+        return None
+    if SESSION_STORE_CONFIG.get("backend") == "file":
+        backend = FileSessionStore(SESSION_STORE_CONFIG.get("file_dir", "session_snapshots"))
+    else:
+        backend = SQLiteSessionStore(SESSION_STORE_CONFIG.get("sqlite_path", "interview_sessions.db"))
+
+    removed = backend.purge_expired(SESSION_STORE_CONFIG.get("ttl_hours", 24) * 3600)
+    if removed:
+        logger.info(f"Purged {removed} expired session snapshots")
+
+    encryption = get_data_encryption() if SECURITY_CONFIG.get("enable_encryption", True) else None
+    return SessionSnapshotManager(backend, encryption)
+
+# Global instance shared by every session in this process
+try:
+    session_store = create_session_store()
+except Exception as e:
+    logger.error(f"Failed to initialize session store: {e}")
+    session_store = None
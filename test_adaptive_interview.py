@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for adaptive per-technology follow-ups
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import streamlit as st
+from config import ADAPTIVE_INTERVIEW_CONFIG, QUESTIONS_PER_TECHNOLOGY
+from interview_state import InterviewState
+from session_manager import should_move_to_next_technology
+
+def decide(question_count, signals, questions_per_tech=3, **config):
+    """Follow-up decision for one technology with the given adaptive settings"""
+    state = InterviewState()
+    state.questions_per_tech = questions_per_tech
+    state.current_tech_question_count = question_count
+    state.current_tech_signals = list(signals)
+    st.session_state["interview"] = state
+
+    saved = dict(ADAPTIVE_INTERVIEW_CONFIG)
+    ADAPTIVE_INTERVIEW_CONFIG.update(config)
+    try:
+        return should_move_to_next_technology()
+    finally:
+        ADAPTIVE_INTERVIEW_CONFIG.clear()
+        ADAPTIVE_INTERVIEW_CONFIG.update(saved)
+
+def test_adaptive_decisions():
+    """Test the minimum, maximum and follow-up band decisions"""
+    print("=== Testing Adaptive Follow-Ups ===")
+
+    adaptive = {"enabled": True, "min_questions_per_technology": 2, "follow_up_band": (0.3, 0.7)}
+    assert not decide(1, [0.9], **adaptive), "The minimum is always asked"
+    assert decide(3, [0.5, 0.5, 0.5], **adaptive), "Never more than questions_per_tech"
+    assert not decide(2, [0.4, 0.6], **adaptive), "An ambiguous signal gets a follow-up"
+    assert decide(2, [0.1, 0.2], **adaptive), "Clearly weak answers move on"
+    assert decide(2, [0.8, 0.9], **adaptive), "Clearly strong answers move on"
+    assert not decide(2, [0.9, 0.9], enabled=False), "Fixed mode asks questions_per_tech"
+    print("Minimum, maximum and band respected")
+
+def test_adaptive_cuts_fixed_budget():
+    """Test that adaptive mode stops before the fixed budget and the defaults keep interview length"""
+    assert decide(1, [0.1], questions_per_tech=3, enabled=True, min_questions_per_technology=1)
+    assert not decide(1, [0.1], questions_per_tech=3, enabled=False)
+    assert decide(QUESTIONS_PER_TECHNOLOGY, [0.5] * QUESTIONS_PER_TECHNOLOGY,
+                  questions_per_tech=QUESTIONS_PER_TECHNOLOGY, enabled=True), "Adaptive never asks more"
+    assert QUESTIONS_PER_TECHNOLOGY == 1 and not ADAPTIVE_INTERVIEW_CONFIG["enabled"], "Adaptive mode is opt-in"
+    print("Clear answers stop after 1 of 3 questions")
+
+if __name__ == "__main__":
+    test_adaptive_decisions()
+    test_adaptive_cuts_fixed_budget()
+    print("\n=== All Tests Passed ===")
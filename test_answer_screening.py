@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for local answer pre-screening
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from answer_screening import screen_answers, screen_answer, is_non_answer
+from ai_service import prescreen_qa_pairs
+
+def test_non_answers():
+    """Test that empty and non-answers are caught without a model call"""
+    print("=== Testing Non-Answers ===")
+
+    question = "How would you find a memory leak in a long-running Python service?"
+    answers = ["", "   ", "idk", "Skip.", "I don't know", "yes", "whatever"]
+
+    results = screen_answers(answers, [question] * len(answers), ["Python"] * len(answers))
+    for answer, result in zip(answers, results):
+        print(f"'{answer}': {result['verdict']} ({result['reason']})")
+        assert is_non_answer(result)
+        assert result["signal"] == 0.0
+
+def test_real_answers():
+    """Test that genuine answers pass and get a signal"""
+    print("\n=== Testing Real Answers ===")
+
+    question = "How would you find a memory leak in a long-running Python service?"
+    short = "Compare tracemalloc snapshots to find growing allocations."
+    detailed = (
+        "I would take tracemalloc snapshots at intervals in the long-running service, compare them "
+        "to find which allocation sites keep growing, and check caches or global lists that hold "
+        "references. For C extensions I would also watch RSS and use a heap profiler."
+    )
+
+    short_result = screen_answer(short, question, "Python")
+    detailed_result = screen_answer(detailed, question, "Python")
+    print(f"Short: {short_result}")
+    print(f"Detailed: {detailed_result}")
+    assert not is_non_answer(short_result)
+    assert not is_non_answer(detailed_result)
+    assert detailed_result["signal"] > short_result["signal"]
+
+def test_short_correct_answers():
+    """Test that short but correct answers are left for the model to rate"""
+    print("\n=== Testing Short Correct Answers ===")
+
+    cases = [
+        ("Which data structure gives average O(1) lookups by key?", "Hash table", "Python"),
+        ("Which data structure gives average O(1) lookups by key?", "A hash map", "Java"),
+        ("How do you find an item in a sorted array in O(log n)?", "Binary search", "Python"),
+        ("How would you find a memory leak in a long-running Python service?", "Use tracemalloc and compare snapshots", "Python"),
+        ("How would you find a memory leak in a long-running Python service?", "Use a heap profiler like tracemalloc", "Python"),
+    ]
+    results = screen_answers([answer for _, answer, _ in cases], [question for question, _, _ in cases],
+                             [tech for _, _, tech in cases])
+    for (_, answer, _), result in zip(cases, results):
+        print(f"'{answer}': {result['verdict']} (signal {result['signal']})")
+        assert not is_non_answer(result), f"'{answer}' must be rated by the model"
+
+    rated_pairs, prescreened_ratings = prescreen_qa_pairs(
+        [{"question": f"[{tech}] {question}", "answer": answer} for question, answer, tech in cases]
+    )
+    assert len(rated_pairs) == len(cases) and prescreened_ratings == {}
+
+def test_prescreen_qa_pairs():
+    """Test that technologies with only non-answers get a fixed rating"""
+    print("\n=== Testing Q&A Pre-Screening ===")
+
+    qa_pairs = [
+        {"question": "[Python] How do generators save memory?", "answer": "They yield items lazily instead of building the whole list in memory."},
+        {"question": "[React] How do you avoid unnecessary re-renders?", "answer": "idk"},
+    ]
+    rated_pairs, prescreened_ratings = prescreen_qa_pairs(qa_pairs)
+    print(f"Pairs sent to the model: {len(rated_pairs)}")
+    print(f"Pre-screened ratings: {prescreened_ratings}")
+    assert len(rated_pairs) == 1
+    assert prescreened_ratings == {"React": 1}
+
+if __name__ == "__main__":
+    test_non_answers()
+    test_real_answers()
+    test_short_correct_answers()
+    test_prescreen_qa_pairs()
+    print("\n=== All Tests Passed ===")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy Supabase client pool
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from database.connection import SupabaseManager, DatabaseUnavailable
+from database.storage import SupabaseStorage, MissingSchemaError
+
+class CountingManager(SupabaseManager):
+    """Pool whose clients are plain objects, so no network is needed"""
+
+    def __init__(self, **config):
+        super().__init__("https://example.supabase.co", "key", dict(config))
+        self.opened = 0
+
+    def _create_client(self):
+        self.opened += 1
+        return object()
+
+def test_pool_is_lazy_and_bounded():
+    """Test that clients are only created on demand, reused and capped at pool_size"""
+    print("=== Testing Database Client Pool ===")
+    manager = CountingManager(pool_size=2, acquire_timeout_seconds=5)
+    assert manager.opened == 0 and manager.is_available(), "No client may be created up front"
+
+    with manager.client() as first:
+        pass
+    with manager.client() as again:
+        assert again is first, "An idle client must be reused"
+
+    in_use = []
+    release = threading.Event()
+    def borrow():
+        with manager.client() as client:
+            in_use.append(client)
+            release.wait(5)
+    threads = [threading.Thread(target=borrow) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    # Two clients are busy, the third borrower waits for one of them
+    assert manager.opened == 2 and len(in_use) == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(in_use) == 3 and manager.opened == 2
+    print(f"3 concurrent operations served by {manager.opened} clients")
+
+def test_reconnect_backoff():
+    """Test that a broken connection is discarded and retried only after the backoff"""
+    manager = CountingManager(pool_size=1, base_backoff_seconds=0.2, max_backoff_seconds=1)
+    try:
+        with manager.client():
+            raise httpx.ConnectError("connection refused")
+    except httpx.ConnectError:
+        pass
+
+    assert not manager.is_available()
+    try:
+        with manager.client():
+            raise AssertionError("No client may be handed out during the backoff")
+    except DatabaseUnavailable:
+        pass
+
+    time.sleep(0.3)
+    with manager.client():
+        pass
+    assert manager.opened == 2 and manager.is_available()
+    print("Broken client replaced after the backoff")
+
+def test_save_requires_stored_function():
+    """Test that a missing save_interview function fails loudly instead of inserting table by table"""
+    class Client:
+        tables = []
+        def rpc(self, name, params):
+            raise Exception("PGRST202: Could not find the function public.save_interview")
+        def table(self, name):
+            self.tables.append(name)
+            raise AssertionError("No table may be written without the stored function")
+
+    manager = CountingManager(pool_size=1)
+    manager._create_client = Client
+    try:
+        SupabaseStorage(manager).save_interview_records({"interview": {"id": "1"}})
+        raise AssertionError("The save must fail")
+    except MissingSchemaError as e:
+        print(f"Save refused: {e}")
+    assert Client.tables == []
+
+if __name__ == "__main__":
+    test_pool_is_lazy_and_bounded()
+    test_reconnect_backoff()
+    test_save_requires_stored_function()
+    print("\n=== All Tests Passed ===")
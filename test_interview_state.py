@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the InterviewState container
+"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from interview_state import InterviewState, Message, DecryptedValueCache
+
+def build_state():
+    """Build a state part-way through an interview"""
+    state = InterviewState()
+    state.add_message("assistant", "What's your full name?")
+    state.add_message("user", "Jane Doe")
+    state.current_step = 7
+    state.candidate_data = {"name": "gAAAAA-encrypted-name", "tech_stack": "Python, React"}
+    state.encrypted_fields.add("name")
+    state.tech_stack_list = ["Python", "React"]
+    state.interview_questions.append("[Python] How do generators save memory?")
+    state.interview_answers.append("They yield items lazily.")
+    return state
+
+def test_serialization_round_trip():
+    """Test that to_dict/from_dict keeps everything and is JSON-safe"""
+    print("=== Testing Serialization ===")
+
+    state = build_state()
+    data = json.loads(json.dumps(state.to_dict()))
+    restored = InterviewState.from_dict(data)
+
+    print(f"Serialized keys: {sorted(data)}")
+    assert restored.messages == state.messages
+    assert isinstance(restored.messages[0], Message)
+    assert restored.encrypted_fields == {"name"}
+    assert restored.candidate_data["name"] == "gAAAAA-encrypted-name"
+    assert restored.qa_pairs() == state.qa_pairs()
+
+def test_snapshot_is_independent():
+    """Test that a snapshot does not change with the live state"""
+    print("\n=== Testing Snapshot ===")
+
+    state = build_state()
+    snapshot = state.snapshot()
+    state.interview_answers.append("Another answer")
+    state.candidate_data["location"] = "Berlin"
+
+    print(f"Live answers: {len(state.interview_answers)}, snapshot answers: {len(snapshot.interview_answers)}")
+    assert len(snapshot.interview_answers) == 1
+    assert "location" not in snapshot.candidate_data
+
+def test_reset_and_clear():
+    """Test the single reset path and sensitive data clearing"""
+    print("\n=== Testing Reset ===")
+
+    state = build_state()
+    state.clear_sensitive_data()
+    assert state.candidate_data == {} and state.interview_answers == []
+    assert state.current_step == 7
+
+    interview_id = state.interview_id
+    state.reset()
+    assert state.interview_id != interview_id, "A new interview must get a new ID"
+    assert dict(state.to_dict(), interview_id=None) == dict(InterviewState().to_dict(), interview_id=None)
+    assert InterviewState.from_dict(state.to_dict()).interview_id == state.interview_id
+    print("Reset state matches a new state")
+
+def test_decrypted_cache():
+    """Test that decrypted values are bounded, validated and never serialized"""
+    print("\n=== Testing Decrypted Value Cache ===")
+
+    cache = DecryptedValueCache(max_entries=2)
+    cache.put("name", "cipher-1", "Jane Doe")
+    cache.put("email", "cipher-2", "jane@example.com")
+    cache.put("phone", "cipher-3", "5551234567")
+    assert cache.get("name", "cipher-1") is None, "Least recently used entry should be evicted"
+    assert cache.get("phone", "cipher-3") == "5551234567"
+    assert cache.get("phone", "cipher-other") is None, "A changed ciphertext must not hit"
+
+    state = build_state()
+    state.decrypted_cache.put("email", "gAAAAA-encrypted-email", "jane@example.com")
+    assert "jane@example.com" not in json.dumps(state.to_dict())
+    state.clear_sensitive_data()
+    assert state.decrypted_cache.get("email", "gAAAAA-encrypted-email") is None
+    print("Cache is bounded and wiped with sensitive data")
+
+def test_candidate_report():
+    """Test that the candidate report is built from the interview state"""
+    print("\n=== Testing Candidate Report ===")
+    import streamlit as st
+    from utils import send_candidate_report_email
+
+    state = build_state()
+    state.candidate_rating = {"Python": 4}
+    state.overall_rating = "Good"
+    st.session_state["interview"] = state
+    sent, message = send_candidate_report_email()
+    print(message)
+    assert sent, message
+
+if __name__ == "__main__":
+    test_serialization_round_trip()
+    test_snapshot_is_independent()
+    test_reset_and_clear()
+    test_decrypted_cache()
+    test_candidate_report()
+    print("\n=== All Tests Passed ===")
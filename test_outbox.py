@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the interview write-behind outbox
+"""
+
+import sys
+import os
+import tempfile
+import uuid
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.outbox import InterviewOutbox
+
+def test_outbox_idempotency_and_retry():
+    """Test that entries are queued once, retried with backoff and removed once saved"""
+    print("=== Testing Interview Outbox ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        outbox = InterviewOutbox(os.path.join(directory, "outbox.db"), base_backoff_seconds=0)
+        key = str(uuid.uuid4())
+
+        records = {"interview": {"id": key}, "candidate": {}, "qa": [], "ratings": []}
+        assert outbox.append(key, records)
+        assert not outbox.append(key, records), "The same interview must only be queued once"
+
+        saved = []
+        def failing_save(payload):
+            raise ConnectionError("database unreachable")
+
+        assert outbox.flush(failing_save) == 0
+        assert outbox.pending_count() == 1, "A failed entry must stay queued"
+        print(f"Attempts after failure: {outbox.due(10)[0][2]}")
+
+        assert outbox.flush(saved.append) == 1
+        assert saved == [records] and outbox.pending_count() == 0
+
+        # A new outbox on the same file sees what a previous process left behind
+        outbox.append(str(uuid.uuid4()), records)
+        assert InterviewOutbox(outbox.path).pending_count() == 1
+
+        # An entry that keeps failing is parked instead of retried forever
+        stuck = InterviewOutbox(os.path.join(directory, "stuck.db"), base_backoff_seconds=0, max_attempts=2)
+        stuck.append("stuck", records)
+        stuck.flush(failing_save)
+        assert stuck.pending_count() == 1 and not stuck.parked()
+        stuck.flush(failing_save)
+        assert stuck.pending_count() == 0 and stuck.due(10) == []
+        assert stuck.parked() == [("stuck", 2, "database unreachable")]
+        assert stuck.requeue_parked() == 1 and stuck.flush(saved.append) == 1 and not stuck.parked()
+
+        # Erasure requests drop queued interviews of the same email hash
+        outbox.append("session-3", {"interview": {"id": "session-3", "email_hash": "abc"}})
+        assert outbox.discard_email_hashes(["abc"]) == 1 and outbox.pending_count() == 1
+    print("Outbox queues once, retries and survives restarts")
+
+if __name__ == "__main__":
+    test_outbox_idempotency_and_retry()
+    print("\n=== All Tests Passed ===")
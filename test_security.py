@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from security.encryption import DataEncryption
+from security.key_ring import KeyRing
 from security.data_privacy import DataPrivacyManager
 from security.gdpr_compliance import GDPRCompliance
 from validators import sanitize_input, validate_email, validate_name, validate_phone
@@ -33,6 +34,208 @@ def test_encryption():
     print(f"Email hash: {email_hash}")
     print()
 
+def test_blind_index():
+    """Test that the blind index normalizes its input and depends on the index key"""
+    import tempfile
+    from security.blind_index import BlindIndex
+    
+    with tempfile.TemporaryDirectory() as directory:
+        index = BlindIndex(os.path.join(directory, "index_key"))
+        other = BlindIndex(os.path.join(directory, "other_key"))
+        assert index.email("Jane@Example.com ") == index.email("jane@example.com")
+        assert index.email("jane@example.com") != other.email("jane@example.com")
+        assert index.phone("+1 (555) 010-0100") == index.phone("15550100100")
+        assert index.phone("123") is None
+        # Reloading the key file gives the same index
+        assert BlindIndex(index.key_file).email("jane@example.com") == index.email("jane@example.com")
+    print("Blind index working")
+
+def test_email_verification():
+    """Test that one-time codes go to the given address and only unlock their own subject"""
+    import time
+    from security.verification import EmailVerifier
+    
+    sent = {}
+    verifier = EmailVerifier({"max_attempts": 2, "code_ttl_seconds": 60},
+                             send=lambda address, code: sent.update({address: code}))
+    challenge = verifier.start("interview-1", "jane@example.com")
+    code = sent["jane@example.com"]
+    assert code not in str(challenge), "Only a hash of the code may be kept"
+    assert not verifier.check(challenge, "not-the-code")
+    assert verifier.check(challenge, f" {code} ")
+    assert verifier.is_exhausted(challenge), "Attempts are used up by every check"
+    
+    other = verifier.start("interview-2", "jane@example.com")
+    assert not verifier.check(dict(other, code_hash=challenge["code_hash"]), code)
+    expired = dict(verifier.start("interview-1", "jane@example.com"), expires_at=time.time() - 1)
+    assert not verifier.check(expired, sent["jane@example.com"])
+    assert EmailVerifier({}).start("interview-1", "jane@example.com") is None, "No transport, no challenge"
+    print("Email verification codes working")
+
+def test_key_ring_rotation():
+    """Test that rotated-out keys still decrypt and concurrent loads agree on the key"""
+    print("Testing key ring...")
+    import tempfile
+    import threading
+    
+    with tempfile.TemporaryDirectory() as directory:
+        key_file = os.path.join(directory, "keys")
+        rings = []
+        threads = [threading.Thread(target=lambda: rings.append(KeyRing(key_file))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({ring.primary_key_id for ring in rings}) == 1, "Concurrent first loads created different keys"
+        
+        ring = rings[0]
+        old_token = ring.cipher.encrypt(b"secret")
+        old_id = ring.primary_key_id
+        new_id = ring.rotate()
+        
+        # A process that loaded the ring before the rotation picks up the new key on first use
+        from security.envelope import seal, open_envelope
+        running = rings[1]
+        assert open_envelope(running, seal(ring, b"re-encrypted"))[0] == b"re-encrypted"
+        assert running.primary_key_id == new_id
+        try:
+            running.aead("00000000")
+            raise AssertionError("An unknown key must still be rejected")
+        except ValueError:
+            pass
+        
+        reloaded = KeyRing(key_file)
+        print(f"Keys after rotation: {list(reloaded.keys)}")
+        assert list(reloaded.keys) == [new_id, old_id]
+        assert reloaded.cipher.decrypt(old_token) == b"secret"
+        
+        reloaded.retire(old_id)
+        assert list(KeyRing(key_file).keys) == [new_id]
+        
+        # A key file that cannot be read on reload never replaces the loaded keys
+        with open(key_file, "w"):
+            pass
+        try:
+            reloaded.reload()
+            raise AssertionError("Reloading an empty key file must fail")
+        except ValueError:
+            pass
+        try:
+            reloaded.aead("00000000")
+        except ValueError:
+            pass
+        assert list(reloaded.keys) == [new_id], "The loaded keys must be kept"
+    print()
+
+def test_key_file_gitignore():
+    """Test that only key files inside the working directory are added to its .gitignore"""
+    import tempfile
+    from security.key_ring import create_key_file
+    
+    with open(".gitignore") as f:
+        before = f.read()
+    with tempfile.TemporaryDirectory() as directory:
+        assert create_key_file(os.path.join(directory, "keys"), b"key")
+        with open(".gitignore") as f:
+            assert f.read() == before, "Key files outside the repository must not touch its .gitignore"
+        
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            with open(".gitignore", "w") as f:
+                f.write("/other\n")
+            os.mkdir("secrets")
+            create_key_file(os.path.join(directory, "secrets", "key"), b"key")
+            create_key_file("top_key", b"key")
+            create_key_file("top_key", b"key")
+            with open(".gitignore") as f:
+                assert f.read() == "/other\n/secrets/key\n/top_key\n"
+        finally:
+            os.chdir(cwd)
+    print("Key files ignored only inside the repository")
+
+def test_envelope_format():
+    """Test the AES-GCM envelope: header recognition, tamper detection and legacy reads"""
+    print("Testing encryption envelope...")
+    from security.envelope import is_envelope, envelope_key_id
+    
+    encryption = DataEncryption()
+    value = "jane.doe@example.com"
+    envelope = encryption.encrypt_data(value)
+    legacy = encryption.cipher_suite.encrypt(value.encode()).decode()
+    
+    print(f"Envelope: {len(envelope)} chars, Fernet: {len(legacy)} chars")
+    assert is_envelope(envelope) and not is_envelope(legacy) and not is_envelope(value)
+    assert envelope_key_id(envelope) == encryption.key_ring.primary_key_id
+    assert len(envelope) < len(legacy)
+    assert encryption.decrypt_data(envelope) == value
+    assert encryption.decrypt_data(legacy) == value, "Fernet values must stay readable"
+    
+    # Long answers are compressed before encryption and marked in the header
+    answer = "I would profile the service first and then add an index to the slow query. " * 10
+    compressed = encryption.encrypt_data(answer, compress_min_bytes=256)
+    uncompressed = encryption.encrypt_data(answer)
+    print(f"Long answer: {len(compressed)} chars compressed, {len(uncompressed)} uncompressed")
+    assert len(compressed) < len(uncompressed)
+    assert encryption.decrypt_data(compressed) == answer
+    assert len(encryption.encrypt_data(value, compress_min_bytes=256)) == len(envelope), "Short values skip compression"
+    
+    # Flipping a ciphertext character must fail authentication
+    tampered = envelope[:-4] + ("A" if envelope[-4] != "A" else "B") + envelope[-3:]
+    assert encryption.decrypt_data(tampered) == tampered
+    print()
+
+def test_reencrypt_rows():
+    """Test that the rotation job only rewrites values not under the primary key"""
+    print("Testing re-encryption for key rotation...")
+    from database.key_rotation import reencrypt_rows
+    from security.envelope import envelope_key_id
+    
+    encryption = DataEncryption()
+    current = encryption.encrypt_data("Already current")
+    legacy = encryption.cipher_suite.encrypt(b"Legacy answer").decode()
+    rows = [
+        {"id": "1", "encrypted_answer": current},
+        {"id": "2", "encrypted_answer": legacy}
+    ]
+    
+    changed = reencrypt_rows(rows, ["encrypted_answer"])
+    print(f"Rows re-encrypted: {[row['id'] for row in changed]}")
+    assert [row["id"] for row in changed] == ["2"]
+    assert envelope_key_id(changed[0]["encrypted_answer"]) == encryption.key_ring.primary_key_id
+    assert encryption.decrypt_data(changed[0]["encrypted_answer"]) == "Legacy answer"
+    print()
+
+def test_retire_guard():
+    """Test that values under old keys in local stores are found before keys are retired"""
+    import tempfile
+    from database.key_rotation import local_values_under_old_keys
+    from database.models import InterviewDataManager
+    from database.outbox import InterviewOutbox
+    from database.sqlite_storage import SQLiteStorage
+    from session_store import FileSessionStore, SessionSnapshotManager
+    
+    encryption = DataEncryption()
+    primary = encryption.key_ring.primary_key_id
+    candidate = {"name": "Jane Doe", "email": "jane@example.com", "phone": "5550100", "location": "Berlin",
+                 "tech_stack": "Python", "experience": "3", "position": "Backend Engineer"}
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_path = os.path.join(directory, "interviews.db")
+        manager = InterviewDataManager(storage=SQLiteStorage(sqlite_path))
+        records = manager.build_interview_records(candidate, [{"question": "Q", "answer": "A"}], {"Python": 3}, "Good")
+        manager.save_interview_records(records)
+        outbox_path = os.path.join(directory, "outbox.db")
+        InterviewOutbox(outbox_path).append("pending", records)
+        snapshots = SessionSnapshotManager(FileSessionStore(os.path.join(directory, "snapshots")), encryption)
+        snapshots.save("token", {"candidate_data": {"name": encryption.encrypt_data("Jane")},
+                                 "encrypted_fields": ["name"]})
+        
+        assert local_values_under_old_keys(primary, sqlite_path, outbox_path, snapshots) == {}
+        leftovers = local_values_under_old_keys("00000000", sqlite_path, outbox_path, snapshots)
+        print(f"Values under other keys: {leftovers}")
+        assert leftovers == {"sqlite interviews": 5, "outbox": 5, "session snapshots": 2}
+    print()
+
 def test_data_privacy():
     """Test data privacy features"""
     print("Testing data privacy...")
@@ -124,6 +327,13 @@ if __name__ == "__main__":
     
     try:
         test_encryption()
+        test_blind_index()
+        test_email_verification()
+        test_key_ring_rotation()
+        test_key_file_gitignore()
+        test_envelope_format()
+        test_reencrypt_rows()
+        test_retire_guard()
         test_data_privacy()
         test_validators()
         test_integration()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the server-side session snapshot store
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from interview_state import InterviewState
+from security.encryption import DataEncryption
+from session_store import SQLiteSessionStore, FileSessionStore, SessionSnapshotManager, new_resume_token, token_key
+from session_registry import SessionRegistry
+
+def check_backend(backend):
+    """Save, resume and delete a snapshot through one backend"""
+    manager = SessionSnapshotManager(backend, DataEncryption())
+    state = InterviewState()
+    state.add_message("user", "Jane Doe")
+    state.current_step = 3
+    token = new_resume_token()
+
+    assert manager.save(token, state.to_dict())
+    stored = backend.load(token_key(token))
+    assert "Jane Doe" not in stored, "Snapshot should be encrypted at rest"
+
+    resumed = InterviewState.from_dict(manager.load(token))
+    assert resumed.current_step == 3 and resumed.messages == state.messages
+    assert manager.load(new_resume_token()) is None
+
+    manager.delete(token)
+    assert manager.load(token) is None
+    assert backend.purge_expired(0) == 0
+
+def test_sqlite_store():
+    """Test the SQLite backend"""
+    print("=== Testing SQLite Session Store ===")
+    with tempfile.TemporaryDirectory() as directory:
+        check_backend(SQLiteSessionStore(os.path.join(directory, "sessions.db")))
+    print("SQLite store round-trip OK")
+
+def test_file_store():
+    """Test the file backend"""
+    print("\n=== Testing File Session Store ===")
+    with tempfile.TemporaryDirectory() as directory:
+        check_backend(FileSessionStore(directory))
+    print("File store round-trip OK")
+
+def test_registry_spill_and_evict():
+    """Test that idle sessions are spilled and expired ones evicted"""
+    print("\n=== Testing Session Registry ===")
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionSnapshotManager(FileSessionStore(directory), DataEncryption())
+        registry = SessionRegistry(store, timeout_seconds=1800, spill_after_seconds=600)
+
+        token = new_resume_token()
+        spilled_state, expired_state = InterviewState(), InterviewState()
+        spilled_state.add_message("user", "x" * 1000)
+        expired_state.add_message("user", "y" * 500)
+        registry.touch("spilled", spilled_state, token)
+        registry.touch("expired", expired_state)
+        assert registry.stats()["bytes"] == 1500
+
+        registry._sessions["spilled"].last_activity -= 700
+        registry._sessions["expired"].last_activity -= 2000
+        registry.reap()
+
+        stats = registry.stats()
+        print(f"Stats after reap: {stats}")
+        assert stats["sessions"] == 0 and stats["spilled"] == 1 and stats["evictions"] == 1
+        assert spilled_state.messages == [] and expired_state.messages == []
+
+        # The spilled session reloads its snapshot on the next interaction
+        assert registry.touch("spilled", InterviewState(), token) == token
+        assert InterviewState.from_dict(store.load(token)).messages[0].content == "x" * 1000
+
+if __name__ == "__main__":
+    test_sqlite_store()
+    test_file_store()
+    test_registry_spill_and_evict()
+    print("\n=== All Tests Passed ===")
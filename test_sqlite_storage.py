@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test script for the local SQLite interview storage
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.models import InterviewDataManager
+from database.sqlite_storage import SQLiteStorage
+from result_store import ResultStore
+from database.retention import RetentionCheckpoint, RetentionJob, retention_cutoff
+
+CANDIDATE = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "+1 555 0100",
+    "location": "Berlin",
+    "tech_stack": "Python, React",
+    "experience": "5",
+    "position": "Backend Engineer"
+}
+
+QA_PAIRS = [
+    {"question": "What is a closure?", "answer": "A function with its enclosing scope.", "technology": "Python"},
+    {"question": "What is a hook?", "answer": "A function that uses React state.", "technology": "React"}
+]
+
+def test_sqlite_save_and_read():
+    """Test that an interview round-trips through SQLite decrypted and saves only once"""
+    print("=== Testing SQLite Interview Storage ===")
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        assert manager.is_available()
+
+        records = manager.build_interview_records(CANDIDATE, QA_PAIRS, {"Python": 4, "React": 3}, "Good")
+        manager.save_interview_records(records)
+        manager.save_interview_records(records)  # A retried save is a no-op
+        interview_id = records["interview"]["id"]
+
+        interview = manager.get_interview_by_id(interview_id)
+        assert interview["candidate_info"]["email"] == "jane@example.com"
+        assert [qa["answer"] for qa in interview["qa_pairs"]] == [qa["answer"] for qa in QA_PAIRS]
+        assert interview["ratings"] == {"Python": 4, "React": 3}
+        assert manager.get_interview_by_id("missing") is None
+
+        # Without an outbox a retried queue call saves under the same interview ID once
+        assert manager.outbox is None
+        queued = [manager.queue_complete_interview("interview-2", CANDIDATE, QA_PAIRS, {"Python": 4}, "Good")
+                  for _ in range(2)]
+        assert queued == ["interview-2", "interview-2"]
+        assert len(list(manager.iter_interviews())) == 2
+
+        # Only the ciphertext is stored
+        stored = manager.storage.fetch_interview(interview_id)
+        assert len(stored["questions_answers"]) == 2
+        assert stored["candidate_info"][0]["encrypted_email"] != "jane@example.com"
+    print("Interview saved once and read back decrypted")
+
+def test_out_of_range_ratings():
+    """Test that scores outside 1-5 are clamped instead of failing the atomic save"""
+    from ai_service import parse_rating_response
+
+    parsed = parse_rating_response("RATINGS:\nPython: 10\nReact: 0\nDocker: 4/5\nOVERALL: Good")
+    assert parsed["ratings"] == {"Python": 5, "React": 1, "Docker": 4}
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        records = manager.build_interview_records(CANDIDATE, QA_PAIRS, {"Python": 10, "React": 0, "Go": "n/a"}, "Good")
+        manager.save_interview_records(records)
+        assert manager.get_interview_by_id(records["interview"]["id"])["ratings"] == {"Python": 5, "React": 1}
+    print("Out-of-range scores clamped")
+
+def test_sqlite_keyset_pages():
+    """Test that listing walks every interview once, newest first, with filters"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        for i in range(7):
+            candidate = dict(CANDIDATE, position="Frontend Engineer" if i % 2 else "Backend Engineer",
+                             tech_stack=["Python, React", "JavaScript,Node.js", "Go , Java"][i % 3])
+            manager.save_interview_records(
+                manager.build_interview_records(candidate, QA_PAIRS, {"Python": 3}, "Good" if i < 5 else "Fair")
+            )
+
+        first_page, cursor = manager.list_interviews_page(page_size=3)
+        assert len(first_page) == 3 and cursor is not None
+
+        interviews = list(manager.iter_interviews(page_size=3))
+        keys = [(row["interview_date"], row["id"]) for row in interviews]
+        assert len(set(keys)) == 7 and keys == sorted(keys, reverse=True)
+
+        assert len(list(manager.iter_interviews(page_size=2, position="frontend"))) == 3
+        assert len(list(manager.iter_interviews(page_size=2, overall_rating="Fair"))) == 2
+        # Technologies match whole tech stack entries only
+        assert len(list(manager.iter_interviews(page_size=2, technology="java"))) == 2
+        assert len(list(manager.iter_interviews(page_size=2, technology="JavaScript"))) == 2
+        assert len(list(manager.iter_interviews(page_size=2, technology="node.js"))) == 2
+        assert len(list(manager.iter_interviews(page_size=2, technology="Pyth"))) == 0
+        detailed, _ = manager.list_interviews_page(page_size=1, include_details=True)
+        assert detailed[0]["candidate_info"]["name"] == "Jane Doe"
+    print(f"Listed {len(interviews)} interviews in keyset pages")
+
+def test_skill_rollups():
+    """Test that technology is parsed from questions and rollups are updated once per interview"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        qa_pairs = [{"question": "[Python] What is a closure?", "answer": "A function with its scope."}]
+        records = manager.build_interview_records(CANDIDATE, qa_pairs, {"Python": 4, "React": 2}, "Good")
+        assert records["qa"][0]["technology"] == "Python"
+        assert records["qa"][0]["question_text"] == "What is a closure?"
+
+        manager.save_interview_records(records)
+        manager.save_interview_records(records)  # Retries must not count twice
+        manager.save_interview_records(manager.build_interview_records(CANDIDATE, qa_pairs, {"Python": 2}, "Fair"))
+
+        python = manager.get_skill_analytics(technology="python", by_week=False)
+        assert len(python) == 1
+        assert python[0]["rating_count"] == 2 and python[0]["mean_score"] == 3.0
+        assert python[0]["histogram"] == {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}
+        assert python[0]["position"] == "backend engineer"
+        assert len(manager.get_skill_analytics()) == 2
+        print(f"Python rollup: {python[0]}")
+
+def test_retention_purge():
+    """Test that only expired interviews are deleted, with their related rows, in batches"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        expired_ids = []
+        for days_old in (400, 380, 370, 10):
+            records = manager.build_interview_records(CANDIDATE, QA_PAIRS, {"Python": 4}, "Good")
+            records["interview"]["interview_date"] = retention_cutoff(days_old)
+            manager.save_interview_records(records)
+            if days_old > 365:
+                expired_ids.append(records["interview"]["id"])
+
+        checkpoint_path = os.path.join(directory, "retention.json")
+        cutoff = retention_cutoff(365)
+        dry_run = RetentionJob(manager.storage, RetentionCheckpoint(checkpoint_path, cutoff, dry_run=True),
+                               batch_size=2, max_rows_per_second=0, dry_run=True)
+        assert dry_run.run() == 3
+        assert len(list(manager.iter_interviews())) == 4, "A dry run must not delete anything"
+
+        job = RetentionJob(manager.storage, RetentionCheckpoint(checkpoint_path, cutoff), batch_size=2,
+                           max_rows_per_second=0, on_deleted=lambda ids: [manager.invalidate_cached_interview(i) for i in ids])
+        assert job.run() == 3
+        assert len(list(manager.iter_interviews())) == 1
+        assert all(manager.storage.fetch_interview(interview_id) is None for interview_id in expired_ids)
+        remaining_answers = manager.storage._conn.execute("SELECT COUNT(*) FROM questions_answers").fetchone()[0]
+        assert remaining_answers == len(QA_PAIRS), "Related rows must be deleted through the cascade"
+        assert manager.get_skill_analytics(by_week=False)[0]["rating_count"] == 4, "Rollups are kept"
+    print("Expired interviews purged in batches")
+
+def test_subject_requests():
+    """Test that access and erasure requests resolve interviews by email hash in bulk"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        for email in ("jane@example.com", "jane@example.com", "john@example.com", "other@example.com"):
+            manager.save_interview_records(
+                manager.build_interview_records(dict(CANDIDATE, email=email), QA_PAIRS, {"Python": 4}, "Good")
+            )
+
+        requests = [" Jane@Example.com", "john@example.com", "nobody@example.com"]
+        exported = list(manager.export_subject_data(requests, chunk_size=2))
+        assert len(exported) == 3
+        assert {interview["candidate_info"]["email"] for interview in exported} == {"jane@example.com", "john@example.com"}
+        assert all(interview["qa_pairs"] for interview in exported)
+
+        deleted = manager.erase_subject_data(requests, chunk_size=2)
+        assert deleted == {" Jane@Example.com": 2, "john@example.com": 1, "nobody@example.com": 0}
+        assert len(list(manager.iter_interviews())) == 1 and not list(manager.export_subject_data(requests))
+    print(f"Erasure counts: {deleted}")
+
+def test_cache_after_external_erasure():
+    """Test that a cached interview is not served after another process erased it, and entries expire"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "interviews.db")
+        reader = InterviewDataManager(storage=SQLiteStorage(path))
+        eraser = InterviewDataManager(storage=SQLiteStorage(path))  # e.g. the erasure job process
+        records = reader.build_interview_records(CANDIDATE, QA_PAIRS, {"Python": 4}, "Good")
+        reader.save_interview_records(records)
+        interview_id = records["interview"]["id"]
+
+        assert reader.get_interview_by_id(interview_id) is not None
+        assert reader.interview_cache.get(interview_id) is not None
+        eraser.erase_subject_data([CANDIDATE["email"]])
+        assert reader.get_interview_by_id(interview_id) is None
+        assert reader.interview_cache.get(interview_id) is None
+
+    cache = ResultStore(ttl_seconds=0)
+    cache.put("key", {"value": 1})
+    assert cache.get("key") is None and cache.stats()["bytes"] == 0
+    print("Erased interviews are not served from the cache")
+
+def test_returning_candidate_lookup():
+    """Test that a recent interview is found by normalized email or phone only"""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = InterviewDataManager(storage=SQLiteStorage(os.path.join(directory, "interviews.db")))
+        records = manager.build_interview_records(CANDIDATE, QA_PAIRS, {"Python": 4}, "Good")
+        assert records["interview"]["email_hash"] != manager.encryption.hash_phone(CANDIDATE["phone"])
+        manager.save_interview_records(records)
+
+        found = manager.find_returning_candidate(" JANE@example.com ")
+        assert found == {"id": records["interview"]["id"], "email_match": True}, "Only the key, nothing decrypted"
+        assert manager.find_returning_candidate("new@example.com", "(1) 555-0100") == dict(found, email_match=False)
+        assert manager.find_returning_candidate("new@example.com", "+1 555 0199") is None
+        assert manager.find_returning_candidate("jane@example.com", lookback_days=0) is None
+    print("Returning candidate found by email and by phone")
+
+if __name__ == "__main__":
+    test_sqlite_save_and_read()
+    test_out_of_range_ratings()
+    test_sqlite_keyset_pages()
+    test_skill_rollups()
+    test_retention_purge()
+    test_subject_requests()
+    test_cache_after_external_erasure()
+    test_returning_candidate_lookup()
+    print("\n=== All Tests Passed ===")
@@ -2,12 +2,15 @@
 Utility functions for the chatbot
 """
 import streamlit as st
-from session_manager import get_candidate_summary, get_rating_display, is_interview_complete
+from session_manager import (
+    get_candidate_summary, get_rating_display, is_interview_complete, get_interview_state, reset_conversation
+)
 from ai_service import get_ai_status, set_ai_provider, get_current_ai_provider
-from config import AI_PROVIDERS
+from config import AI_PROVIDERS, LLM_BACKEND_CONFIG
 
 def create_sidebar():
     """Create a sidebar with candidate information and controls"""
+    state = get_interview_state()
     with st.sidebar:
         st.header("🤖 AI Configuration")
         
@@ -15,15 +18,15 @@ def create_sidebar():
         ai_status = get_ai_status()
         current_provider = get_current_ai_provider()
         
-        # Display Ollama status
-        ollama_status = ai_status.get("ollama", {})
+        # Display backend status (Ollama daemon or in-process llama.cpp)
+        ollama_status = ai_status.get(LLM_BACKEND_CONFIG.get("backend", "ollama"), {})
         if ollama_status.get("available"):
             st.success(f"✅ Llama 3.1 8B: {ollama_status['message']}")
         else:
             st.error(f"❌ Llama 3.1 8B: {ollama_status['message']}")
         
         # If Ollama is not available, show setup instructions
-        if not ollama_status.get("available"):
+        if not ollama_status.get("available") and "ollama" in ai_status:
             with st.expander("🔧 Setup Ollama"):
                 st.markdown("""
                 **To use Llama 3.1 8B:**
@@ -39,6 +42,7 @@ def create_sidebar():
         
         # Show available models button
         if st.button("🔄 Refresh Status"):
+            get_ai_status.clear()
             st.rerun()
         
         st.divider()
@@ -46,16 +50,16 @@ def create_sidebar():
         st.header("📋 Candidate Information")
         
         # Display current step
-        current_step = st.session_state.get("current_step", 0)
+        current_step = state.current_step
         total_steps = 7
         progress = current_step / total_steps
         st.progress(progress)
         st.write(f"Step {current_step + 1} of {total_steps}")
         
         # Display collected data
-        if st.session_state.get("candidate_data"):
+        if state.candidate_data:
             st.subheader("Collected Data")
-            data = st.session_state["candidate_data"]
+            data = state.candidate_data
             for key, value in data.items():
                 if key == "position" and isinstance(value, list):
                     st.write(f"**{key.title()}:** {', '.join(value)}")
@@ -63,12 +67,12 @@ def create_sidebar():
                     st.write(f"**{key.title().replace('_', ' ')}:** {value}")
         
         # Display candidate rating if interview is complete
-        if is_interview_complete() and st.session_state.get("candidate_rating"):
+        if is_interview_complete() and state.candidate_rating:
             st.divider()
             st.subheader("🎯 Candidate Rating")
             
             # Display ratings for each skill
-            for skill, rating in st.session_state["candidate_rating"].items():
+            for skill, rating in state.candidate_rating.items():
                 col1, col2 = st.columns([1, 3])
                 with col1:
                     st.write(f"**{skill}:**")
@@ -78,7 +82,7 @@ def create_sidebar():
             
             # Display overall rating with appropriate color
             st.divider()
-            overall = st.session_state.get("overall_rating", "")
+            overall = state.overall_rating
             
             if overall:
                 # Map ratings to colors
@@ -96,19 +100,11 @@ def create_sidebar():
         # Control buttons
         st.subheader("🎛️ Controls")
         if st.button("Clear Chat"):
-            st.session_state["messages"] = []
+            state.messages = []
             st.rerun()
         
         if st.button("Reset Conversation"):
-            st.session_state["current_step"] = 0
-            st.session_state["candidate_data"] = {}
-            st.session_state["messages"] = []
-            st.session_state["interview_questions"] = []
-            st.session_state["interview_answers"] = []
-            st.session_state["current_question_index"] = 0
-            st.session_state["interview_complete"] = False
-            st.session_state["candidate_rating"] = {}
-            st.session_state["overall_rating"] = ""
+            reset_conversation()
             st.rerun()
 
 def display_help():
@@ -138,7 +134,7 @@ def display_help():
 def display_ai_info():
     """Display AI provider information"""
     ai_status = get_ai_status()
-    ollama_status = ai_status.get("ollama", {})
+    ollama_status = ai_status.get(LLM_BACKEND_CONFIG.get("backend", "ollama"), {})
     
     if ollama_status.get("available"):
         st.info("🤖 Currently using: **Llama 3.1 8B (Local)**")
@@ -154,20 +150,21 @@ def display_ai_info():
 def export_candidate_data():
     """Export candidate data as JSON"""
     import json
-    data = st.session_state.get("candidate_data", {})
+    state = get_interview_state()
+    data = dict(state.candidate_data)
     
     # Include interview data if available
-    if st.session_state.get("interview_questions") and st.session_state.get("interview_answers"):
+    if state.interview_questions and state.interview_answers:
         data["technical_interview"] = {
-            "questions": st.session_state["interview_questions"],
-            "answers": st.session_state["interview_answers"]
+            "questions": state.interview_questions,
+            "answers": state.interview_answers
         }
     
     # Include ratings if available
-    if st.session_state.get("candidate_rating"):
+    if state.candidate_rating:
         data["ratings"] = {
-            "skills": st.session_state["candidate_rating"],
-            "overall": st.session_state.get("overall_rating", "")
+            "skills": state.candidate_rating,
+            "overall": state.overall_rating
         }
     
     if data:
@@ -177,7 +174,8 @@ def export_candidate_data():
 def send_candidate_report_email():
     """Send candidate report via email"""
     import json
-    data = st.session_state.get("candidate_data", {})
+    state = get_interview_state()
+    data = state.candidate_data
     
     if not data:
         return False, "No candidate data to send"
@@ -204,22 +202,22 @@ def send_candidate_report_email():
                 body += f"- **{key.title().replace('_', ' ')}:** {value}\n"
         
         # Technical interview
-        if st.session_state.get("interview_questions") and st.session_state.get("interview_answers"):
+        if state.interview_questions and state.interview_answers:
             body += "\n## Technical Interview\n"
-            for i, question in enumerate(st.session_state["interview_questions"]):
-                if i < len(st.session_state["interview_answers"]):
+            for i, question in enumerate(state.interview_questions):
+                if i < len(state.interview_answers):
                     body += f"\n### Q{i+1}: {question}\n"
-                    body += f"**Answer:** {st.session_state['interview_answers'][i]}\n"
+                    body += f"**Answer:** {state.interview_answers[i]}\n"
         
         # Ratings
-        if st.session_state.get("candidate_rating"):
+        if state.candidate_rating:
             body += "\n## Skills Assessment\n"
-            for skill, rating in st.session_state["candidate_rating"].items():
+            for skill, rating in state.candidate_rating.items():
                 stars = "★" * rating + "☆" * (5 - rating)
                 body += f"- **{skill}:** {stars} ({rating}/5)\n"
             
             # Overall rating
-            overall = st.session_state.get("overall_rating", "")
+            overall = state.overall_rating
             if overall:
                 body += f"\n## Overall Recommendation: **{overall}**\n"
         